@@ -1,18 +1,18 @@
 import codecs
 import socket
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from hashlib import md5
 from importlib.metadata import version
 from io import IOBase, TextIOBase
 from itertools import count
 from struct import Struct
 
-import scramp
-
 from pg8000.converters import (
+    PG_BINARY_TYPES,
     PG_PY_ENCODINGS,
     PG_TYPES,
     PY_TYPES,
+    TIMESTAMPTZ,
     make_params,
     string_in,
 )
@@ -119,6 +119,8 @@ EXECUTE_MSG = _create_message(EXECUTE, NULL_BYTE + i_pack(0))
 STATEMENT = b"S"
 PORTAL = b"P"
 
+DESCRIBE_PORTAL_MSG = _create_message(DESCRIBE, PORTAL + NULL_BYTE)
+
 # ErrorResponse codes
 RESPONSE_SEVERITY = "S"  # always present
 RESPONSE_SEVERITY = "V"  # always present
@@ -138,6 +140,70 @@ IDLE = b"I"
 IN_TRANSACTION = b"T"
 IN_FAILED_TRANSACTION = b"E"
 
+# A cached prepared statement can no longer be used when it was dropped on the
+# server (invalid_sql_statement_name, e.g. after DEALLOCATE) or when DDL has
+# changed its result type. The latter is a feature_not_supported error, a code
+# shared with unrelated failures, so it is recognised by its message too.
+MISSING_STATEMENT_CODE = "26000"
+STALE_PLAN_CODE = "0A000"
+STALE_PLAN_MESSAGE = "cached plan must not change result type"
+
+# Parameter sets sent per Sync by execute_many(). The server's replies to a
+# batch are only read after all of it is written, so the batch is kept small
+# enough for those replies (even with RETURNING rows) to fit in the socket
+# buffers instead of stalling both ends.
+EXECUTEMANY_BATCH_SIZE = 100
+
+# Row decoders kept per connection (one per distinct column layout)
+ROW_DECODER_CACHE_SIZE = 256
+
+
+def make_row_decoder(specs, encoding):
+    """Returns a function that decodes the body of a DataRow message into a list
+    of values, for one particular RowDescription. specs has one entry per
+    column: the text input function, or the (struct format, recv function) pair
+    from PG_BINARY_TYPES for a column received in binary. The code for each
+    column is generated once, so decoding a row is a straight run through the
+    columns with no per-column dispatch."""
+    namespace = {"i_unpack": i_unpack, "encoding": encoding}
+    lines = ["def decode_row(data):", "    idx = 2"]
+    for i, spec in enumerate(specs):
+        if isinstance(spec, tuple):
+            fmt, func = spec
+            if fmt is None:
+                value = "data[idx : idx + vlen]"
+            else:
+                namespace[f"unpack_{i}"] = Struct(f"!{fmt}").unpack_from
+                value = f"unpack_{i}(data, idx)[0]"
+            if func is not None:
+                namespace[f"func_{i}"] = func
+                value = f"func_{i}({value})"
+        elif spec is string_in:
+            value = "str(data[idx : idx + vlen], encoding)"
+        elif spec is int or spec is float:
+            # Both parse the ASCII digits straight from bytes
+            namespace[f"func_{i}"] = spec
+            value = f"func_{i}(data[idx : idx + vlen])"
+        else:
+            namespace[f"func_{i}"] = spec
+            value = f"func_{i}(str(data[idx : idx + vlen], encoding))"
+
+        lines.extend(
+            (
+                "    vlen = i_unpack(data, idx)[0]",
+                "    idx += 4",
+                "    if vlen == -1:",
+                f"        v{i} = None",
+                "    else:",
+                f"        v{i} = {value}",
+                "        idx += vlen",
+            )
+        )
+    lines.append(f"    return [{', '.join(f'v{i}' for i in range(len(specs)))}]")
+
+    exec("\n".join(lines), namespace)
+    return namespace["decode_row"]
+
 
 def _flush(sock):
     try:
@@ -147,7 +213,15 @@ def _flush(sock):
 
 
 def _read(sock, size):
-    buff = bytearray(sock.read(size))
+    try:
+        data = sock.read(size)
+    except OSError as e:
+        raise InterfaceError("network error") from e
+    # A buffered read normally returns all of it; skip the copies below
+    if len(data) == size:
+        return data
+
+    buff = bytearray(data)
     try:
         while len(buff) < size:
             block = sock.read(size - len(buff))
@@ -232,6 +306,10 @@ def _make_socket(
             resp = sock.recv(1).decode("ascii")
             if resp == "S":
                 sock = ssl_context.wrap_socket(sock, server_hostname=host)
+                # scramp is imported on first use (here or at SASL auth)
+                # rather than at module load, to keep import time down.
+                import scramp
+
                 channel_binding = scramp.make_channel_binding(
                     "tls-server-end-point", sock
                 )
@@ -271,6 +349,8 @@ class CoreConnection:
         replication=None,
         startup_params=None,
         sock=None,
+        statement_cache_size=0,
+        binary_results=False,
     ):
         self._client_encoding = "utf8"
         self._commands_with_count = (
@@ -323,7 +403,20 @@ class CoreConnection:
         self._xid = None
         self._statement_nums = set()
 
-        self._caches = {}
+        # Prepared statement cache used by execute_cached(): an LRU of
+        # (statement, oids) -> (statement_name_bin, columns, input_funcs).
+        self._caches = OrderedDict()
+        self._cache_nums = count()
+        self.statement_cache_size = statement_cache_size
+        # Commands completed since the last BEGIN, and that BEGIN, so a stale
+        # cached statement that opened its transaction can be retried
+        self._commands_since_begin = 0
+        self._begin_statement = None
+
+        # Ask for the types in PG_BINARY_TYPES in binary format whenever the
+        # result columns are known before Bind (prepared statements)
+        self.binary_results = binary_results
+        self._row_decoders = {}
 
         self.channel_binding, self._usock = _make_socket(
             unix_sock,
@@ -404,6 +497,10 @@ class CoreConnection:
 
     def register_in_adapter(self, oid, in_func):
         self.pg_types[oid] = in_func
+        for key, (name_bin, columns, input_funcs) in self._caches.items():
+            if columns is not None:
+                input_funcs = [self.pg_types[c["type_oid"]] for c in columns]
+                self._caches[key] = name_bin, columns, input_funcs
 
     def handle_ERROR_RESPONSE(self, data, context):
         msg = {
@@ -423,7 +520,7 @@ class CoreConnection:
     def handle_PARSE_COMPLETE(self, data, context):
         # Byte1('1') - Identifier.
         # Int32(4) - Message length, including self.
-        pass
+        context.parsed = True
 
     def handle_BIND_COMPLETE(self, data, context):
         pass
@@ -596,6 +693,8 @@ class CoreConnection:
             # AuthenticationSASL
             mechanisms = [m.decode("ascii") for m in data[4:-2].split(NULL_BYTE)]
 
+            import scramp
+
             self.auth = scramp.ScramClient(
                 mechanisms,
                 self.user.decode("utf8"),
@@ -666,17 +765,23 @@ class CoreConnection:
 
         context.columns = columns
         context.input_funcs = input_funcs
+        context.described = True
+        context.decode_row = self._row_decoder(
+            columns, input_funcs, tuple(c["format"] for c in columns)
+        )
         if context.rows is None:
             context.rows = []
 
-    def send_PARSE(self, statement_name_bin, statement, oids=()):
+    def _create_PARSE(self, statement_name_bin, statement, oids=()):
         val = bytearray(statement_name_bin)
         val.extend(statement.encode(self._client_encoding) + NULL_BYTE)
         val.extend(H_pack(len(oids)))
         for oid in oids:
             val.extend(i_pack(0 if oid == -1 else oid))
+        return _create_message(PARSE, val)
 
-        self._send_message(PARSE, val)
+    def send_PARSE(self, statement_name_bin, statement, oids=()):
+        self._send(self._create_PARSE(statement_name_bin, statement, oids))
         _write(self._sock, FLUSH_MSG)
 
     def send_DESCRIBE_STATEMENT(self, statement_name_bin):
@@ -696,6 +801,59 @@ class CoreConnection:
         return context
 
     def execute_unnamed(self, statement, vals=(), oids=(), stream=None):
+        if stream is not None:
+            return self.execute_unnamed_phased(statement, vals, oids, stream)
+
+        context = Context(statement)
+        params = make_params(self.py_types, vals)
+
+        # Parse, Bind, Describe (portal), Execute and Sync go out in a single
+        # write and the responses are read in one pass: one round trip instead
+        # of three. If any step fails the server skips to the Sync, so the
+        # error still surfaces from handle_messages() with the connection in a
+        # clean state.
+        buff = bytearray(
+            self._create_PARSE(NULL_BYTE, statement, oids)
+            + self._create_BIND(NULL_BYTE, params)
+        )
+        buff.extend(DESCRIBE_PORTAL_MSG)
+        buff.extend(EXECUTE_MSG)
+        buff.extend(SYNC_MSG)
+        self._send(buff)
+        _flush(self._sock)
+        self.handle_messages(context)
+
+        return context
+
+    def execute_many(self, statement, vals_list, oids=()):
+        """Executes statement once for each entry of vals_list. The statement is
+        parsed and described once; then a Bind/Execute pair per parameter set is
+        written, with a Sync (one round trip) every EXECUTEMANY_BATCH_SIZE sets.
+        Row counts and any returned rows are accumulated in the one Context.
+
+        The messages up to a Sync form a single implicit transaction, so with
+        autocommit a failure rolls back the whole batch it belongs to."""
+        context = Context(statement)
+        buff = bytearray(self._create_PARSE(NULL_BYTE, statement, oids))
+        buff.extend(_create_message(DESCRIBE, STATEMENT + NULL_BYTE))
+        for start in range(0, len(vals_list), EXECUTEMANY_BATCH_SIZE):
+            for vals in vals_list[start : start + EXECUTEMANY_BATCH_SIZE]:
+                buff.extend(
+                    self._create_BIND(NULL_BYTE, make_params(self.py_types, vals))
+                )
+                buff.extend(EXECUTE_MSG)
+            buff.extend(SYNC_MSG)
+            self._send(buff)
+            _flush(self._sock)
+            self.handle_messages(context)
+            buff = bytearray()
+
+        return context
+
+    def execute_unnamed_phased(self, statement, vals=(), oids=(), stream=None):
+        """Parse, Describe, Bind and Execute with a round trip in between. Used
+        for COPY, where the server switches into copy mode part way through and
+        the COPY handlers write to the socket themselves."""
         context = Context(statement, stream=stream)
 
         self.send_PARSE(NULL_BYTE, statement, oids)
@@ -753,18 +911,141 @@ class CoreConnection:
         self, statement_name_bin, params, columns, input_funcs, statement
     ):
         context = Context(columns=columns, input_funcs=input_funcs, statement=statement)
+        result_formats = self._result_formats(columns)
+        if columns is not None:
+            context.decode_row = self._row_decoder(
+                columns, input_funcs, result_formats
+            )
 
-        self.send_BIND(statement_name_bin, params)
+        self.send_BIND(statement_name_bin, params, result_formats)
         self.send_EXECUTE()
         _write(self._sock, SYNC_MSG)
         _flush(self._sock)
         self.handle_messages(context)
         return context
 
+    def execute_cached(self, statement, vals=(), oids=(), stream=None):
+        """Like execute_unnamed(), but the statement is kept on the server as a
+        named prepared statement, so later executions of the same SQL with the
+        same parameter types skip parsing and planning. Up to
+        statement_cache_size statements are kept per connection; the least
+        recently used one is closed when the cache is full.
+
+        A cached statement that was deallocated, or whose result type was
+        changed by DDL, is prepared again and retried when nothing else can be
+        lost: outside a transaction block, or when it is the first statement
+        after BEGIN (the transaction is rolled back and begun again). Later in
+        a transaction the error reaches the caller, as the transaction is
+        already aborted."""
+        if stream is not None or self.statement_cache_size <= 0:
+            return self.execute_unnamed(statement, vals, oids, stream)
+
+        key = statement, tuple(oids)
+        params = make_params(self.py_types, vals)
+        cached = self._caches.get(key)
+        if cached is None:
+            return self._prepare_cached(key, params)
+
+        self._caches.move_to_end(key)
+        statement_name_bin, columns, input_funcs = cached
+        transaction_status = self._transaction_status
+        begin_statement = self._begin_statement
+        first_in_transaction = (
+            transaction_status == IN_TRANSACTION and self._commands_since_begin == 0
+        )
+        try:
+            return self.execute_named(
+                statement_name_bin, params, columns, input_funcs, statement
+            )
+        except DatabaseError as e:
+            msg = e.args[0]
+            if not isinstance(msg, dict):
+                raise
+            if msg.get("C") == MISSING_STATEMENT_CODE:
+                self._drop_cached(key, close=False)
+            elif msg.get("C") == STALE_PLAN_CODE and msg.get("M") == STALE_PLAN_MESSAGE:
+                self._drop_cached(key, close=True)
+            else:
+                raise
+            # Both errors are raised before the statement runs, so it can be
+            # prepared again and retried if nothing else was done in its
+            # transaction.
+            if transaction_status == IDLE:
+                pass
+            elif first_in_transaction and begin_statement is not None:
+                self.execute_simple("ROLLBACK")
+                self.execute_simple(begin_statement)
+            else:
+                raise
+            return self._prepare_cached(key, params)
+
+    def _prepare_cached(self, key, params):
+        statement, oids = key
+        statement_name_bin = f"pg8000_cached_{next(self._cache_nums)}".encode(
+            "ascii"
+        ) + NULL_BYTE
+        context = Context(statement)
+
+        # Close (on eviction), Parse, Bind, Describe (portal), Execute and Sync
+        # in one round trip, as in execute_unnamed().
+        buff = bytearray()
+        if len(self._caches) >= self.statement_cache_size:
+            _, (evicted_name_bin, _, _) = self._caches.popitem(last=False)
+            buff.extend(_create_message(CLOSE, STATEMENT + evicted_name_bin))
+            self._statement_nums.discard(evicted_name_bin)
+        buff.extend(self._create_PARSE(statement_name_bin, statement, oids))
+        buff.extend(self._create_BIND(statement_name_bin, params))
+        buff.extend(DESCRIBE_PORTAL_MSG)
+        buff.extend(EXECUTE_MSG)
+        buff.extend(SYNC_MSG)
+        self._send(buff)
+        _flush(self._sock)
+        try:
+            self.handle_messages(context)
+        except DatabaseError:
+            # Bind or Execute failed after a successful Parse (a constraint
+            # violation, a bad cast, a timeout...). The statement exists on the
+            # server, and survives ROLLBACK, so it must not be lost track of:
+            # once described it is cached as usual, otherwise it is closed.
+            if context.described:
+                self._cache_statement(key, statement_name_bin, context)
+            elif context.parsed:
+                self._statement_nums.add(statement_name_bin)
+                self.close_prepared_statement(statement_name_bin)
+            raise
+
+        self._cache_statement(key, statement_name_bin, context)
+        return context
+
+    def _cache_statement(self, key, statement_name_bin, context):
+        self._statement_nums.add(statement_name_bin)
+        self._caches[key] = statement_name_bin, context.columns, context.input_funcs
+
+    def _drop_cached(self, key, close):
+        """Removes one statement from the cache. With close=True it still
+        exists on the server and is closed there first; if that fails the
+        entry is kept, so the statement is not lost track of."""
+        statement_name_bin = self._caches[key][0]
+        if close:
+            self.close_prepared_statement(statement_name_bin)
+        else:
+            self._statement_nums.discard(statement_name_bin)
+        del self._caches[key]
+
+    def _forget_cached(self):
+        """Drops the cache without talking to the server, once DISCARD ALL or
+        DEALLOCATE ALL has already deallocated every statement there."""
+        for statement_name_bin, _, _ in self._caches.values():
+            self._statement_nums.discard(statement_name_bin)
+        self._caches.clear()
+
     def _send_message(self, code, data):
         buff = bytearray(code)
         buff.extend(i_pack(len(data) + 4))
         buff.extend(data)
+        self._send(buff)
+
+    def _send(self, buff):
         try:
             _write(self._sock, bytes(buff))
         except ValueError as e:
@@ -775,7 +1056,44 @@ class CoreConnection:
         except AttributeError:
             raise InterfaceError("connection is closed")
 
-    def send_BIND(self, statement_name_bin, params):
+    def _result_formats(self, columns):
+        """Result format codes for Bind: binary for the columns whose type is in
+        PG_BINARY_TYPES and still has its default input function, text for the
+        rest. () (all text) unless binary_results is on."""
+        if not self.binary_results or not columns:
+            return ()
+
+        # timestamptz in binary is UTC, which only matches text in a UTC session
+        utc = self.parameter_statuses.get("TimeZone") in ("UTC", "Etc/UTC")
+        formats = tuple(
+            1
+            if oid in PG_BINARY_TYPES
+            and self.pg_types[oid] is PG_TYPES[oid]
+            and (utc or oid != TIMESTAMPTZ)
+            else 0
+            for oid in (c["type_oid"] for c in columns)
+        )
+        return formats if 1 in formats else ()
+
+    def _row_decoder(self, columns, input_funcs, formats=()):
+        if 1 in formats:
+            specs = tuple(
+                PG_BINARY_TYPES[column["type_oid"]] if fmt == 1 else func
+                for column, func, fmt in zip(columns, input_funcs, formats)
+            )
+        else:
+            specs = tuple(input_funcs)
+
+        key = specs, self._client_encoding
+        decode_row = self._row_decoders.get(key)
+        if decode_row is None:
+            if len(self._row_decoders) >= ROW_DECODER_CACHE_SIZE:
+                self._row_decoders.clear()
+            decode_row = make_row_decoder(specs, self._client_encoding)
+            self._row_decoders[key] = decode_row
+        return decode_row
+
+    def _create_BIND(self, statement_name_bin, params, result_formats=()):
         """https://www.postgresql.org/docs/current/protocol-message-formats.html"""
 
         retval = bytearray(
@@ -789,9 +1107,13 @@ class CoreConnection:
                 val = value.encode(self._client_encoding)
                 retval.extend(i_pack(len(val)))
                 retval.extend(val)
-        retval.extend(H_pack(0))
+        retval.extend(H_pack(len(result_formats)))
+        for fmt in result_formats:
+            retval.extend(H_pack(fmt))
+        return _create_message(BIND, retval)
 
-        self._send_message(BIND, retval)
+    def send_BIND(self, statement_name_bin, params, result_formats=()):
+        self._send(self._create_BIND(statement_name_bin, params, result_formats))
         _write(self._sock, FLUSH_MSG)
 
     def send_EXECUTE(self):
@@ -800,7 +1122,7 @@ class CoreConnection:
         _write(self._sock, FLUSH_MSG)
 
     def handle_NO_DATA(self, msg, context):
-        pass
+        context.described = True
 
     def handle_COMMAND_COMPLETE(self, data, context):
         if self._transaction_status == IN_FAILED_TRANSACTION and context.error is None:
@@ -808,6 +1130,18 @@ class CoreConnection:
             if sql != "ROLLBACK":
                 context.error = InterfaceError("in failed transaction block")
 
+        if data.startswith(b"BEGIN"):
+            # Kept only when it is a statement of its own, safe to run again
+            begin = (context.statement or "").strip().rstrip(";")
+            self._begin_statement = None if ";" in begin else begin
+            self._commands_since_begin = 0
+        else:
+            self._commands_since_begin += 1
+
+        if data.startswith((b"DISCARD ALL", b"DEALLOCATE ALL")):
+            # The server has dropped the prepared statements behind the cache
+            self._forget_cached()
+
         values = data[:-1].split(b" ")
         try:
             row_count = int(values[-1])
@@ -819,26 +1153,21 @@ class CoreConnection:
             pass
 
     def handle_DATA_ROW(self, data, context):
-        idx = 2
-        row = []
-        for func in context.input_funcs:
-            vlen = i_unpack(data, idx)[0]
-            idx += 4
-            if vlen == -1:
-                v = None
-            else:
-                v = func(str(data[idx : idx + vlen], encoding=self._client_encoding))
-                idx += vlen
-            row.append(v)
-        context.rows.append(row)
+        decode_row = context.decode_row
+        if decode_row is None:
+            decode_row = self._row_decoder(context.columns, context.input_funcs)
+            context.decode_row = decode_row
+        context.rows.append(decode_row(data))
 
     def handle_messages(self, context):
         code = None
+        sock = self._sock
+        message_types = self.message_types
 
         while code != READY_FOR_QUERY:
-            code, data_len = ci_unpack(_read(self._sock, 5))
+            code, data_len = ci_unpack(_read(sock, 5))
 
-            self.message_types[code](_read(self._sock, data_len - 4), context)
+            message_types[code](_read(sock, data_len - 4), context)
 
         if context.error is not None:
             raise context.error
@@ -886,4 +1215,8 @@ class Context:
         self.columns = columns
         self.stream = stream
         self.input_funcs = [] if input_funcs is None else input_funcs
+        self.decode_row = None
         self.error = None
+        # Set once ParseComplete / RowDescription or NoData have arrived
+        self.parsed = False
+        self.described = False
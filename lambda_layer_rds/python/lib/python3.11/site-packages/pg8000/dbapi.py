@@ -1,9 +1,13 @@
+import re
+from collections.abc import Sized
 from datetime import (
     date as Date,
     datetime as Datetime,
     time as Time,
 )
-from itertools import count, islice
+from functools import lru_cache
+from itertools import count, groupby, islice
+from operator import itemgetter
 from time import localtime
 from warnings import warn
 
@@ -208,6 +212,8 @@ def connect(
     replication=None,
     startup_params=None,
     sock=None,
+    statement_cache_size=0,
+    binary_results=False,
 ):
     return Connection(
         user,
@@ -224,6 +230,8 @@ def connect(
         replication=replication,
         startup_params=startup_params,
         sock=sock,
+        statement_cache_size=statement_cache_size,
+        binary_results=binary_results,
     )
 
 
@@ -247,7 +255,38 @@ This property is part of the `DBAPI 2.0 specification
 paramstyle = "format"
 
 
+# Number of (paramstyle, query) conversions memoised by _parse_paramstyle()
+PARAMSTYLE_CACHE_SIZE = 512
+
+
 def convert_paramstyle(style, query, args):
+    statement, make_vals = _parse_paramstyle(style, query)
+    return statement, make_vals(args)
+
+
+def _positional_vals(args):
+    return args
+
+
+def _no_vals(args):
+    return ()
+
+
+def _single_val(key):
+    # itemgetter() with a single key returns the bare value, not a tuple
+    def make_vals(args):
+        return (args[key],)
+
+    return make_vals
+
+
+@lru_cache(maxsize=PARAMSTYLE_CACHE_SIZE)
+def _parse_paramstyle(style, query):
+    """Rewrites the placeholders of query into PostgreSQL's $n form. Returns the
+    new statement and a function that takes the execute() args and returns the
+    values in $n order. Both only depend on (style, query), so the result is
+    memoised and repeated executions of a statement skip the scan below."""
+
     # I don't see any way to avoid scanning the query string char by char,
     # so we might as well take that careful approach and create a
     # state-based scanner.  We'll use int variables for the state.
@@ -384,11 +423,97 @@ def convert_paramstyle(style, query, args):
         prev_c = c
 
     if style in ("numeric", "qmark", "format"):
-        vals = args
+        make_vals = _positional_vals
+    elif len(placeholders) == 0:
+        make_vals = _no_vals
+    elif len(placeholders) == 1:
+        make_vals = _single_val(placeholders[0])
     else:
-        vals = tuple(args[p] for p in placeholders)
+        make_vals = itemgetter(*placeholders)
+
+    return "".join(output_query), make_vals
 
-    return "".join(output_query), vals
+
+# Limits for executemany(rewrite_inserts=True): rows per multi-row INSERT, and
+# the most parameters a Bind message can carry.
+REWRITE_INSERT_ROWS = 100
+MAX_BIND_PARAMETERS = 65535
+
+# INSERT INTO <table> [(<columns>)] VALUES (<values>) with nothing after it
+_SIMPLE_INSERT = re.compile(
+    r"\s*(INSERT\s+INTO\s+[^;]+?\s+VALUES)\s*\(([^()]*)\)\s*;?\s*",
+    re.IGNORECASE | re.DOTALL,
+)
+# A $n placeholder, optionally cast (e.g. $2::jsonb)
+_PLACEHOLDER_VALUE = re.compile(r"\s*\$(\d+)(::[\w .\[\]\"]+?)?\s*")
+
+
+@lru_cache(maxsize=PARAMSTYLE_CACHE_SIZE)
+def _insert_values_row(statement):
+    """For an INSERT whose VALUES list is exactly ($1, ..., $n) returns the part
+    up to VALUES and the casts of each value; None for any other statement."""
+    match = _SIMPLE_INSERT.fullmatch(statement)
+    if match is None:
+        return None
+    casts = []
+    for i, value in enumerate(match.group(2).split(","), start=1):
+        placeholder = _PLACEHOLDER_VALUE.fullmatch(value)
+        if placeholder is None or int(placeholder.group(1)) != i:
+            return None
+        casts.append(placeholder.group(2) or "")
+    return match.group(1), tuple(casts)
+
+
+def _multirow_insert(head, casts, rows):
+    n = len(casts)
+    return (
+        head
+        + " "
+        + ", ".join(
+            "("
+            + ", ".join(f"${r * n + i}{cast}" for i, cast in enumerate(casts, 1))
+            + ")"
+            for r in range(rows)
+        )
+    )
+
+
+def _param_set_list(param_sets):
+    # Parameter sets may be any iterables (even one-shot iterators); each is
+    # read once here, so it can be checked for emptiness and then bound
+    return [
+        parameters if isinstance(parameters, Sized) else tuple(parameters)
+        for parameters in param_sets
+    ]
+
+
+def _execute_many(connection, style, operation, param_sets, oids, rewrite_inserts):
+    statement, make_vals = _parse_paramstyle(style, operation)
+    vals_list = [make_vals(p) for p in param_sets]
+    values_row = _insert_values_row(statement) if rewrite_inserts else None
+    if values_row is None:
+        return connection.execute_many(statement, vals_list, oids)
+
+    # Send the parameter sets as multi-row INSERTs: all full-size chunks share
+    # one statement, and the last, shorter chunk gets its own.
+    head, casts = values_row
+    rows_per_insert = max(
+        1, min(REWRITE_INSERT_ROWS, MAX_BIND_PARAMETERS // len(casts))
+    )
+    chunks = [
+        vals_list[i : i + rows_per_insert]
+        for i in range(0, len(vals_list), rows_per_insert)
+    ]
+    row_count = 0
+    for rows, group in groupby(chunks, key=len):
+        context = connection.execute_many(
+            _multirow_insert(head, casts, rows),
+            [tuple(v for vals in chunk for v in vals) for chunk in group],
+            tuple(oids) * rows,
+        )
+        row_count += context.row_count
+    context.row_count = row_count
+    return context
 
 
 class Cursor:
@@ -470,7 +595,7 @@ class Cursor:
                 self._context = self._c.execute_simple(operation)
             else:
                 statement, vals = convert_paramstyle(paramstyle, operation, args)
-                self._context = self._c.execute_unnamed(
+                self._context = self._c.execute_cached(
                     statement, vals=vals, oids=self._input_oids, stream=stream
                 )
 
@@ -489,7 +614,7 @@ class Cursor:
 
         self.input_types = []
 
-    def executemany(self, operation, param_sets):
+    def executemany(self, operation, param_sets, rewrite_inserts=False):
         """Prepare a database operation, and then execute it against all
         parameter sequences or mappings provided.
 
@@ -502,20 +627,60 @@ class Cursor:
             A sequence of parameters to execute the statement with. The values
             in the sequence should be sequences or mappings of parameters, the
             same as the args argument of the :meth:`execute` method.
+        :param rewrite_inserts: This is a pg8000 extension. If ``True``, an
+            ``INSERT INTO ... VALUES (...)`` whose values are all placeholders
+            is sent as multi-row ``VALUES`` batches. Other statements are
+            executed as usual.
         """
-        rowcounts = []
-        input_oids = self._input_oids
-        for parameters in param_sets:
-            self._input_oids = input_oids
-            self.execute(operation, parameters)
-            rowcounts.append(self._context.row_count)
-
-        if len(rowcounts) == 0:
+        param_sets = _param_set_list(param_sets)
+        if len(param_sets) == 0:
             self._context = Context(None)
-        elif -1 in rowcounts:
-            self._context.row_count = -1
-        else:
-            self._context.row_count = sum(rowcounts)
+            return
+
+        if not all(param_sets):
+            # Statements without parameters go through the simple query protocol
+            rowcounts = []
+            input_oids = self._input_oids
+            for parameters in param_sets:
+                self._input_oids = input_oids
+                self.execute(operation, parameters)
+                rowcounts.append(self._context.row_count)
+
+            if -1 in rowcounts:
+                self._context.row_count = -1
+            else:
+                self._context.row_count = sum(rowcounts)
+            return
+
+        # One Parse, then the Bind/Execute pairs pipelined (see
+        # CoreConnection.execute_many)
+        try:
+            if not self._c._in_transaction and not self._c.autocommit:
+                self._c.execute_simple("begin transaction")
+
+            self._context = _execute_many(
+                self._c,
+                paramstyle,
+                operation,
+                param_sets,
+                self._input_oids,
+                rewrite_inserts,
+            )
+
+            if self._context.rows is None:
+                self._row_iter = None
+            else:
+                self._row_iter = iter(self._context.rows)
+            self._input_oids = ()
+        except AttributeError as e:
+            if self._c is None:
+                raise InterfaceError("Cursor closed")
+            elif self._c._sock is None:
+                raise InterfaceError("connection is closed")
+            else:
+                raise e
+
+        self.input_types = []
 
     def callproc(self, procname, parameters=None):
         args = [] if parameters is None else parameters
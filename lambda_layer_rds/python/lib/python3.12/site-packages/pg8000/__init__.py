@@ -108,6 +108,8 @@ def connect(
     application_name=None,
     replication=None,
     startup_params=None,
+    statement_cache_size=0,
+    binary_results=False,
 ):
     return Connection(
         user,
@@ -123,6 +125,8 @@ def connect(
         application_name=application_name,
         replication=replication,
         startup_params=startup_params,
+        statement_cache_size=statement_cache_size,
+        binary_results=binary_results,
     )
 
 
@@ -67,6 +67,8 @@ from pg8000.dbapi import (
     Timestamp,
     TimestampFromTicks,
     Warning,
+    _execute_many,
+    _param_set_list,
     convert_paramstyle,
 )
 from pg8000.exceptions import DatabaseError, Error, InterfaceError
@@ -126,6 +128,8 @@ def connect(
     application_name=None,
     replication=None,
     startup_params=None,
+    statement_cache_size=0,
+    binary_results=False,
 ):
     return Connection(
         user,
@@ -141,6 +145,8 @@ def connect(
         application_name=application_name,
         replication=replication,
         startup_params=startup_params,
+        statement_cache_size=statement_cache_size,
+        binary_results=binary_results,
     )
 
 
@@ -164,6 +170,23 @@ This property is part of the `DBAPI 2.0 specification
 paramstyle = "format"
 
 
+def _to_dbapi_error(e):
+    msg = e.args[0]
+    if isinstance(msg, dict):
+        response_code = msg["C"]
+
+        if response_code == "28000":
+            cls = InterfaceError
+        elif response_code == "23505":
+            cls = IntegrityError
+        else:
+            cls = ProgrammingError
+
+        return cls(msg)
+    else:
+        return ProgrammingError(msg)
+
+
 class Cursor:
     def __init__(self, connection, paramstyle=None):
         self._c = connection
@@ -253,7 +276,7 @@ class Cursor:
                 self._context = self._c.execute_simple(operation)
             else:
                 statement, vals = convert_paramstyle(self.paramstyle, operation, args)
-                self._context = self._c.execute_unnamed(
+                self._context = self._c.execute_cached(
                     statement, vals=vals, oids=self._input_oids, stream=stream
                 )
 
@@ -269,25 +292,12 @@ class Cursor:
             else:
                 raise e
         except DatabaseError as e:
-            msg = e.args[0]
-            if isinstance(msg, dict):
-                response_code = msg["C"]
-
-                if response_code == "28000":
-                    cls = InterfaceError
-                elif response_code == "23505":
-                    cls = IntegrityError
-                else:
-                    cls = ProgrammingError
-
-                raise cls(msg)
-            else:
-                raise ProgrammingError(msg)
+            raise _to_dbapi_error(e)
 
         self.input_types = []
         return self
 
-    def executemany(self, operation, param_sets):
+    def executemany(self, operation, param_sets, rewrite_inserts=False):
         """Prepare a database operation, and then execute it against all
         parameter sequences or mappings provided.
 
@@ -300,21 +310,61 @@ class Cursor:
             A sequence of parameters to execute the statement with. The values
             in the sequence should be sequences or mappings of parameters, the
             same as the args argument of the :meth:`execute` method.
+        :param rewrite_inserts: This is a pg8000 extension. If ``True``, an
+            ``INSERT INTO ... VALUES (...)`` whose values are all placeholders
+            is sent as multi-row ``VALUES`` batches. Other statements are
+            executed as usual.
         """
-        rowcounts = []
-        input_oids = self._input_oids
-        for parameters in param_sets:
-            self._input_oids = input_oids
-            self.execute(operation, parameters)
-            rowcounts.append(self._context.row_count)
-
-        if len(rowcounts) == 0:
+        param_sets = _param_set_list(param_sets)
+        if len(param_sets) == 0:
             self._context = Context(None)
-        elif -1 in rowcounts:
-            self._context.row_count = -1
-        else:
-            self._context.row_count = sum(rowcounts)
+            return self
+
+        if not all(param_sets):
+            # Statements without parameters go through the simple query protocol
+            rowcounts = []
+            input_oids = self._input_oids
+            for parameters in param_sets:
+                self._input_oids = input_oids
+                self.execute(operation, parameters)
+                rowcounts.append(self._context.row_count)
+
+            if -1 in rowcounts:
+                self._context.row_count = -1
+            else:
+                self._context.row_count = sum(rowcounts)
+            return self
 
+        # One Parse, then the Bind/Execute pairs pipelined (see
+        # CoreConnection.execute_many)
+        try:
+            if not self._c._in_transaction and not self._c.autocommit:
+                self._c.execute_simple("begin transaction")
+
+            self._context = _execute_many(
+                self._c,
+                self.paramstyle,
+                operation,
+                param_sets,
+                self._input_oids,
+                rewrite_inserts,
+            )
+
+            rows = [] if self._context.rows is None else self._context.rows
+            self._row_iter = iter(rows)
+
+            self._input_oids = ()
+        except AttributeError as e:
+            if self._c is None:
+                raise InterfaceError("Cursor closed")
+            elif self._c._sock is None:
+                raise InterfaceError("connection is closed")
+            else:
+                raise e
+        except DatabaseError as e:
+            raise _to_dbapi_error(e)
+
+        self.input_types = []
         return self
 
     def fetchone(self):
@@ -21,8 +21,6 @@ from stringprep import (
 )
 from uuid import uuid4
 
-from asn1crypto.x509 import Certificate
-
 from scramp.utils import b64dec, b64enc, h, hi, hmac, uenc, xor
 
 # https://tools.ietf.org/html/rfc5802
@@ -92,6 +90,10 @@ def _make_cb_data(name, ssl_socket):
         return ssl_socket.get_channel_binding(name)
 
     elif name == "tls-server-end-point":
+        # asn1crypto is only needed for tls-server-end-point channel binding,
+        # so it is imported on first use instead of with scramp.
+        from asn1crypto.x509 import Certificate
+
         cert_bin = ssl_socket.getpeercert(binary_form=True)
         cert = Certificate.load(cert_bin)
 
@@ -304,6 +304,89 @@ def uuid_in(data):
     return UUID(data)
 
 
+# Binary format ("recv") input functions. They take the value unpacked from
+# the wire and must return exactly what the text function for the same type
+# returns. Values outside Python's date range are turned into PostgreSQL's text
+# form and handed to the text function, which keeps them as strings.
+
+PG_EPOCH_DATE = Date(2000, 1, 1)
+PG_EPOCH = Datetime(2000, 1, 1)
+PG_EPOCH_TZ = Datetime(2000, 1, 1, tzinfo=Timezone.utc)
+MIN_INT4_VALUE, MAX_INT4_VALUE = -(2**31), 2**31 - 1
+MIN_INT8_VALUE, MAX_INT8_VALUE = -(2**63), 2**63 - 1
+
+
+def _pg_date_text(days):
+    # j2date() from PostgreSQL: proleptic Gregorian calendar, any year
+    julian = days + 2451545 + 32044
+    quad = julian // 146097
+    extra = (julian - quad * 146097) * 4 + 3
+    julian += 60 + quad * 3 + extra // 146097
+    quad = julian // 1461
+    julian -= quad * 1461
+    y = julian * 4 // 1461
+    julian = ((julian + 305) % 365 if y != 0 else (julian + 306) % 366) + 123
+    year = y + quad * 4 - 4800
+    quad = julian * 2141 // 65536
+    day = julian - 7834 * quad // 256
+    month = (quad + 10) % 12 + 1
+    if year <= 0:
+        return f"{1 - year:04d}-{month:02d}-{day:02d}", " BC"
+    return f"{year:04d}-{month:02d}-{day:02d}", ""
+
+
+def _pg_timestamp_text(microseconds, tz_suffix):
+    days, microseconds = divmod(microseconds, 86400000000)
+    seconds, fraction = divmod(microseconds, 1000000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    date_text, era = _pg_date_text(days)
+    fraction_text = f".{fraction:06d}".rstrip("0") if fraction else ""
+    return (
+        f"{date_text} {hours:02d}:{minutes:02d}:{seconds:02d}{fraction_text}"
+        f"{tz_suffix}{era}"
+    )
+
+
+def date_recv(days):
+    if days == MAX_INT4_VALUE:
+        return "infinity"
+    elif days == MIN_INT4_VALUE:
+        return "-infinity"
+    try:
+        return PG_EPOCH_DATE + Timedelta(days=days)
+    except OverflowError:
+        return date_in("".join(_pg_date_text(days)))
+
+
+def timestamp_recv(microseconds):
+    if microseconds == MAX_INT8_VALUE:
+        return "infinity"
+    elif microseconds == MIN_INT8_VALUE:
+        return "-infinity"
+    try:
+        return PG_EPOCH + Timedelta(microseconds=microseconds)
+    except OverflowError:
+        return timestamp_in(_pg_timestamp_text(microseconds, ""))
+
+
+def timestamptz_recv(microseconds):
+    # Only used when the session TimeZone is UTC, where the text form is
+    # "...+00" and timestamptz_in() returns the same UTC datetime
+    if microseconds == MAX_INT8_VALUE:
+        return "infinity"
+    elif microseconds == MIN_INT8_VALUE:
+        return "-infinity"
+    try:
+        return PG_EPOCH_TZ + Timedelta(microseconds=microseconds)
+    except OverflowError:
+        return timestamptz_in(_pg_timestamp_text(microseconds, "+00"))
+
+
+def uuid_recv(data):
+    return UUID(bytes=data)
+
+
 def _range_in(elem_func):
     def range_in(data):
         if data == "empty":
@@ -693,6 +776,24 @@ PG_TYPES = {
 }
 
 
+# Types that can be received in binary format, with the struct format of the
+# value and the recv function applied to it (None: the unpacked value as is).
+# bytea has no fixed size, so its format is None. float4 is left as text: its
+# binary value is the exact float32, not the short decimal that text gives.
+PG_BINARY_TYPES = {
+    BIGINT: ("q", None),  # int8
+    BOOLEAN: ("?", None),  # bool
+    BYTES: (None, None),  # bytea
+    DATE: ("i", date_recv),  # date
+    FLOAT: ("d", None),  # float8
+    INTEGER: ("i", None),  # int4
+    SMALLINT: ("h", None),  # int2
+    TIMESTAMP: ("q", timestamp_recv),  # timestamp
+    TIMESTAMPTZ: ("q", timestamptz_recv),  # timestamptz
+    UUID_TYPE: ("16s", uuid_recv),  # uuid
+}
+
+
 # PostgreSQL encodings:
 # https://www.postgresql.org/docs/current/multibyte.html
 #
@@ -1,5 +1,6 @@
 from collections import defaultdict
 from enum import Enum, auto
+from functools import lru_cache
 
 from pg8000.converters import (
     BIGINT,
@@ -89,7 +90,16 @@ class State(Enum):
     IN_DP = auto()  # inside dollar parameter eg. $1
 
 
+# Number of queries memoised by to_statement()
+STATEMENT_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
 def to_statement(query):
+    """Rewrites the :name and $n placeholders of query into PostgreSQL's $n
+    form. Returns the new statement and a function that takes the run()
+    keyword arguments and returns the values in $n order. The result only
+    depends on query, so it is memoised."""
     in_quote_escape = False
     placeholders = []
     output_query = []
@@ -192,8 +202,12 @@ def to_statement(query):
                 f"used for another purpose."
             )
 
+    placeholders = tuple(placeholders)
+    positional = any(isinstance(p, int) for p in placeholders)
+
     def make_vals(args):
-        arg_list = [v for _, v in args.items()]
+        # $n placeholders index the keyword arguments in the order given
+        arg_list = list(args.values()) if positional else None
         vals = []
         for p in placeholders:
             if isinstance(p, int):
@@ -0,0 +1,49 @@
+#requires -version 5.1
+$ErrorActionPreference = 'Stop'
+
+# Pillow has native extensions: the wheel must match the Lambda runtime
+# (python3.11 on x86_64 -> cp311 manylinux x86_64), not the build machine.
+$pythonTag = 'cp311'
+$platformPattern = 'manylinux.*x86_64'
+
+# Paths
+$root = (Get-Location).Path
+$layerDir = Join-Path $root 'lambda_layer_pillow'
+$pythonDir = Join-Path $layerDir 'python'
+$workDir = Join-Path $layerDir 'work'
+
+# Ensure directories
+New-Item -ItemType Directory -Force -Path $layerDir | Out-Null
+New-Item -ItemType Directory -Force -Path $pythonDir | Out-Null
+New-Item -ItemType Directory -Force -Path $workDir | Out-Null
+
+Write-Host "Fetching Pillow metadata from PyPI..."
+$meta = Invoke-RestMethod -UseBasicParsing -Uri 'https://pypi.org/pypi/Pillow/json'
+$version = $meta.info.version
+$releaseFiles = $meta.releases.$version
+$wheel = $releaseFiles | Where-Object {
+  $_.packagetype -eq 'bdist_wheel' -and $_.filename -match "-$pythonTag-$pythonTag-" -and $_.filename -match $platformPattern
+} | Select-Object -First 1
+if (-not $wheel) {
+  throw "No $pythonTag $platformPattern wheel found for Pillow $version"
+}
+
+# Download and extract wheel
+Write-Host ("Downloading Pillow wheel: {0}" -f $wheel.url)
+$wheelZip = Join-Path $workDir 'pillow.zip'
+Invoke-WebRequest -UseBasicParsing -Uri $wheel.url -OutFile $wheelZip
+$extract = Join-Path $workDir 'pillow_extracted'
+if (Test-Path $extract) { Remove-Item -Recurse -Force $extract }
+Expand-Archive -Force -LiteralPath $wheelZip -DestinationPath $extract
+
+# Assemble python/ structure (PIL, bundled shared libs and dist-info)
+Get-ChildItem -Path $extract -Directory | Where-Object { $_.Name -eq 'PIL' -or $_.Name -like 'pillow.libs' -or $_.Name -like 'pillow-*.dist-info' } | ForEach-Object {
+  Copy-Item -Recurse -Force $_.FullName $pythonDir
+}
+
+# Create ZIP
+$zipPath = Join-Path $layerDir 'pillow_layer.zip'
+if (Test-Path $zipPath) { Remove-Item -Force $zipPath }
+Write-Host ("Creating ZIP: {0}" -f $zipPath)
+Compress-Archive -Force -Path $pythonDir -DestinationPath $zipPath
+Write-Host ("Done. Layer ZIP at {0}" -f $zipPath)
@@ -0,0 +1,152 @@
+"""
+Cold-start benchmark for the UniScreen Lambda handlers.
+
+Each run starts a fresh interpreter (like a new Lambda container), imports the
+handler module and times it. That is the part of Lambda's "Init Duration" the
+code controls. With --database it also invokes the handler twice against a
+local Postgres: once cold (connection, lazy imports, first client) and once
+warm. The heavy dependencies already loaded after the import are listed, so a
+regression back to eager imports is easy to spot.
+
+    python scripts/cold_start_bench.py --runs 7
+    python scripts/cold_start_bench.py --database uniscreen --password postgres
+    python scripts/cold_start_bench.py --handler get_movies --importtime
+
+Notes:
+- The RDS secret lookup is bypassed locally, so the first invocation does not
+  include the Secrets Manager round trip.
+- login/signup are invoked with an empty body (400), which does not reach
+  Cognito.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDAS = os.path.join(ROOT, "special-topics", "src", "uniscreen", "lambdas")
+LAYERS = [
+    os.path.join(ROOT, "lambda_layer_rds", "python"),
+    os.path.join(ROOT, "special-topics", "src", "uniscreen", "layers", "common", "python"),
+]
+
+HEAVY_MODULES = ("boto3", "botocore", "pg8000", "scramp", "asn1crypto.x509", "urllib.request", "concurrent.futures", "PIL")
+
+CLAIMS = {"authorizer": {"claims": {"sub": "load-sub-000000", "email": "user000000@load.uniscreen.local"}}}
+HANDLERS = {
+    "get_movies": ("movies", {"httpMethod": "GET", "resource": "/movies", "queryStringParameters": {"limit": "50"},
+                              "requestContext": CLAIMS}),
+    "favorites": ("favorites", {"httpMethod": "GET", "resource": "/favorites", "headers": {}, "requestContext": CLAIMS}),
+    "login": ("auth", {"httpMethod": "POST", "resource": "/login", "body": "{}"}),
+    "signup": ("auth", {"httpMethod": "POST", "resource": "/signup", "body": "{}"}),
+    "monolith": ("", {"httpMethod": "GET", "resource": "/movies", "queryStringParameters": {"limit": "50"},
+                      "requestContext": CLAIMS}),
+    "poster_derivatives": ("posters", None),
+}
+
+# Runs in the fresh interpreter; prints one JSON line
+CHILD = r"""
+import json, os, sys, time
+spec = json.loads(sys.argv[1])
+sys.path[:0] = spec["path"]
+started = time.perf_counter()
+module = __import__(spec["module"])
+result = {"import_ms": (time.perf_counter() - started) * 1000,
+          "loaded": [m for m in spec["heavy"] if m in sys.modules]}
+if spec.get("event") is not None and spec.get("credentials"):
+    from uniscreen_common import rds
+    rds.DB.credentials_loader = lambda: tuple(spec["credentials"])
+    devnull, stdout = open(os.devnull, "w"), sys.stdout
+    timings = []
+    for _ in range(2):
+        sys.stdout = devnull
+        t0 = time.perf_counter()
+        res = module.lambda_handler(spec["event"], None)
+        timings.append((time.perf_counter() - t0) * 1000)
+        sys.stdout = stdout
+    result.update(first_ms=timings[0], warm_ms=timings[1], status=res["statusCode"],
+                  loaded_after_invoke=[m for m in spec["heavy"] if m in sys.modules])
+print(json.dumps(result))
+"""
+
+
+def run_child(name: str, credentials, importtime: bool = False) -> dict:
+    subdir, event = HANDLERS[name]
+    spec = {
+        "path": LAYERS + [os.path.join(LAMBDAS, subdir) if subdir else LAMBDAS],
+        "module": name,
+        "heavy": HEAVY_MODULES,
+        "event": event,
+        "credentials": credentials,
+    }
+    env = dict(os.environ, AWS_DEFAULT_REGION=os.environ.get("AWS_DEFAULT_REGION", "us-east-2"), DB_SSL="false")
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD, json.dumps(spec)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env, check=False)
+    if proc.returncode != 0:
+        raise SystemExit(f"{name}: child failed\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if importtime:
+        result["importtime"] = proc.stderr
+    return result
+
+
+def top_imports(raw: str, limit: int = 12):
+    # Lines: "import time: self [us] | cumulative | imported package"
+    rows = []
+    for line in raw.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, package = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), package.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--handler", action="append", choices=sorted(HANDLERS), help="repeatable; default: all")
+    parser.add_argument("--importtime", action="store_true", help="print the slowest imports (python -X importtime)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5432)
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "postgres"))
+    parser.add_argument("--database", help="also invoke each handler against this local database")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    credentials = [args.host, args.user, args.password, args.port, args.database] if args.database else None
+    report = {}
+    for name in args.handler or list(HANDLERS):
+        runs = [run_child(name, credentials) for _ in range(args.runs)]
+        entry = {
+            "import_ms": round(statistics.median(r["import_ms"] for r in runs), 1),
+            "loaded_at_import": runs[0]["loaded"],
+        }
+        if "first_ms" in runs[0]:
+            entry.update(
+                first_invoke_ms=round(statistics.median(r["first_ms"] for r in runs), 1),
+                warm_invoke_ms=round(statistics.median(r["warm_ms"] for r in runs), 1),
+                status=runs[0]["status"],
+                loaded_after_invoke=runs[0]["loaded_after_invoke"],
+            )
+        if args.importtime:
+            entry["top_imports"] = top_imports(run_child(name, credentials, importtime=True)["importtime"])
+        report[name] = entry
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"median of {args.runs} fresh interpreters per handler")
+    print(f"{'handler':<20}{'import ms':>10}{'1st call ms':>13}{'warm ms':>9}  heavy modules at import")
+    for name, e in report.items():
+        first = e.get("first_invoke_ms", "-")
+        warm = e.get("warm_invoke_ms", "-")
+        print(f"{name:<20}{e['import_ms']:>10}{first:>13}{warm:>9}  {', '.join(e['loaded_at_import']) or '-'}")
+        for cumulative_us, self_us, package in e.get("top_imports", []):
+            print(f"{'':<20}{cumulative_us / 1000:>10.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
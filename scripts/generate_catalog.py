@@ -0,0 +1,211 @@
+"""
+Deterministic synthetic catalog for load testing UniScreen.
+
+Generates movies, users and a Zipf-distributed set of favorites (a few movies
+are favorited by many users, most by almost none) in the JSONL format read by
+the admin_seed Lambda. The same --seed always produces the same dataset.
+
+Write a dataset file (upload it to S3 or package it under admin/seed_data/):
+
+    python scripts/generate_catalog.py --movies 100000 --users 10000 --out catalog.jsonl
+
+Or load it straight into a local Postgres through the seed Lambda's COPY path
+(no 30 s timeout, so 1M movies / 100k users is fine):
+
+    python scripts/generate_catalog.py --movies 1000000 --users 100000 \
+        --load --host 127.0.0.1 --user postgres --password postgres --database uniscreen
+"""
+import argparse
+import bisect
+import json
+import math
+import os
+import random
+import sys
+import time
+from typing import Iterator, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_DIR = os.path.join(ROOT, "special-topics", "src", "uniscreen", "lambdas", "admin")
+COMMON_LAYER = os.path.join(ROOT, "special-topics", "src", "uniscreen", "layers", "common", "python")
+PG8000_LAYER = os.path.join(ROOT, "lambda_layer_rds", "python")
+
+ADJECTIVES = [
+    "Silent", "Crimson", "Hidden", "Last", "Broken", "Golden", "Endless", "Dark", "Lost", "Wild",
+    "Frozen", "Electric", "Secret", "Burning", "Distant", "Hollow", "Iron", "Midnight", "Savage", "Velvet",
+]
+NOUNS = [
+    "River", "Empire", "Garden", "Signal", "Horizon", "Machine", "Kingdom", "Shadow", "Harbor", "Storm",
+    "Voyage", "Mirror", "Frontier", "Circus", "Orchard", "Station", "Labyrinth", "Summer", "Witness", "Tide",
+]
+ACTORS = [
+    "Ana Souza", "Bruno Lima", "Carla Mendes", "Diego Rocha", "Elisa Prado", "Fabio Nunes", "Gabriela Reis",
+    "Hugo Alves", "Isabel Costa", "Joao Pires", "Karina Duarte", "Lucas Freitas", "Marina Teixeira",
+]
+
+FIRST_YEAR = 1920
+LAST_YEAR = 2025
+MASK64 = (1 << 64) - 1
+
+
+def mix(i: int, salt: int) -> int:
+    """splitmix64: cheap, stateless per-index randomness (no per-movie RNG)."""
+    z = (i * 0x9E3779B97F4A7C15 + salt * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def unit(i: int, salt: int) -> float:
+    return mix(i, salt) / float(1 << 64)
+
+
+def movie_title(i: int) -> str:
+    # The index keeps (title, year) unique; the words give title_prefix searches realistic fan-out
+    return f"{ADJECTIVES[mix(i, 1) % len(ADJECTIVES)]} {NOUNS[mix(i, 2) % len(NOUNS)]} {i}"
+
+
+def movie_year(i: int) -> int:
+    # Skewed towards recent years, like a real catalog
+    age = int(-20.0 * math.log(1.0 - unit(i, 3)))
+    return max(FIRST_YEAR, LAST_YEAR - age)
+
+
+def movie_director(i: int, directors: int) -> str:
+    # Quadratic skew: a few prolific directors, a long tail of one-film ones
+    return f"Director {int(directors * unit(i, 4) ** 2):05d}"
+
+
+def user_email(u: int) -> str:
+    return f"user{u:06d}@load.uniscreen.local"
+
+
+def user_sub(u: int) -> str:
+    # Cognito sub used by scripts/load_test.py for the same user
+    return f"load-sub-{u:06d}"
+
+
+def movie_record(i: int, directors: int) -> dict:
+    first = mix(i, 10) % len(ACTORS)
+    cast = ", ".join(ACTORS[(first + 4 * k) % len(ACTORS)] for k in range(3))
+    return {
+        "type": "movie",
+        "title": movie_title(i),
+        "year": movie_year(i),
+        "director": movie_director(i, directors),
+        "actors": cast,
+        "plot": f"Synthetic plot #{i} for load testing.",
+        "poster_url": "",
+    }
+
+
+class ZipfSampler:
+    """Samples movie indexes with P(rank k) ~ 1 / k^s; ranks are scattered over the ids."""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.n = n
+        self.rng = rng
+        total = 0.0
+        self.cumulative: List[float] = []
+        for k in range(1, n + 1):
+            total += 1.0 / (k ** s)
+            self.cumulative.append(total)
+        self.total = total
+        # Multiplier coprime with n: rank -> index is a permutation, so popular
+        # movies are not simply the first ones inserted
+        step = 2654435761 % n or 1
+        while math.gcd(step, n) != 1:
+            step += 1
+        self.step = step
+
+    def sample(self) -> int:
+        rank = bisect.bisect_left(self.cumulative, self.rng.random() * self.total)
+        return (min(rank, self.n - 1) * self.step) % self.n
+
+
+def generate(movies: int, users: int, mean_favorites: float, max_favorites: int,
+             zipf_s: float, seed: int) -> Iterator[dict]:
+    directors = max(1, movies // 50)
+    for i in range(movies):
+        yield movie_record(i, directors)
+
+    for u in range(users):
+        yield {"type": "user", "email": user_email(u)}
+
+    if users == 0 or movies == 0:
+        return
+    rng = random.Random(seed)
+    sampler = ZipfSampler(movies, zipf_s, rng)
+    for u in range(users):
+        count = min(max_favorites, movies, int(rng.expovariate(1.0 / mean_favorites)))
+        picked = set()
+        while len(picked) < count:
+            picked.add(sampler.sample())
+        for i in sorted(picked):
+            yield {"type": "favorite", "email": user_email(u), "title": movie_title(i), "year": movie_year(i)}
+
+
+def load(records: Iterator[dict], args) -> dict:
+    """Loads through admin_seed's spool + COPY + merge path."""
+    sys.path[:0] = [PG8000_LAYER, COMMON_LAYER, ADMIN_DIR]
+    import pg8000
+    import admin_seed
+
+    staged = admin_seed.write_staging_files(records)
+    try:
+        conn = pg8000.connect(
+            user=args.user, password=args.password, host=args.host, port=args.port,
+            database=args.database, ssl_context=True if args.ssl else None,
+        )
+        try:
+            return admin_seed.load_dataset(conn, staged)
+        finally:
+            conn.close()
+    finally:
+        for f, _ in staged.values():
+            f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movies", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--mean-favorites", type=float, default=12.0, help="mean favorites per user (exponential)")
+    parser.add_argument("--max-favorites", type=int, default=500)
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent for movie popularity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="JSONL output path ('-' for stdout)")
+    parser.add_argument("--load", action="store_true", help="COPY into Postgres instead of writing a file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5432)
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "postgres"))
+    parser.add_argument("--database", default="postgres")
+    parser.add_argument("--ssl", action="store_true")
+    args = parser.parse_args()
+
+    if not args.load and not args.out:
+        parser.error("use --out FILE or --load")
+
+    started = time.monotonic()
+    records = generate(args.movies, args.users, args.mean_favorites, args.max_favorites, args.zipf_s, args.seed)
+    if args.load:
+        result = load(records, args)
+    else:
+        out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+        rows = 0
+        try:
+            for record in records:
+                out.write(json.dumps(record) + "\n")
+                rows += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        result = {"rows_written": rows, "out": args.out}
+
+    result["seconds"] = round(time.monotonic() - started, 2)
+    print(json.dumps(result), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
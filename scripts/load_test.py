@@ -0,0 +1,291 @@
+"""
+In-process load test for the UniScreen handlers against a local Postgres.
+
+Imports the movies and favorites Lambda modules directly, points their
+ConnectionManager at the given database (DB_SSL=false unless --ssl) and
+replays a weighted mix of requests, one at a time like a single warm Lambda
+container. Reports p50/p95/p99 latency and database queries per request for
+each scenario.
+
+Load a catalog first (users and subs match scripts/generate_catalog.py):
+
+    python scripts/generate_catalog.py --movies 100000 --users 10000 --load --database uniscreen
+    python scripts/load_test.py --database uniscreen --requests 5000
+
+Scenarios (--mix name=weight,...):
+  list_movies           GET /movies, following next_page_token now and then
+  list_movies_filtered  GET /movies with year / director / title_prefix
+  list_favorites        GET /favorites for a Zipf-chosen user
+  add_favorite          POST /favorites {"movie_id": ...}
+  remove_favorite       POST /favorites {"movie_id": ..., "action": "remove"}
+  upsert_movie          get_movies.upsert_movie (the OMDb/S3 part is not exercised)
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDAS = os.path.join(ROOT, "special-topics", "src", "uniscreen", "lambdas")
+sys.path[:0] = [
+    os.path.join(ROOT, "lambda_layer_rds", "python"),
+    os.path.join(ROOT, "special-topics", "src", "uniscreen", "layers", "common", "python"),
+    os.path.join(LAMBDAS, "movies"),
+    os.path.join(LAMBDAS, "favorites"),
+]
+
+from generate_catalog import user_email, user_sub  # noqa: E402
+
+DEFAULT_MIX = "list_movies=35,list_movies_filtered=15,list_favorites=30,add_favorite=10,remove_favorite=5,upsert_movie=5"
+TRANSACTION_CONTROL = ("begin transaction", "commit", "rollback")
+
+
+class QueryCounter:
+    """Counts statements sent by pg8000 (transaction control excluded)."""
+
+    def __init__(self):
+        self.count = 0
+        self._depth = 0
+
+    def install(self):
+        from pg8000.core import CoreConnection
+
+        counter = self
+
+        def counted(execute):
+            def wrapper(conn, statement, *args, **kwargs):
+                # execute_cached() falls back to execute_unnamed(): count the outer call only
+                if counter._depth == 0 and statement.strip().lower() not in TRANSACTION_CONTROL:
+                    counter.count += 1
+                counter._depth += 1
+                try:
+                    return execute(conn, statement, *args, **kwargs)
+                finally:
+                    counter._depth -= 1
+            return wrapper
+
+        # commit()/rollback() go through execute_unnamed, "begin" through execute_simple,
+        # cursor.execute() with parameters through execute_cached
+        for name in ("execute_simple", "execute_unnamed", "execute_cached"):
+            setattr(CoreConnection, name, counted(getattr(CoreConnection, name)))
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    k = max(0, math.ceil(p / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def movies_event(u: int, params: dict) -> dict:
+    return {
+        "httpMethod": "GET",
+        "queryStringParameters": params,
+        "requestContext": {"authorizer": {"claims": {"sub": user_sub(u), "email": user_email(u)}}},
+    }
+
+
+def favorites_event(u: int, method: str, body=None) -> dict:
+    return {
+        "httpMethod": method,
+        "headers": {},
+        "requestContext": {"authorizer": {"claims": {"sub": user_sub(u), "email": user_email(u)}}},
+        "body": json.dumps(body) if body is not None else None,
+    }
+
+
+def build_scenarios(get_movies, favorites, rng: random.Random, catalog: dict) -> Dict[str, Callable[[], dict]]:
+    min_id, max_id = catalog["min_id"], catalog["max_id"]
+    users = catalog["users"]
+    directors = catalog["directors"]
+    page_tokens: List[str] = []
+
+    def pick_user() -> int:
+        # Roughly Zipf over users too: a few very active ones
+        return min(users - 1, int(users * rng.random() ** 3))
+
+    def pick_movie() -> int:
+        return rng.randint(min_id, max_id)
+
+    def list_movies():
+        params = {"limit": str(rng.choice((20, 50, 100)))}
+        if page_tokens and rng.random() < 0.3:
+            params["page_token"] = page_tokens.pop()
+        res = get_movies.lambda_handler(movies_event(pick_user(), params), None)
+        token = json.loads(res["body"]).get("next_page_token") if res["statusCode"] == 200 else None
+        if token:
+            page_tokens.append(token)
+            del page_tokens[:-100]
+        return res
+
+    def list_movies_filtered():
+        choice = rng.random()
+        if choice < 0.4:
+            params = {"year": str(rng.randint(1990, 2025))}
+        elif choice < 0.7 and directors:
+            params = {"director": rng.choice(directors)}
+        else:
+            params = {"title_prefix": rng.choice(("Silent", "Crimson R", "Lost", "Dark H", "Iron"))}
+        return get_movies.lambda_handler(movies_event(pick_user(), params), None)
+
+    def list_favorites():
+        return favorites.lambda_handler(favorites_event(pick_user(), "GET"), None)
+
+    def add_favorite():
+        return favorites.lambda_handler(favorites_event(pick_user(), "POST", {"movie_id": pick_movie()}), None)
+
+    def remove_favorite():
+        body = {"movie_id": pick_movie(), "action": "remove"}
+        return favorites.lambda_handler(favorites_event(pick_user(), "POST", body), None)
+
+    def upsert_movie():
+        i = rng.randint(0, 10_000)
+
+        def run(conn):
+            movie = get_movies.upsert_movie(conn, f"Load Test Upsert {i}", 2000 + i % 25, "Director LT",
+                                            "Someone", "Upserted by load_test.py", None)
+            conn.commit()
+            return movie
+
+        get_movies.DB.begin_invocation()
+        get_movies.DB.call(run)
+        return {"statusCode": 200}
+
+    return {
+        "list_movies": list_movies,
+        "list_movies_filtered": list_movies_filtered,
+        "list_favorites": list_favorites,
+        "add_favorite": add_favorite,
+        "remove_favorite": remove_favorite,
+        "upsert_movie": upsert_movie,
+    }
+
+
+def describe_catalog(conn, max_users: int) -> dict:
+    with conn.cursor() as cur:
+        cur.execute("SELECT MIN(id), MAX(id) FROM public.movies")
+        min_id, max_id = cur.fetchone()
+        cur.execute("SELECT COUNT(*) FROM public.users WHERE email LIKE %s", ("%@load.uniscreen.local",))
+        (users,) = cur.fetchone()
+        cur.execute("SELECT director FROM public.movies WHERE director IS NOT NULL GROUP BY director ORDER BY COUNT(*) DESC LIMIT 50")
+        directors = [r[0] for r in cur.fetchall()]
+    conn.rollback()
+    if min_id is None:
+        raise SystemExit("public.movies is empty: load a catalog with scripts/generate_catalog.py --load first")
+    return {"min_id": min_id, "max_id": max_id, "users": max(1, min(users, max_users)), "directors": directors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5432)
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "postgres"))
+    parser.add_argument("--database", default="postgres")
+    parser.add_argument("--ssl", action="store_true")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50, help="requests excluded from the statistics")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--max-users", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-favorites-cache", action="store_true", help="measure every GET /favorites against the database")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if not args.ssl:
+        os.environ["DB_SSL"] = "false"
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-2")
+
+    import get_movies
+    import favorites
+    from favorites_cache import FavoritesCache
+
+    credentials = (args.host, args.user, args.password, args.port, args.database)
+    for module in (get_movies, favorites):
+        module.DB.credentials_loader = lambda: credentials
+    if args.no_favorites_cache:
+        favorites.FAVORITES_CACHE = FavoritesCache(memory_ttl=0)
+
+    counter = QueryCounter()
+    counter.install()
+
+    with get_movies.DB.connection() as conn:
+        catalog = describe_catalog(conn, args.max_users)
+
+    rng = random.Random(args.seed)
+    scenarios = build_scenarios(get_movies, favorites, rng, catalog)
+    mix = parse_mix(args.mix)
+    unknown = [name for name in mix if name not in scenarios]
+    if unknown:
+        parser.error("unknown scenario(s): " + ", ".join(unknown))
+    names = list(mix)
+    weights = [mix[n] for n in names]
+
+    results = {name: {"latencies": [], "queries": 0, "errors": 0} for name in names}
+    # The handlers log one db_connections line per invocation; keep the report readable
+    devnull = open(os.devnull, "w")
+    stdout = sys.stdout
+    started = time.monotonic()
+    try:
+        for n in range(args.warmup + args.requests):
+            name = rng.choices(names, weights)[0]
+            before = counter.count
+            t0 = time.perf_counter()
+            sys.stdout = devnull
+            try:
+                res = scenarios[name]()
+                failed = res.get("statusCode", 500) >= 500
+            except Exception:
+                failed = True
+            finally:
+                sys.stdout = stdout
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            if n < args.warmup:
+                continue
+            r = results[name]
+            r["latencies"].append(elapsed_ms)
+            r["queries"] += counter.count - before
+            r["errors"] += int(failed)
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+    wall = time.monotonic() - started
+
+    report = {"requests": args.requests, "seconds": round(wall, 2), "catalog": {k: catalog[k] for k in ("min_id", "max_id", "users")}, "scenarios": {}}
+    for name in names:
+        r = results[name]
+        lat = sorted(r["latencies"])
+        count = len(lat)
+        report["scenarios"][name] = {
+            "count": count,
+            "errors": r["errors"],
+            "p50_ms": round(percentile(lat, 50), 2),
+            "p95_ms": round(percentile(lat, 95), 2),
+            "p99_ms": round(percentile(lat, 99), 2),
+            "queries_per_request": round(r["queries"] / count, 2) if count else 0.0,
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{args.requests} requests in {report['seconds']}s ({args.requests / wall:.0f} req/s)")
+    print(f"{'scenario':<22}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries/req':>13}")
+    for name, s in report["scenarios"].items():
+        print(f"{name:<22}{s['count']:>7}{s['errors']:>8}{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}{s['queries_per_request']:>13}")
+
+
+if __name__ == "__main__":
+    main()
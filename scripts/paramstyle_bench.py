@@ -0,0 +1,84 @@
+"""
+Micro-benchmark for pg8000's paramstyle conversion (no database needed).
+
+Every cursor.execute() with parameters rewrites the query's placeholders into
+PostgreSQL's $n form. The conversion is memoised per (paramstyle, query); this
+compares the memoised path with the character-by-character scan it replaces,
+using the shape of the queries the UniScreen Lambdas send.
+
+    python scripts/paramstyle_bench.py
+    python scripts/paramstyle_bench.py --number 50000 --repeat 7
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lambda_layer_rds", "python"))
+
+from pg8000 import dbapi, native  # noqa: E402
+
+# (name, paramstyle, query, args); the SQL follows favorites.py / get_movies.py
+CASES = [
+    ("list_favorites", "format", """
+      SELECT m.id, m.title, m.year, m.director, m.actors, m.plot, m.poster_url, m.poster_variants
+      FROM public.favorites f
+      JOIN public.movies m ON m.id = f.movie_id
+      WHERE f.user_id = %s
+      ORDER BY m.title
+      """, (42,)),
+    ("add_favorites", "format", """
+      INSERT INTO public.favorites (user_id, movie_id)
+      SELECT %s, m.id
+      FROM public.movies m
+      WHERE m.id = ANY(%s::bigint[])
+      ON CONFLICT (user_id, movie_id) DO UPDATE SET user_id = EXCLUDED.user_id
+      RETURNING movie_id, (xmax = 0) AS inserted
+      """, (42, [1, 2, 3])),
+    ("list_movies", "format",
+     "SELECT id, title, year, director FROM public.movies WHERE id > %s AND year = %s ORDER BY id LIMIT %s",
+     (1000, 1999, 51)),
+    ("named", "named",
+     "SELECT id FROM public.movies WHERE year = :year AND director = :director AND id > :after ORDER BY id",
+     {"year": 1999, "director": "x", "after": 0}),
+]
+
+
+def scan_convert(style, query, args):
+    # The conversion without memoisation: scan the query on every call
+    statement, make_vals = dbapi._parse_paramstyle.__wrapped__(style, query)
+    return statement, make_vals(args)
+
+
+def scan_to_statement(query):
+    return native.to_statement.__wrapped__(query)
+
+
+def best_us(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (the best one is reported)")
+    args = parser.parse_args()
+
+    print(f"best of {args.repeat} x {args.number} calls, microseconds per call")
+    print(f"{'case':<16}{'chars':>7}{'scan us':>10}{'memo us':>10}{'speedup':>9}")
+    for name, style, query, params in CASES:
+        assert scan_convert(style, query, params) == dbapi.convert_paramstyle(style, query, params)
+        scan = best_us(lambda: scan_convert(style, query, params), args.number, args.repeat)
+        memo = best_us(lambda: dbapi.convert_paramstyle(style, query, params), args.number, args.repeat)
+        print(f"{name:<16}{len(query):>7}{scan:>10.2f}{memo:>10.2f}{scan / memo:>8.1f}x")
+
+    # pg8000.native (Connection.run) uses its own :name converter
+    name, _, query, params = CASES[-1]
+    scan = best_us(lambda: scan_to_statement(query)[1](params), args.number, args.repeat)
+    memo = best_us(lambda: native.to_statement(query)[1](params), args.number, args.repeat)
+    print(f"{'native ' + name:<16}{len(query):>7}{scan:>10.2f}{memo:>10.2f}{scan / memo:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- UniScreen schema: case-insensitive title prefix search (GET /movies?title_prefix=...)
+-- text_pattern_ops lets "lower(title) LIKE 'abc%'" use the index under any collation.
+-- Built CONCURRENTLY so writes to public.movies are not blocked.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_movies_title_prefix ON public.movies (lower(title) text_pattern_ops);
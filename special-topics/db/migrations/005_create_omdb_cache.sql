@@ -0,0 +1,10 @@
+-- UniScreen schema: OMDb response cache (read-through cache in front of omdbapi.com)
+-- title_key is the normalized (trimmed, casefolded) title; "not found" answers
+-- are cached too (found = false) with a shorter expires_at.
+CREATE TABLE IF NOT EXISTS public.omdb_cache (
+    title_key   TEXT PRIMARY KEY,
+    found       BOOLEAN NOT NULL,
+    response    JSONB NOT NULL,
+    fetched_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at  TIMESTAMPTZ NOT NULL
+);
@@ -0,0 +1,22 @@
+-- UniScreen schema: merge duplicate movies (title, year) before the unique
+-- index of 006_movies_unique_title_year is built.
+-- Duplicate rows are merged into the lowest id. Favorites pointing at a
+-- duplicate are copied to the surviving row first; the ON DELETE CASCADE then
+-- removes the old favorite rows.
+INSERT INTO public.favorites (user_id, movie_id, created_at)
+SELECT f.user_id, d.keep_id, MIN(f.created_at)
+FROM public.favorites f
+JOIN (
+    SELECT id, MIN(id) OVER (PARTITION BY title, COALESCE(year, -1)) AS keep_id
+    FROM public.movies
+) d ON d.id = f.movie_id
+WHERE d.id <> d.keep_id
+GROUP BY f.user_id, d.keep_id
+ON CONFLICT (user_id, movie_id) DO NOTHING;
+
+DELETE FROM public.movies m
+USING (
+    SELECT id, MIN(id) OVER (PARTITION BY title, COALESCE(year, -1)) AS keep_id
+    FROM public.movies
+) d
+WHERE m.id = d.id AND d.id <> d.keep_id;
@@ -0,0 +1,17 @@
+-- UniScreen schema: resolve users by Cognito sub instead of email
+-- The favorites lambda used to synthesize "{sub}@cognito.local" when the token
+-- had no email claim; users are now keyed by sub and email becomes optional.
+ALTER TABLE public.users ADD COLUMN IF NOT EXISTS cognito_sub TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_users_cognito_sub ON public.users (cognito_sub);
+
+ALTER TABLE public.users ALTER COLUMN email DROP NOT NULL;
+
+-- Link rows created with the synthetic fallback email to their sub
+UPDATE public.users
+SET cognito_sub = split_part(email, '@', 1)
+WHERE cognito_sub IS NULL
+  AND email LIKE '%@cognito.local'
+  AND NOT EXISTS (
+    SELECT 1 FROM public.users u2 WHERE u2.cognito_sub = split_part(public.users.email, '@', 1)
+  );
@@ -0,0 +1,6 @@
+-- migrate: no-transaction
+-- UniScreen schema: index for GET /movies?director=... (list_movies filters by
+-- director and pages by id). Built CONCURRENTLY so writes to public.movies are
+-- not blocked; the runner executes this file outside a transaction and drops
+-- an INVALID leftover from an interrupted build before retrying.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_movies_director_id ON public.movies (director, id);
@@ -9,7 +9,8 @@ resource "aws_api_gateway_method" "api_method" {
   rest_api_id   = var.rest_api_id
   resource_id   = aws_api_gateway_resource.api_resource.id
   http_method   = each.value
-  authorization = "COGNITO_USER_POOLS"
+  # authorizer_id = null: no API Gateway authorizer, the Lambda verifies the JWT itself
+  authorization = var.authorizer_id != null ? "COGNITO_USER_POOLS" : "NONE"
   authorizer_id = var.authorizer_id
 }
 
@@ -25,7 +26,7 @@ resource "aws_api_gateway_integration" "api_integration" {
 
 resource "aws_lambda_permission" "lambda_permission" {
   for_each      = toset(var.http_methods)
-  statement_id  = "AllowAPIGatewayInvoke-${each.value}"
+  statement_id  = "AllowAPIGatewayInvoke-${each.value}-${replace(var.path_full, "/", "-")}"
   action        = "lambda:InvokeFunction"
   function_name = var.lambda_function_names[each.value]
   principal     = "apigateway.amazonaws.com"
@@ -30,7 +30,7 @@ variable "lambda_function_names" {
 }
 
 variable "authorizer_id" {
-  description = "The ID of the API Gateway authorizer"
+  description = "The ID of the API Gateway authorizer (null: methods without authorizer, the Lambda must authenticate)"
   type        = string
 }
 
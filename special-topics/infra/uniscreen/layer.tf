@@ -6,3 +6,27 @@ resource "aws_lambda_layer_version" "pg8000" {
   compatible_runtimes = ["python3.11", "python3.12"]
   description         = "pg8000 client library and dependencies"
 }
+
+# Shared UniScreen code (src/uniscreen/layers/common/python/uniscreen_common)
+data "archive_file" "uniscreen_common_layer" {
+  type        = "zip"
+  source_dir  = "${path.root}/src/uniscreen/layers/common"
+  output_path = "${path.module}/zip/uniscreen_common_layer.zip"
+}
+
+resource "aws_lambda_layer_version" "uniscreen_common" {
+  layer_name          = "${replace(var.project, "_", "-")}-${replace(var.environment, "_", "-")}-uniscreen-common"
+  filename            = data.archive_file.uniscreen_common_layer.output_path
+  source_code_hash    = data.archive_file.uniscreen_common_layer.output_base64sha256
+  compatible_runtimes = ["python3.11", "python3.12"]
+  description         = "Shared UniScreen helpers (router, connection manager, caches)"
+}
+
+# Pillow for poster derivatives (built offline into lambda_layer_pillow/pillow_layer.zip
+# by scripts/build_pillow_layer.ps1)
+resource "aws_lambda_layer_version" "pillow" {
+  layer_name          = "${replace(var.project, "_", "-")}-${replace(var.environment, "_", "-")}-pillow"
+  filename            = abspath("${path.module}/../../../lambda_layer_pillow/pillow_layer.zip")
+  compatible_runtimes = ["python3.11"]
+  description         = "Pillow (manylinux x86_64, cp311) for poster thumbnails"
+}
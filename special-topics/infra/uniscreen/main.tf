@@ -236,6 +236,7 @@ module "signup_lambda" {
   handler              = "signup.lambda_handler"
   lambda_function_name = "${var.project}-${var.environment}-signup"
   runtime              = "python3.11"
+  layers               = [aws_lambda_layer_version.uniscreen_common.arn]
   timeout              = 10
 
   vpc_config = null
@@ -255,6 +256,7 @@ module "login_lambda" {
   handler              = "login.lambda_handler"
   lambda_function_name = "${var.project}-${var.environment}-login"
   runtime              = "python3.11"
+  layers               = [aws_lambda_layer_version.uniscreen_common.arn]
   timeout              = 10
 
   vpc_config = null
@@ -274,24 +276,96 @@ module "movies_lambda" {
   handler              = "get_movies.lambda_handler"
   lambda_function_name = "${var.project}-${var.environment}-get-movies"
   runtime              = "python3.11"
-  layers               = [aws_lambda_layer_version.pg8000.arn]
+  layers               = [aws_lambda_layer_version.pg8000.arn, aws_lambda_layer_version.uniscreen_common.arn]
   timeout              = 20
 
   vpc_config = null
 
   environment_variables = {
-    PROJECT_NAME    = var.project
-    ENVIRONMENT     = var.environment
-    DB_ENDPOINT     = var.db_endpoint
-    DB_NAME         = var.db_name
-    DB_PORT         = tostring(var.db_port)
-    RDS_SECRET_ID   = var.rds_secret_id
-    REGION          = var.region
-    POSTERS_BUCKET  = aws_s3_bucket.posters.bucket
-    OMDB_SECRET_ARN = var.omdb_api_key_secret_arn
+    PROJECT_NAME        = var.project
+    ENVIRONMENT         = var.environment
+    DB_ENDPOINT         = var.db_endpoint
+    DB_NAME             = var.db_name
+    DB_PORT             = tostring(var.db_port)
+    RDS_SECRET_ID       = var.rds_secret_id
+    REGION              = var.region
+    POSTERS_BUCKET      = aws_s3_bucket.posters.bucket
+    OMDB_SECRET_ARN     = var.omdb_api_key_secret_arn
+    USER_POOL_ID        = aws_cognito_user_pool.uniscreen.id
+    USER_POOL_CLIENT_ID = aws_cognito_user_pool_client.uniscreen_client.id
+
+    POSTER_DERIVATIVES_FUNCTION = module.poster_derivatives_lambda.lambda_function_name
+  }
+}
+
+# Poster derivatives: invoked by movie imports + scheduled backfill
+module "poster_derivatives_lambda" {
+  source               = "../consumer/modules/lambda/dynamic_lambda"
+  lambda_role_arn      = aws_iam_role.uniscreen_lambda_role.arn
+  source_dir           = "${path.root}/src/uniscreen/lambdas/posters"
+  handler              = "poster_derivatives.lambda_handler"
+  lambda_function_name = "${var.project}-${var.environment}-poster-derivatives"
+  runtime              = "python3.11"
+  layers = [
+    aws_lambda_layer_version.pg8000.arn,
+    aws_lambda_layer_version.uniscreen_common.arn,
+    aws_lambda_layer_version.pillow.arn,
+  ]
+  timeout = 60
+
+  vpc_config = null
+
+  environment_variables = {
+    DB_ENDPOINT    = var.db_endpoint
+    DB_NAME        = var.db_name
+    DB_PORT        = tostring(var.db_port)
+    RDS_SECRET_ID  = var.rds_secret_id
+    REGION         = var.region
+    POSTERS_BUCKET = aws_s3_bucket.posters.bucket
   }
 }
 
+# Movie imports invoke the function asynchronously after their upsert commits.
+# No S3 ObjectCreated trigger: it fired before the movie row was committed, so
+# the poster_variants UPDATE matched no rows.
+resource "aws_iam_role_policy" "uniscreen_invoke_poster_derivatives" {
+  name = "${replace(var.project, "_", "-")}-${replace(var.environment, "_", "-")}-invoke-poster-derivatives"
+  role = aws_iam_role.uniscreen_lambda_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17",
+    Statement = [
+      {
+        Sid      = "InvokePosterDerivatives",
+        Effect   = "Allow",
+        Action   = ["lambda:InvokeFunction"],
+        Resource = module.poster_derivatives_lambda.lambda_function_arn
+      }
+    ]
+  })
+}
+
+# Backfill for posters imported before the async invocation existed (or whose
+# invocation failed)
+resource "aws_cloudwatch_event_rule" "poster_derivatives_backfill" {
+  name                = "${replace(var.project, "_", "-")}-${replace(var.environment, "_", "-")}-poster-derivatives-backfill"
+  schedule_expression = "rate(1 hour)"
+}
+
+resource "aws_cloudwatch_event_target" "poster_derivatives_backfill" {
+  rule  = aws_cloudwatch_event_rule.poster_derivatives_backfill.name
+  arn   = module.poster_derivatives_lambda.lambda_function_arn
+  input = jsonencode({ action = "backfill", limit = 50 })
+}
+
+resource "aws_lambda_permission" "poster_derivatives_events" {
+  statement_id  = "AllowEventBridgeInvokePosterDerivatives"
+  action        = "lambda:InvokeFunction"
+  function_name = module.poster_derivatives_lambda.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.poster_derivatives_backfill.arn
+}
+
 # Favorites: GET/POST /favorites
 module "favorites_lambda" {
   source               = "../consumer/modules/lambda/dynamic_lambda"
@@ -300,19 +374,21 @@ module "favorites_lambda" {
   handler              = "favorites.lambda_handler"
   lambda_function_name = "${var.project}-${var.environment}-favorites"
   runtime              = "python3.11"
-  layers               = [aws_lambda_layer_version.pg8000.arn]
+  layers               = [aws_lambda_layer_version.pg8000.arn, aws_lambda_layer_version.uniscreen_common.arn]
   timeout              = 15
 
   vpc_config = local.vpc_config
 
   environment_variables = {
-    PROJECT_NAME  = var.project
-    ENVIRONMENT   = var.environment
-    DB_ENDPOINT   = var.db_endpoint
-    DB_NAME       = var.db_name
-    DB_PORT       = tostring(var.db_port)
-    RDS_SECRET_ID = var.rds_secret_id
-    REGION        = var.region
+    PROJECT_NAME        = var.project
+    ENVIRONMENT         = var.environment
+    DB_ENDPOINT         = var.db_endpoint
+    DB_NAME             = var.db_name
+    DB_PORT             = tostring(var.db_port)
+    RDS_SECRET_ID       = var.rds_secret_id
+    REGION              = var.region
+    USER_POOL_ID        = aws_cognito_user_pool.uniscreen.id
+    USER_POOL_CLIENT_ID = aws_cognito_user_pool_client.uniscreen_client.id
   }
 }
 
@@ -324,7 +400,7 @@ module "admin_migrate_lambda" {
   handler              = "admin_migrate.lambda_handler"
   lambda_function_name = "${var.project}-${var.environment}-admin-migrate"
   runtime              = "python3.12"
-  layers               = [aws_lambda_layer_version.pg8000.arn]
+  layers               = [aws_lambda_layer_version.pg8000.arn, aws_lambda_layer_version.uniscreen_common.arn]
   timeout              = 30
 
   vpc_config = local.vpc_config
@@ -346,7 +422,7 @@ module "admin_seed_lambda" {
   handler              = "admin_seed.lambda_handler"
   lambda_function_name = "${var.project}-${var.environment}-admin-seed"
   runtime              = "python3.12"
-  layers               = [aws_lambda_layer_version.pg8000.arn]
+  layers               = [aws_lambda_layer_version.pg8000.arn, aws_lambda_layer_version.uniscreen_common.arn]
   timeout              = 30
 
   vpc_config = local.vpc_config
@@ -360,6 +436,53 @@ module "admin_seed_lambda" {
   }
 }
 
+# Optional monolith: one function serving /signup, /login, /movies and
+# /favorites through the shared router (lambdas/monolith.py). One warm pool and
+# one RDS connection instead of one per route. The per-route functions stay
+# deployed so switching back is just monolith_api = false.
+module "api_monolith_lambda" {
+  count                = var.monolith_api ? 1 : 0
+  source               = "../consumer/modules/lambda/dynamic_lambda"
+  lambda_role_arn      = aws_iam_role.uniscreen_lambda_role.arn
+  source_dir           = "${path.root}/src/uniscreen/lambdas"
+  handler              = "monolith.lambda_handler"
+  lambda_function_name = "${var.project}-${var.environment}-api"
+  runtime              = "python3.11"
+  layers               = [aws_lambda_layer_version.pg8000.arn, aws_lambda_layer_version.uniscreen_common.arn]
+  timeout              = 20
+
+  # Same as get-movies: OMDb, S3 and Cognito are reached without a NAT
+  vpc_config = null
+
+  environment_variables = {
+    PROJECT_NAME        = var.project
+    ENVIRONMENT         = var.environment
+    DB_ENDPOINT         = var.db_endpoint
+    DB_NAME             = var.db_name
+    DB_PORT             = tostring(var.db_port)
+    RDS_SECRET_ID       = var.rds_secret_id
+    REGION              = var.region
+    POSTERS_BUCKET      = aws_s3_bucket.posters.bucket
+    OMDB_SECRET_ARN     = var.omdb_api_key_secret_arn
+    USER_POOL_ID        = aws_cognito_user_pool.uniscreen.id
+    USER_POOL_CLIENT_ID = aws_cognito_user_pool_client.uniscreen_client.id
+
+    POSTER_DERIVATIVES_FUNCTION = module.poster_derivatives_lambda.lambda_function_name
+  }
+}
+
+locals {
+  monolith_function_name = one(module.api_monolith_lambda[*].lambda_function_name)
+
+  # Function behind each API route (the monolith when enabled)
+  route_functions = {
+    signup    = coalesce(local.monolith_function_name, module.signup_lambda.lambda_function_name)
+    login     = coalesce(local.monolith_function_name, module.login_lambda.lambda_function_name)
+    movies    = coalesce(local.monolith_function_name, module.movies_lambda.lambda_function_name)
+    favorites = coalesce(local.monolith_function_name, module.favorites_lambda.lambda_function_name)
+  }
+}
+
 /////////////////////
 // API Gateway: Routes
 
@@ -388,7 +511,7 @@ module "signup_public_api" {
   path_part    = "signup"
   http_methods = ["POST"]
   lambda_function_names = {
-    POST = module.signup_lambda.lambda_function_name
+    POST = local.route_functions.signup
   }
   region      = var.region
   account_id  = var.account_id
@@ -404,7 +527,7 @@ module "login_public_api" {
   path_part    = "login"
   http_methods = ["POST"]
   lambda_function_names = {
-    POST = module.login_lambda.lambda_function_name
+    POST = local.route_functions.login
   }
   region      = var.region
   account_id  = var.account_id
@@ -468,10 +591,10 @@ module "movies_protected_api" {
   path_part    = "movies"
   http_methods = ["GET", "POST"]
   lambda_function_names = {
-    GET  = module.movies_lambda.lambda_function_name
-    POST = module.movies_lambda.lambda_function_name
+    GET  = local.route_functions.movies
+    POST = local.route_functions.movies
   }
-  authorizer_id = aws_api_gateway_authorizer.cognito_authorizer.id
+  authorizer_id = var.verify_jwt_in_lambda ? null : aws_api_gateway_authorizer.cognito_authorizer.id
   region        = var.region
   account_id    = var.account_id
   enable_cors   = true
@@ -487,10 +610,10 @@ module "favorites_protected_api" {
   path_part    = "favorites"
   http_methods = ["GET", "POST"]
   lambda_function_names = {
-    GET  = module.favorites_lambda.lambda_function_name
-    POST = module.favorites_lambda.lambda_function_name
+    GET  = local.route_functions.favorites
+    POST = local.route_functions.favorites
   }
-  authorizer_id = aws_api_gateway_authorizer.cognito_authorizer.id
+  authorizer_id = var.verify_jwt_in_lambda ? null : aws_api_gateway_authorizer.cognito_authorizer.id
   region        = var.region
   account_id    = var.account_id
   enable_cors   = true
@@ -537,6 +660,11 @@ resource "aws_api_gateway_deployment" "uniscreen_deployment" {
   rest_api_id = aws_api_gateway_rest_api.uniscreen_api.id
   description = "Deployment for UniScreen API"
 
+  # Redeploy when routes move between the per-route functions and the monolith
+  triggers = {
+    route_functions = sha1(jsonencode(local.route_functions))
+  }
+
   lifecycle {
     create_before_destroy = true
   }
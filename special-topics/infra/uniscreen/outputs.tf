@@ -73,3 +73,8 @@ output "favorites_lambda_arn" {
   description = "Lambda function ARN for /favorites"
   value       = module.favorites_lambda.lambda_function_arn
 }
+
+output "api_monolith_lambda_name" {
+  description = "Lambda function name serving all API routes when monolith_api is enabled (null otherwise)"
+  value       = local.monolith_function_name
+}
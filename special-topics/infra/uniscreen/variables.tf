@@ -88,3 +88,16 @@ variable "omdb_api_key_secret_arn" {
   type        = string
   default     = ""
 }
+
+# Lambda deployment mode
+variable "monolith_api" {
+  description = "Serve /signup, /login, /movies and /favorites from a single Lambda (src/uniscreen/lambdas/monolith.py) instead of one function per route"
+  type        = bool
+  default     = false
+}
+
+variable "verify_jwt_in_lambda" {
+  description = "Drop the API Gateway Cognito authorizer on /movies and /favorites and verify the JWT inside the Lambda (cached JWKS). VPC-attached functions need egress to cognito-idp to fetch the JWKS"
+  type        = bool
+  default     = false
+}
@@ -1,9 +1,45 @@
 import os
 import json
 import ssl
-import boto3
+import time
+import hashlib
+import re
+import threading
 import pg8000
-from typing import List, Tuple
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from uniscreen_common import secrets_cache
+
+
+# Ledger of applied migrations; created by the runner itself before anything else
+LEDGER_DDL = """
+CREATE TABLE IF NOT EXISTS public.schema_migrations (
+    version      TEXT PRIMARY KEY,
+    checksum     TEXT NOT NULL,
+    applied_at   TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    duration_ms  INTEGER
+)
+"""
+
+# Session-level advisory lock so concurrent invocations never apply migrations twice
+MIGRATION_LOCK_KEY = "uniscreen.schema_migrations"
+
+# Per-file directives, written as a comment line: "-- migrate: no-transaction".
+# no-transaction runs each statement on its own under autocommit, which is
+# required by CREATE INDEX CONCURRENTLY.
+DIRECTIVE_RE = re.compile(r"^\s*--\s*migrate:\s*([A-Za-z-]+)\s*$", re.MULTILINE)
+KNOWN_DIRECTIVES = {"no-transaction"}
+
+_IDENT = r"(?:\"(?:[^\"]|\"\")+\"|[A-Za-z_][A-Za-z0-9_$]*)"
+# Groups: index name, then the table's schema (None when not qualified); the
+# index is always created in its table's schema
+CONCURRENT_INDEX_RE = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+    r"(" + _IDENT + r")\s+ON\s+(?:ONLY\s+)?(?:(" + _IDENT + r")\s*\.\s*)?" + _IDENT,
+    re.IGNORECASE,
+)
+DEFAULT_SCHEMA = "public"
+PROGRESS_POLL_SECONDS = 2.0
 
 
 def response(status_code: int, body: dict):
@@ -16,10 +52,7 @@ def response(status_code: int, body: dict):
 
 
 def get_db_credentials(secret_arn: str, region: str) -> Tuple[str, str]:
-    sm = boto3.client("secretsmanager", region_name=region)
-    sec = sm.get_secret_value(SecretId=secret_arn)
-    data = sec.get("SecretString") or "{}"
-    obj = json.loads(data)
+    obj = secrets_cache.get_secret_json(secret_arn, region)
     # Secrets Manager format for RDS master secret usually contains 'username' and 'password'
     return obj.get("username"), obj.get("password")
 
@@ -44,50 +77,423 @@ def discover_migrations() -> List[str]:
     return files
 
 
-def run_sql_file(cur, path: str):
-    with open(path, "r", encoding="utf-8") as f:
-        sql = f.read()
+def migration_version(path: str) -> str:
+    # 001_create_movies.sql -> 001_create_movies
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def file_checksum(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def parse_directives(sql: str) -> List[str]:
+    directives = [d.lower() for d in DIRECTIVE_RE.findall(sql)]
+    unknown = [d for d in directives if d not in KNOWN_DIRECTIVES]
+    if unknown:
+        raise ValueError("Unknown migration directive(s): " + ", ".join(unknown))
+    return directives
+
+
+def load_migrations() -> List[Dict]:
+    migrations = []
+    for path in discover_migrations():
+        with open(path, "r", encoding="utf-8") as f:
+            directives = parse_directives(f.read())
+        migrations.append({
+            "version": migration_version(path),
+            "path": path,
+            "checksum": file_checksum(path),
+            "transactional": "no-transaction" not in directives,
+        })
+    return migrations
+
+
+def ensure_ledger(conn):
+    with conn.cursor() as cur:
+        cur.execute(LEDGER_DDL)
+    conn.commit()
+
+
+def applied_migrations(conn) -> Dict[str, str]:
+    # The ledger may not exist yet (dry run on a fresh database)
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('public.schema_migrations') IS NOT NULL")
+        rows = []
+        if cur.fetchone()[0]:
+            cur.execute("SELECT version, checksum FROM public.schema_migrations")
+            rows = cur.fetchall()
+    conn.commit()
+    return {r[0]: r[1] for r in rows}
+
+
+def plan_migrations(migrations: List[Dict], applied: Dict[str, str]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Returns (pending, mismatched). A migration whose file changed after it was
+    applied is reported as mismatched instead of being re-run.
+    """
+    pending = []
+    mismatched = []
+    for m in migrations:
+        recorded = applied.get(m["version"])
+        if recorded is None:
+            pending.append(m)
+        elif recorded != m["checksum"]:
+            mismatched.append({"version": m["version"], "applied_checksum": recorded, "file_checksum": m["checksum"]})
+    return pending, mismatched
+
+
+def try_lock(conn) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (MIGRATION_LOCK_KEY,))
+        locked = bool(cur.fetchone()[0])
+    conn.commit()
+    return locked
+
+
+def unlock(conn):
+    # Best effort: the lock is session-level and also goes away with the connection
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+    except Exception:
+        pass
+
+
+def record_migration(cur, migration: Dict, duration_ms: int):
+    cur.execute(
+        "INSERT INTO public.schema_migrations (version, checksum, duration_ms) VALUES (%s, %s, %s)",
+        (migration["version"], migration["checksum"], duration_ms),
+    )
+
+
+def apply_migration(conn, migration: Dict, connect: Optional[Callable] = None) -> Dict:
+    """
+    Runs one migration file and records it in the ledger, in a single
+    transaction (or statement by statement for no-transaction files).
+    Returns a summary for the response.
+    """
+    if not migration["transactional"]:
+        return apply_non_transactional(conn, migration, connect)
+
+    started = time.monotonic()
+    try:
+        with conn.cursor() as cur:
+            statements = run_sql_file(cur, migration["path"])
+            duration_ms = int((time.monotonic() - started) * 1000)
+            record_migration(cur, migration, duration_ms)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {"version": migration["version"], "statements": statements, "duration_ms": duration_ms}
+
+
+def unquote_identifier(name: str) -> str:
+    if name.startswith('"') and name.endswith('"'):
+        return name[1:-1].replace('""', '"')
+    return name.lower()
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def drop_invalid_index(cur, schema: str, name: str) -> bool:
+    """
+    A CREATE INDEX CONCURRENTLY that was interrupted (e.g. Lambda timeout)
+    leaves an INVALID index behind; IF NOT EXISTS would then skip it forever.
+    Drops that index (only in the schema the statement targets) so the build
+    can start over. Returns True if one was dropped.
+    """
+    cur.execute(
+        """
+        SELECT 1
+        FROM pg_class c
+        JOIN pg_index i ON i.indexrelid = c.oid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = %s AND NOT i.indisvalid
+        """,
+        (schema, name),
+    )
+    if cur.fetchone() is None:
+        return False
+    cur.execute("DROP INDEX CONCURRENTLY IF EXISTS " + quote_identifier(schema) + "." + quote_identifier(name))
+    return True
+
+
+@contextmanager
+def index_progress_reporter(connect: Optional[Callable], pid: int, index_name: str):
+    """
+    While the index builds on the main connection, polls
+    pg_stat_progress_create_index from a second connection and logs each new
+    phase/progress as a JSON line. Yields a dict with the last sample.
+    """
+    last: Dict = {}
+    if connect is None:
+        yield last
+        return
 
-    # Build statements while ignoring SQL comments.
+    stop = threading.Event()
+
+    def poll():
+        try:
+            with connect() as pconn:
+                pconn.autocommit = True
+                with pconn.cursor() as pcur:
+                    while not stop.is_set():
+                        pcur.execute(
+                            """
+                            SELECT phase, lockers_done, lockers_total, blocks_done, blocks_total,
+                                   tuples_done, tuples_total
+                            FROM pg_stat_progress_create_index
+                            WHERE pid = %s
+                            """,
+                            (pid,),
+                        )
+                        row = pcur.fetchone()
+                        if row:
+                            sample = dict(zip(
+                                ("phase", "lockers_done", "lockers_total", "blocks_done", "blocks_total",
+                                 "tuples_done", "tuples_total"),
+                                row,
+                            ))
+                            if sample != last:
+                                last.clear()
+                                last.update(sample)
+                                print(json.dumps({"index_progress": {"index": index_name, **sample}}))
+                        stop.wait(PROGRESS_POLL_SECONDS)
+        except Exception as e:
+            # Progress is informational only; never fail the migration because of it
+            print(json.dumps({"index_progress": {"index": index_name, "error": str(e)}}))
+
+    thread = threading.Thread(target=poll, daemon=True)
+    thread.start()
+    try:
+        yield last
+    finally:
+        stop.set()
+        thread.join(timeout=PROGRESS_POLL_SECONDS + 1)
+
+
+def apply_non_transactional(conn, migration: Dict, connect: Optional[Callable] = None) -> Dict:
+    """
+    Runs a "-- migrate: no-transaction" file statement by statement under
+    autocommit. Such files must be idempotent (IF NOT EXISTS): if one fails
+    or the Lambda times out, it is not recorded and the next run starts over.
+    Before each CREATE INDEX CONCURRENTLY, an INVALID leftover with the same
+    name is dropped; progress is polled from a second connection.
+    """
+    with open(migration["path"], "r", encoding="utf-8") as f:
+        statements = split_sql(f.read())
+
+    started = time.monotonic()
+    recovered = []
+    indexes = []
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_backend_pid()")
+            pid = cur.fetchone()[0]
+            for st in statements:
+                m = CONCURRENT_INDEX_RE.match(st)
+                if not m:
+                    cur.execute(st)
+                    continue
+                name = unquote_identifier(m.group(1))
+                schema = unquote_identifier(m.group(2)) if m.group(2) else DEFAULT_SCHEMA
+                if drop_invalid_index(cur, schema, name):
+                    recovered.append(name)
+                index_started = time.monotonic()
+                with index_progress_reporter(connect, pid, name) as progress:
+                    cur.execute(st)
+                indexes.append({
+                    "name": name,
+                    "duration_ms": int((time.monotonic() - index_started) * 1000),
+                    "last_phase": progress.get("phase"),
+                })
+            duration_ms = int((time.monotonic() - started) * 1000)
+            record_migration(cur, migration, duration_ms)
+    finally:
+        conn.autocommit = False
+
+    summary = {
+        "version": migration["version"],
+        "statements": len(statements),
+        "duration_ms": duration_ms,
+        "transactional": False,
+        "indexes": indexes,
+    }
+    if recovered:
+        summary["recovered_invalid_indexes"] = recovered
+    return summary
+
+
+def run_migrations(conn, dry_run: bool = False, connect: Optional[Callable] = None):
+    """
+    Applies pending migrations in order, each in its own transaction, under
+    the advisory lock. With dry_run=True only reports the plan. `connect`
+    opens an extra connection used to report index build progress.
+    Returns (status_code, body).
+    """
+    migrations = load_migrations()
+    if not migrations:
+        return 200, {"message": "No migrations found (migrations/ folder empty or missing)", "applied": []}
+
+    if dry_run:
+        pending, mismatched = plan_migrations(migrations, applied_migrations(conn))
+        return 200, {
+            "message": "Dry run: nothing was applied",
+            "pending": [m["version"] for m in pending],
+            "non_transactional": [m["version"] for m in pending if not m["transactional"]],
+            "already_applied": len(migrations) - len(pending) - len(mismatched),
+            "checksum_mismatch": mismatched,
+        }
+
+    if not try_lock(conn):
+        return 409, {"error": "Another migration run is in progress"}
+    try:
+        # Ledger and plan only under the lock: concurrent runs would race on
+        # CREATE TABLE IF NOT EXISTS, and one may have just finished
+        ensure_ledger(conn)
+        pending, mismatched = plan_migrations(migrations, applied_migrations(conn))
+        if mismatched:
+            return 409, {
+                "error": "Applied migrations were modified; add a new migration instead of editing old ones",
+                "checksum_mismatch": mismatched,
+            }
+
+        applied = []
+        for m in pending:
+            try:
+                applied.append(apply_migration(conn, m, connect))
+            except Exception as e:
+                return 500, {"error": str(e), "failed": m["version"], "applied": applied}
+
+        return 200, {
+            "message": "Migrations applied successfully" if applied else "Database is up to date",
+            "applied": applied,
+            "already_applied": len(migrations) - len(pending),
+        }
+    finally:
+        unlock(conn)
+
+
+_DOLLAR_TAG = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)?\$")
+
+
+def _is_ident_char(ch: str) -> bool:
+    return ch.isalnum() or ch in "_$"
+
+
+def split_sql(sql: str) -> List[str]:
+    """
+    Splits a SQL script into statements on top-level semicolons. Understands
+    -- and (nested) /* */ comments, '...' and E'...' strings, "quoted"
+    identifiers and $tag$ dollar quotes, so semicolons inside any of those do
+    not end a statement. Leading comments are dropped; comment-only chunks
+    produce no statement.
+    """
     statements: List[str] = []
-    buff: List[str] = []
-    in_block_comment = False
+    n = len(sql)
+    i = 0
+    code_start = None  # first code character of the current statement
+
+    while i < n:
+        ch = sql[i]
+        nxt = sql[i + 1] if i + 1 < n else ""
+
+        if ch == "-" and nxt == "-":
+            end = sql.find("\n", i)
+            i = n if end == -1 else end + 1
+            continue
+
+        if ch == "/" and nxt == "*":
+            depth = 1
+            i += 2
+            while i < n and depth:
+                if sql.startswith("/*", i):
+                    depth += 1
+                    i += 2
+                elif sql.startswith("*/", i):
+                    depth -= 1
+                    i += 2
+                else:
+                    i += 1
+            continue
 
-    for raw_line in sql.splitlines():
-        line = raw_line.strip()
+        if ch == ";":
+            if code_start is not None:
+                statements.append(sql[code_start:i].strip())
+            code_start = None
+            i += 1
+            continue
 
-        # Handle block comments /* ... */
-        if in_block_comment:
-            if "*/" in line:
-                in_block_comment = False
+        if ch.isspace():
+            i += 1
             continue
-        if line.startswith("/*"):
-            if "*/" not in line:
-                in_block_comment = True
+
+        if code_start is None:
+            code_start = i
+
+        if ch == "'":
+            # E'...' accepts backslash escapes; '' is an escaped quote in both forms
+            escapes = i > 0 and sql[i - 1] in "eE" and (i < 2 or not _is_ident_char(sql[i - 2]))
+            i += 1
+            while i < n:
+                if escapes and sql[i] == "\\":
+                    i += 2
+                elif sql[i] == "'":
+                    if sql.startswith("''", i):
+                        i += 2
+                    else:
+                        i += 1
+                        break
+                else:
+                    i += 1
             continue
 
-        # Skip single-line comments and empty lines
-        if line.startswith("--") or line == "":
+        if ch == '"':
+            i += 1
+            while i < n:
+                if sql.startswith('""', i):
+                    i += 2
+                elif sql[i] == '"':
+                    i += 1
+                    break
+                else:
+                    i += 1
             continue
 
-        # Keep original line (preserve formatting) for execution
-        buff.append(raw_line)
+        if ch == "$" and (i == 0 or not _is_ident_char(sql[i - 1])):
+            m = _DOLLAR_TAG.match(sql, i)
+            if m:
+                end = sql.find(m.group(0), m.end())
+                i = n if end == -1 else end + len(m.group(0))
+                continue
 
-        # Statement terminator
-        if line.endswith(";"):
-            st = "\n".join(buff).strip()
-            if st:
-                statements.append(st)
-            buff = []
+        i += 1
 
-    # Append any trailing statement without semicolon
-    if buff:
-        st = "\n".join(buff).strip()
-        if st:
-            statements.append(st)
+    if code_start is not None and sql[code_start:].strip():
+        statements.append(sql[code_start:].strip())
+    return statements
 
-    for st in statements:
-        cur.execute(st)
+
+def run_sql_file(cur, path: str) -> int:
+    """
+    Runs a migration file and returns how many statements it has. The whole
+    file goes to the server in one round trip: without parameters the cursor
+    uses the simple query protocol, which executes every statement
+    server-side (inside the caller's transaction).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        sql = f.read()
+
+    statements = split_sql(sql)
+    if statements:
+        cur.execute(sql)
+    return len(statements)
 
 
 def list_movies(cur):
@@ -142,18 +548,14 @@ def lambda_handler(event, context):
         if not user or not password:
             return response(500, {"error": "Unable to resolve DB credentials from Secrets Manager"})
 
-        migrations = discover_migrations()
-        if not migrations:
-            return response(200, {"message": "No migrations found (migrations/ folder empty or missing)", "applied": []})
+        # "plan" action or {"dry_run": true} only reports what would run
+        dry_run = action == "plan" or bool(data.get("dry_run") or event.get("dry_run"))
 
-        applied = []
-        with connect_db(user, password, db_endpoint, db_port, db_name) as conn:
-            conn.autocommit = True
-            with conn.cursor() as cur:
-                for path in migrations:
-                    run_sql_file(cur, path)
-                    applied.append(os.path.basename(path))
-
-        return response(200, {"message": "Migrations applied successfully", "applied": applied})
+        def connect():
+            return connect_db(user, password, db_endpoint, db_port, db_name)
+
+        with connect() as conn:
+            status, body = run_migrations(conn, dry_run=dry_run, connect=connect)
+        return response(status, body)
     except Exception as e:
         return response(500, {"error": str(e)})
@@ -1,9 +1,12 @@
+import io
 import os
+import csv
 import json
 import ssl
-import boto3
+import tempfile
 import pg8000
-from typing import Tuple
+from typing import Dict, Iterable, Iterator, TextIO, Tuple
+from uniscreen_common import aws, secrets_cache
 
 
 def response(status_code: int, body: dict):
@@ -16,10 +19,7 @@ def response(status_code: int, body: dict):
 
 
 def get_db_credentials(secret_arn: str, region: str) -> Tuple[str, str]:
-    sm = boto3.client("secretsmanager", region_name=region)
-    sec = sm.get_secret_value(SecretId=secret_arn)
-    data = sec.get("SecretString") or "{}"
-    obj = json.loads(data)
+    obj = secrets_cache.get_secret_json(secret_arn, region)
     return obj.get("username"), obj.get("password")
 
 
@@ -28,46 +28,188 @@ def connect_db(user: str, password: str, host: str, port: int, database: str):
     return pg8000.connect(user=user, password=password, host=host, port=port, database=database, ssl_context=ctx)
 
 
-def table_count(cur, table: str) -> int:
-    cur.execute(f"SELECT COUNT(*) FROM {table}")
-    (count,) = cur.fetchone()
-    return int(count)
+# Packaged datasets live next to this file; the default one reproduces the
+# original two-movie seed
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seed_data")
+DEFAULT_DATASET = "default.jsonl"
 
+# Record type -> (staging table, columns). JSONL records carry a "type"
+# field (default "movie"); CSV datasets hold one record type per file.
+STAGING = {
+    "movie": ("seed_movies", ("title", "year", "director", "actors", "plot", "poster_url")),
+    "user": ("seed_users", ("email",)),
+    "favorite": ("seed_favorites", ("email", "title", "year")),
+}
 
-def ensure_user(cur, email: str) -> int:
-    # Admin seed: create a simple user row if not exists; password_hash left empty
-    cur.execute("SELECT id FROM public.users WHERE email=%s", (email,))
-    row = cur.fetchone()
-    if row:
-        return int(row[0])
-    cur.execute("INSERT INTO public.users (email, password_hash) VALUES (%s, %s) RETURNING id", (email, ""))
-    (new_id,) = cur.fetchone()
-    return int(new_id)
+STAGING_DDL = """
+CREATE TEMP TABLE seed_movies (
+    title TEXT, year INT, director TEXT, actors TEXT, plot TEXT, poster_url TEXT
+) ON COMMIT DROP;
+CREATE TEMP TABLE seed_users (email TEXT) ON COMMIT DROP;
+CREATE TEMP TABLE seed_favorites (email TEXT, title TEXT, year INT) ON COMMIT DROP;
+"""
 
+# One statement per target table; each returns how many rows it inserted
+MERGE_USERS = """
+WITH ins AS (
+    INSERT INTO public.users (email, password_hash)
+    SELECT DISTINCT email, '' FROM (
+        SELECT email FROM seed_users UNION SELECT email FROM seed_favorites
+    ) e
+    WHERE email IS NOT NULL
+    ON CONFLICT (email) DO NOTHING
+    RETURNING 1
+)
+SELECT COUNT(*) FROM ins
+"""
 
-def insert_movie(cur, title: str, year: int, director: str, actors: str, plot: str, poster_url: str) -> int:
+MERGE_MOVIES = """
+WITH ins AS (
+    INSERT INTO public.movies (title, year, director, actors, plot, poster_url)
+    SELECT DISTINCT ON (title, COALESCE(year, -1)) title, year, director, actors, plot, poster_url
+    FROM seed_movies
+    WHERE title IS NOT NULL
+    ORDER BY title, COALESCE(year, -1)
+    ON CONFLICT (title, (COALESCE(year, -1))) DO NOTHING
+    RETURNING 1
+)
+SELECT COUNT(*) FROM ins
+"""
+
+MERGE_FAVORITES = """
+WITH ins AS (
+    INSERT INTO public.favorites (user_id, movie_id)
+    SELECT DISTINCT u.id, m.id
+    FROM seed_favorites sf
+    JOIN public.users u ON u.email = sf.email
+    JOIN public.movies m ON m.title = sf.title AND COALESCE(m.year, -1) = COALESCE(sf.year, -1)
+    ON CONFLICT (user_id, movie_id) DO NOTHING
+    RETURNING 1
+)
+SELECT COUNT(*) FROM ins
+"""
+
+
+def parse_dataset(data: dict, event: dict) -> dict:
+    """
+    {"dataset": {"s3_bucket": "...", "s3_key": "...", "format": "jsonl"|"csv", "type": "movie"}}
+    or {"dataset": {"file": "movies_100k.jsonl"}} for a file packaged under seed_data/.
+    Without a dataset, the packaged default is loaded (only into an empty database).
+    """
+    dataset = data.get("dataset") or event.get("dataset") or {}
+    if isinstance(dataset, str):
+        dataset = {"file": dataset}
+    return dataset
+
+
+def dataset_format(dataset: dict) -> str:
+    name = dataset.get("s3_key") or dataset.get("file") or DEFAULT_DATASET
+    fmt = (dataset.get("format") or os.path.splitext(name)[1].lstrip(".") or "jsonl").lower()
+    if fmt not in ("jsonl", "csv"):
+        raise ValueError(f"Unsupported dataset format: {fmt}")
+    return fmt
+
+
+def open_dataset(dataset: dict) -> TextIO:
+    """
+    Opens the dataset as a text stream. newline="" keeps line endings intact,
+    so csv sees the line breaks inside quoted fields.
+    """
+    if dataset.get("s3_bucket") and dataset.get("s3_key"):
+        # S3 datasets are streamed, not downloaded first
+        obj = aws.client("s3").get_object(Bucket=dataset["s3_bucket"], Key=dataset["s3_key"])
+        return io.TextIOWrapper(obj["Body"], encoding="utf-8", newline="")
+
+    # basename only: the dataset name must not escape seed_data/
+    path = os.path.join(SEED_DIR, os.path.basename(dataset.get("file") or DEFAULT_DATASET))
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def iter_records(stream: Iterable[str], fmt: str) -> Iterator[dict]:
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            # Blank records are dropped only after parsing (a blank line may be
+            # part of a quoted field)
+            if any(_clean(value) is not None for value in row.values()):
+                yield row
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _clean(value):
+    # Empty strings become NULL, as the staging COPY uses CSV's unquoted-empty NULL
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def write_staging_files(records: Iterable[dict], default_type: str = "movie") -> Dict[str, Tuple[object, int]]:
+    """
+    Spools the records into one CSV temp file per staging table (in /tmp, so
+    large datasets do not have to fit in memory). Returns {type: (file, rows)}.
+    """
+    files = {}
+    for record in records:
+        kind = (record.get("type") or default_type).lower()
+        if kind not in STAGING:
+            raise ValueError(f"Unknown record type: {kind}")
+        if kind not in files:
+            f = tempfile.TemporaryFile(mode="w+", encoding="utf-8", newline="")
+            files[kind] = [f, csv.writer(f), 0]
+        entry = files[kind]
+        entry[1].writerow([_clean(record.get(col)) for col in STAGING[kind][1]])
+        entry[2] += 1
+    return {kind: (entry[0], entry[2]) for kind, entry in files.items()}
+
+
+def database_state(cur) -> Tuple[bool, bool, bool]:
+    # One round trip instead of three COUNT(*) queries
     cur.execute(
         """
-        INSERT INTO public.movies (title, year, director, actors, plot, poster_url)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        RETURNING id
-        """,
-        (title, year, director, actors, plot, poster_url),
+        SELECT EXISTS (SELECT 1 FROM public.movies),
+               EXISTS (SELECT 1 FROM public.users),
+               EXISTS (SELECT 1 FROM public.favorites)
+        """
     )
-    (movie_id,) = cur.fetchone()
-    return int(movie_id)
+    return tuple(bool(v) for v in cur.fetchone())
 
 
-def insert_favorite(cur, user_id: int, movie_id: int):
-    # Respect unique (user_id, movie_id)
+def load_dataset(conn, staged: Dict[str, Tuple[object, int]]) -> dict:
+    """
+    COPYs the spooled files into temporary staging tables and merges them into
+    users / movies / favorites, all in a single transaction.
+    """
+    seeded = {"rows_staged": {}, "users_added": 0, "movies_added": 0, "favorites_added": 0}
     try:
-        cur.execute(
-            "INSERT INTO public.favorites (user_id, movie_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-            (user_id, movie_id),
-        )
+        with conn.cursor() as cur:
+            cur.execute(STAGING_DDL)
+            for kind, (f, rows) in staged.items():
+                table, columns = STAGING[kind]
+                f.seek(0)
+                cur.execute(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", stream=f)
+                seeded["rows_staged"][kind] = rows
+
+            cur.execute(MERGE_USERS)
+            seeded["users_added"] = int(cur.fetchone()[0])
+            cur.execute(MERGE_MOVIES)
+            seeded["movies_added"] = int(cur.fetchone()[0])
+            cur.execute(MERGE_FAVORITES)
+            seeded["favorites_added"] = int(cur.fetchone()[0])
+        conn.commit()
     except Exception:
-        # Ignore conflicts if constraint exists
-        pass
+        conn.rollback()
+        raise
+
+    # Fresh statistics right away: until autovacuum gets to it, the planner
+    # would pick sequential scans for the freshly loaded tables
+    if seeded["users_added"] or seeded["movies_added"] or seeded["favorites_added"]:
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE public.users, public.movies, public.favorites")
+        conn.commit()
+    return seeded
 
 
 def lambda_handler(event, context):
@@ -81,58 +223,42 @@ def lambda_handler(event, context):
         if not all([region, db_endpoint, db_name, rds_secret_arn]):
             return response(500, {"error": "Missing required environment variables (REGION/DB_ENDPOINT/DB_NAME/RDS_SECRET_ID)"})
 
+        data = {}
+        body = event.get("body")
+        if isinstance(body, str):
+            try:
+                data = json.loads(body or "{}")
+            except Exception:
+                data = {}
+        elif isinstance(body, dict):
+            data = body
+        dataset = parse_dataset(data, event)
+
         user, password = get_db_credentials(rds_secret_arn, region)
         if not user or not password:
             return response(500, {"error": "Unable to resolve DB credentials from Secrets Manager"})
 
-        seeded = {"movies_added": 0, "favorites_added": 0}
         with connect_db(user, password, db_endpoint, db_port, db_name) as conn:
-            conn.autocommit = True
-            with conn.cursor() as cur:
-                # Only seed if empty
-                movies_count = table_count(cur, "public.movies")
-                users_count = table_count(cur, "public.users")
-                favorites_count = table_count(cur, "public.favorites")
-
-                if users_count == 0:
-                    # create a default user
-                    u1 = ensure_user(cur, "admin@uniscreen.local")
-                else:
-                    # get any user
-                    cur.execute("SELECT id FROM public.users ORDER BY id LIMIT 1")
-                    (u1,) = cur.fetchone()
-
-                # Seed movies only if table empty
-                if movies_count == 0:
-                    m1 = insert_movie(
-                        cur,
-                        "Inception",
-                        2010,
-                        "Christopher Nolan",
-                        "Leonardo DiCaprio, Joseph Gordon-Levitt, Elliot Page",
-                        "A thief who steals corporate secrets through dream-sharing tech.",
-                        "",
-                    )
-                    m2 = insert_movie(
-                        cur,
-                        "Interstellar",
-                        2014,
-                        "Christopher Nolan",
-                        "Matthew McConaughey, Anne Hathaway, Jessica Chastain",
-                        "A team travels through a wormhole in space in an attempt to ensure humanity's survival.",
-                        "",
-                    )
-                    seeded["movies_added"] += 2
-
-                    # favorites: only if favorites table empty
-                    if favorites_count == 0:
-                        insert_favorite(cur, u1, m1)
-                        insert_favorite(cur, u1, m2)
-                        seeded["favorites_added"] += 2
-
-                        insert_favorite(cur, u1, m1)
-                        insert_favorite(cur, u1, m2)
-                        seeded["favorites_added"] += 2
-        return response(200, {"message": "Seed completed (no-op if not empty)", "details": seeded})
+            if not dataset:
+                # Default seed keeps the original behaviour: only into an empty database
+                with conn.cursor() as cur:
+                    has_movies, _, _ = database_state(cur)
+                conn.commit()
+                if has_movies:
+                    return response(200, {"message": "Seed completed (no-op if not empty)", "details": {"movies_added": 0, "favorites_added": 0}})
+
+            fmt = dataset_format(dataset)
+            with open_dataset(dataset) as stream:
+                staged = write_staging_files(
+                    iter_records(stream, fmt),
+                    default_type=(dataset.get("type") or "movie"),
+                )
+            try:
+                seeded = load_dataset(conn, staged)
+            finally:
+                for f, _ in staged.values():
+                    f.close()
+
+        return response(200, {"message": "Seed completed", "details": seeded})
     except Exception as e:
         return response(500, {"error": str(e)})
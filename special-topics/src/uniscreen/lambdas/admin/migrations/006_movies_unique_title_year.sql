@@ -0,0 +1,10 @@
+-- migrate: no-transaction
+-- UniScreen schema: NULL-safe uniqueness for movies (title, year)
+-- Lets upsert_movie use a single INSERT ... ON CONFLICT instead of SELECT + UPDATE/INSERT.
+-- Duplicates are merged by 006_movies_dedupe_title_year, which runs just before
+-- this file. The index is built CONCURRENTLY so writes to public.movies are
+-- not blocked. If a duplicate written in between makes the build fail, merge
+-- it by hand (same statements as the dedupe file); the next run drops the
+-- INVALID index and builds it again.
+-- -1 is never a real year, so a NULL year counts as a single value.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_movies_title_year ON public.movies (title, COALESCE(year, -1));
@@ -0,0 +1,11 @@
+-- migrate: no-transaction
+-- UniScreen schema: poster derivatives (thumbnails / WebP) generated by the
+-- poster_derivatives lambda under derivatives/{safe_title}/w{width}.{jpg,webp}.
+-- poster_variants = {"w160": {"jpeg": url, "webp": url}, ...}; NULL means not
+-- processed yet (picked up by the scheduled backfill).
+ALTER TABLE public.movies ADD COLUMN IF NOT EXISTS poster_variants JSONB;
+
+-- The derivatives lambda updates rows by poster_url. The column is nullable
+-- without a default (a catalog-only change); the index is built CONCURRENTLY so
+-- writes to public.movies are not blocked.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_movies_poster_url ON public.movies (poster_url);
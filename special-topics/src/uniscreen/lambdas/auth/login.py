@@ -1,59 +1,90 @@
-import json
+import hashlib
+import hmac
 import os
-import boto3
+from uniscreen_common import aws
+from uniscreen_common.http import BadRequest, HttpError, Router, parse_body, response
+from uniscreen_common.lru import TtlLru
 
-cognito = boto3.client("cognito-idp")
+ROUTER = Router(default_resource="/login")
 
+# Credenciais (ou refresh tokens) que o Cognito acabou de recusar. Repetir a
+# mesma tentativa dentro da janela responde 401 sem chamar o Cognito, o que
+# segura tempestades de login/retry dentro da cota. A chave é um HMAC com
+# segredo aleatório do container: a senha nunca fica em memória em claro.
+FAILURE_TTL_SECONDS = 30.0
+FAILED_ATTEMPTS = TtlLru(10000, FAILURE_TTL_SECONDS)
+_FAILURE_KEY = os.urandom(32)
 
-def response(status_code: int, body: dict):
-  return {
-    "statusCode": status_code,
-    "headers": {"Content-Type": "application/json"},
-    "body": json.dumps(body),
-    "isBase64Encoded": False,
-  }
 
+def attempt_key(*parts: str) -> bytes:
+  return hmac.new(_FAILURE_KEY, "\0".join(parts).encode("utf-8"), hashlib.sha256).digest()
 
-def lambda_handler(event, context):
-  # Expect JSON body: { "email": "...", "password": "..." }
+
+def initiate_auth(client_id: str, flow: str, params: dict, failure_key: bytes) -> dict:
+  """
+  Chama o Cognito initiate_auth e traduz as falhas em HttpError. Falhas de
+  credencial entram no cache negativo; tentativas já recusadas nem saem daqui.
+  """
+  if FAILED_ATTEMPTS.get(failure_key):
+    raise HttpError("Invalid credentials", 401)
+
+  # Client criado no primeiro uso (no monólito, rotas de filmes não o pagam)
+  cognito = aws.client("cognito-idp")
   try:
-    body = event.get("body")
-    if isinstance(body, str):
-      body = json.loads(body or "{}")
-    elif body is None:
-      body = {}
+    return cognito.initiate_auth(ClientId=client_id, AuthFlow=flow, AuthParameters=params)
+  except (cognito.exceptions.NotAuthorizedException, cognito.exceptions.UserNotFoundException):
+    FAILED_ATTEMPTS.put(failure_key, True)
+    raise HttpError("Invalid credentials", 401)
+  except cognito.exceptions.UserNotConfirmedException:
+    raise HttpError("User not confirmed", 403)
 
+
+@ROUTER.route("POST", "/login")
+def login(event, context):
+  """
+  - {"email": "...", "password": "..."}: USER_PASSWORD_AUTH
+  - {"grant_type": "refresh_token", "refresh_token": "..."}: REFRESH_TOKEN_AUTH,
+    renova id/access token sem a senha (grant_type pode ser omitido)
+  """
+  body = parse_body(event)
+  if not isinstance(body, dict):
+    raise BadRequest("Invalid JSON body (expected an object)")
+  grant_type = body.get("grant_type") or ("refresh_token" if body.get("refresh_token") else "password")
+
+  if grant_type == "refresh_token":
+    refresh_token = body.get("refresh_token")
+    if not refresh_token:
+      raise BadRequest("Missing refresh_token")
+    if not isinstance(refresh_token, str):
+      raise BadRequest("'refresh_token' must be a string")
+    flow, params = "REFRESH_TOKEN_AUTH", {"REFRESH_TOKEN": refresh_token}
+  elif grant_type == "password":
     email = body.get("email")
     password = body.get("password")
-
     if not email or not password:
-      return response(400, {"error": "Missing email or password"})
+      raise BadRequest("Missing email or password")
+    if not isinstance(email, str) or not isinstance(password, str):
+      raise BadRequest("'email' and 'password' must be strings")
+    # Cognito USER_PASSWORD_AUTH (with app client that allows this flow)
+    flow, params = "USER_PASSWORD_AUTH", {"USERNAME": email, "PASSWORD": password}
+  else:
+    raise BadRequest("Unsupported grant_type (expected 'password' or 'refresh_token')")
 
-    client_id = os.environ.get("USER_POOL_CLIENT_ID")
-    if not client_id:
-      return response(500, {"error": "Cognito environment not configured"})
+  client_id = os.environ.get("USER_POOL_CLIENT_ID")
+  if not client_id:
+    raise HttpError("Cognito environment not configured")
 
-    # Cognito USER_PASSWORD_AUTH (with app client that allows this flow)
-    auth_result = cognito.initiate_auth(
-      ClientId=client_id,
-      AuthFlow="USER_PASSWORD_AUTH",
-      AuthParameters={
-        "USERNAME": email,
-        "PASSWORD": password,
-      },
-    )
-
-    tokens = auth_result.get("AuthenticationResult", {})
-    return response(200, {
-      "id_token": tokens.get("IdToken"),
-      "access_token": tokens.get("AccessToken"),
-      "refresh_token": tokens.get("RefreshToken"),
-      "token_type": tokens.get("TokenType"),
-      "expires_in": tokens.get("ExpiresIn"),
-    })
-  except cognito.exceptions.NotAuthorizedException:
-    return response(401, {"error": "Invalid credentials"})
-  except cognito.exceptions.UserNotConfirmedException:
-    return response(403, {"error": "User not confirmed"})
-  except Exception as e:
-    return response(500, {"error": str(e)})
+  failure_key = attempt_key(client_id, flow, *(params[k] for k in sorted(params)))
+  tokens = initiate_auth(client_id, flow, params, failure_key).get("AuthenticationResult", {})
+  return response(200, {
+    "id_token": tokens.get("IdToken"),
+    "access_token": tokens.get("AccessToken"),
+    # REFRESH_TOKEN_AUTH não devolve um refresh token novo; o atual continua válido
+    "refresh_token": tokens.get("RefreshToken") or params.get("REFRESH_TOKEN"),
+    "token_type": tokens.get("TokenType"),
+    "expires_in": tokens.get("ExpiresIn"),
+  })
+
+
+def lambda_handler(event, context):
+  return ROUTER.dispatch(event, context)
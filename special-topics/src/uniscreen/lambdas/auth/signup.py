@@ -1,39 +1,28 @@
-import json
 import os
-import boto3
+from uniscreen_common import aws
+from uniscreen_common.http import BadRequest, HttpError, Router, parse_body, response
 
-cognito = boto3.client("cognito-idp")
+ROUTER = Router(default_resource="/signup")
 
 
-def response(status_code: int, body: dict):
-  return {
-    "statusCode": status_code,
-    "headers": {"Content-Type": "application/json"},
-    "body": json.dumps(body),
-    "isBase64Encoded": False,
-  }
-
-
-def lambda_handler(event, context):
+@ROUTER.route("POST", "/signup")
+def signup(event, context):
   # Expect JSON body: { "email": "...", "password": "..." }
-  try:
-    body = event.get("body")
-    if isinstance(body, str):
-      body = json.loads(body or "{}")
-    elif body is None:
-      body = {}
-
-    email = body.get("email")
-    password = body.get("password")
+  body = parse_body(event)
+  email = body.get("email")
+  password = body.get("password")
 
-    if not email or not password:
-      return response(400, {"error": "Missing email or password"})
+  if not email or not password:
+    raise BadRequest("Missing email or password")
 
-    user_pool_id = os.environ.get("USER_POOL_ID")
-    client_id = os.environ.get("USER_POOL_CLIENT_ID")
-    if not user_pool_id or not client_id:
-      return response(500, {"error": "Cognito environment not configured"})
+  user_pool_id = os.environ.get("USER_POOL_ID")
+  client_id = os.environ.get("USER_POOL_CLIENT_ID")
+  if not user_pool_id or not client_id:
+    raise HttpError("Cognito environment not configured")
 
+  # Client criado no primeiro uso (no monólito, rotas de filmes não o pagam)
+  cognito = aws.client("cognito-idp")
+  try:
     # Use Cognito SignUp flow (client side). This will create a user in the user pool.
     # Confirmation may be required depending on pool settings; for simplicity assume email auto-verified rules.
     cognito.sign_up(
@@ -42,9 +31,11 @@ def lambda_handler(event, context):
       Password=password,
       UserAttributes=[{"Name": "email", "Value": email}],
     )
-
-    return response(200, {"message": "Signup initiated. Check email if confirmation is required."})
   except cognito.exceptions.UsernameExistsException:
     return response(409, {"error": "User already exists"})
-  except Exception as e:
-    return response(500, {"error": str(e)})
+
+  return response(200, {"message": "Signup initiated. Check email if confirmation is required."})
+
+
+def lambda_handler(event, context):
+  return ROUTER.dispatch(event, context)
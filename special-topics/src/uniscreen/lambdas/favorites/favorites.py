@@ -1,98 +1,104 @@
 import json
-import os
 from typing import Optional, Tuple, List, Dict
 
-import boto3
-import pg8000
+from uniscreen_common.http import HttpError, Router, get_claims, get_header, parse_body, response
+from uniscreen_common.lru import TtlLru
+from uniscreen_common.rds import DB
+from favorites_cache import FavoritesCache, etag_matches
 
 
-def response(status_code: int, body: dict):
-  return {
-    "statusCode": status_code,
-    "headers": {"Content-Type": "application/json"},
-    "body": json.dumps(body),
-    "isBase64Encoded": False,
-  }
+ROUTER = Router(default_resource="/favorites", db=DB)
+# Cache por container (sem store compartilhado); ver favorites_cache.MEMORY_TTL_SECONDS
+FAVORITES_CACHE = FavoritesCache()
+# Mapa limitado Cognito sub -> public.users.id (ids não mudam; TTL só limita a memória)
+USER_IDS = TtlLru(4096, 3600.0)
 
 
-def get_claims(event) -> dict:
-  try:
-    return (event.get("requestContext") or {}).get("authorizer", {}).get("claims") or {}
-  except Exception:
-    return {}
-
-
-def get_rds_credentials() -> Tuple[str, str, str, int, str]:
+def resolve_user_id(conn, sub: str, email: Optional[str], create: bool = True) -> Optional[int]:
   """
-  Retorna (host, user, password, port, database) a partir das variáveis e Secret do RDS.
-  Espera-se que o Secret (RDS_SECRET_ID) tenha o formato padrão do AWS RDS:
-   {"username":"...", "password":"...", "engine":"postgres", "host":"...", "port":5432, "dbname":"..."}
+  Retorna o id em public.users do usuário com o Cognito sub informado, usando
+  o mapa sub -> user_id do container (um container quente não consulta users).
+  Usuários antigos, criados apenas por email, recebem o sub na primeira escrita.
+  Com create=False não cria nada e retorna None se o usuário não existir.
+  Só entram no mapa usuários já commitados com o sub: um usuário criado ou
+  vinculado nesta transação pode sumir num rollback, e um ainda não vinculado
+  precisa passar pela próxima escrita para receber o sub.
   """
-  region = os.environ.get("REGION") or os.environ.get("AWS_REGION") or "us-east-2"
-  secret_id = os.environ.get("RDS_SECRET_ID")
-  host_env = os.environ.get("DB_ENDPOINT")
-  port_env = os.environ.get("DB_PORT")
-  db_env = os.environ.get("DB_NAME")
-
-  if not secret_id:
-    raise RuntimeError("Missing RDS_SECRET_ID environment variable")
-
-  sm = boto3.client("secretsmanager", region_name=region)
-  sec = sm.get_secret_value(SecretId=secret_id)
-  secret_str = sec.get("SecretString") or "{}"
-  secret = json.loads(secret_str)
-
-  username = secret.get("username")
-  password = secret.get("password")
-  host = host_env or secret.get("host")
-  port = int(port_env or secret.get("port") or 5432)
-  database = db_env or secret.get("dbname")
+  user_id = USER_IDS.get(sub)
+  if user_id is not None:
+    return user_id
 
-  if not (username and password and host and database):
-    raise RuntimeError("Incomplete RDS credentials (username/password/host/database)")
-
-  return host, username, password, port, database
-
-
-def get_or_create_user(conn, email: str) -> int:
-  """
-  Garante a existência de um usuário no schema public.users (colunas: email, password_hash).
-  Retorna o id do usuário.
-  """
   with conn.cursor() as cur:
-    cur.execute("SELECT id FROM public.users WHERE email = %s", (email,))
-    row = cur.fetchone()
-    if row:
-      return int(row[0])
+    if not create:
+      cur.execute(
+        """
+        SELECT id, TRUE FROM public.users WHERE cognito_sub = %s
+        UNION ALL
+        SELECT id, FALSE FROM public.users WHERE email = %s AND cognito_sub IS NULL
+        LIMIT 1
+        """,
+        (sub, email),
+      )
+      row = cur.fetchone()
+      if not row:
+        return None
+    else:
+      cur.execute(
+        """
+        WITH by_sub AS (
+          SELECT id FROM public.users WHERE cognito_sub = %s
+        ), linked AS (
+          UPDATE public.users SET cognito_sub = %s
+          WHERE email = %s AND cognito_sub IS NULL AND NOT EXISTS (SELECT 1 FROM by_sub)
+          RETURNING id
+        ), created AS (
+          INSERT INTO public.users (email, password_hash, cognito_sub)
+          SELECT %s, 'cognito', %s
+          WHERE NOT EXISTS (SELECT 1 FROM by_sub) AND NOT EXISTS (SELECT 1 FROM linked)
+          ON CONFLICT DO NOTHING
+          RETURNING id
+        )
+        SELECT id, TRUE FROM by_sub
+        UNION ALL SELECT id, FALSE FROM linked
+        UNION ALL SELECT id, FALSE FROM created
+        """,
+        (sub, sub, email, email, sub),
+      )
+      row = cur.fetchone()
+      if not row:
+        # Corrida com outra requisição do mesmo usuário, ou email já usado por
+        # outra conta: cria/reaproveita pelo sub, sem email
+        cur.execute(
+          """
+          INSERT INTO public.users (email, password_hash, cognito_sub)
+          VALUES (NULL, 'cognito', %s)
+          ON CONFLICT (cognito_sub) DO UPDATE SET cognito_sub = EXCLUDED.cognito_sub
+          RETURNING id, (xmax <> 0)
+          """,
+          (sub,),
+        )
+        row = cur.fetchone()
 
-    # Cria usuário com password_hash placeholder
-    cur.execute(
-      """
-      INSERT INTO public.users (email, password_hash)
-      VALUES (%s, %s)
-      RETURNING id
-      """,
-      (email, "cognito"),
-    )
-    new_row = cur.fetchone()
-    return int(new_row[0])
+  user_id = int(row[0])
+  if row[1]:
+    USER_IDS.put(sub, user_id)
+  return user_id
 
 
-def list_favorites(conn, email: str) -> List[Dict]:
+def list_favorites(conn, user_id: int) -> List[Dict]:
   """
-  Lista favoritos do usuário (por email), retornando metadados do filme.
+  Lista favoritos do usuário, retornando metadados do filme.
   """
   with conn.cursor() as cur:
     cur.execute(
       """
-      SELECT m.id, m.title, m.year, m.director, m.actors, m.plot, m.poster_url
+      SELECT m.id, m.title, m.year, m.director, m.actors, m.plot, m.poster_url, m.poster_variants
       FROM public.favorites f
-      JOIN public.users u ON u.id = f.user_id
       JOIN public.movies m ON m.id = f.movie_id
-      WHERE u.email = %s
+      WHERE f.user_id = %s
       ORDER BY m.title
       """,
-      (email,),
+      (user_id,),
     )
     items = []
     for row in cur.fetchall() or []:
@@ -104,114 +110,185 @@ def list_favorites(conn, email: str) -> List[Dict]:
         "actors": row[4],
         "plot": row[5],
         "poster_url": row[6],
+        # Miniaturas/WebP geradas pelo poster_derivatives (None enquanto não processado)
+        "poster_variants": row[7],
       })
     return items
 
 
-def add_favorite(conn, email: str, movie_id: int) -> bool:
+# Limite de movie_ids por requisição no modo em lote
+MAX_BULK_ITEMS = 100
+
+
+def add_favorites(conn, user_id: int, movie_ids: List[int]) -> Dict[int, Optional[bool]]:
   """
-  Adiciona favorito (ignora se já existir).
-  Retorna True se inseriu, False se já existia.
+  Adiciona vários favoritos numa única instrução. Retorna {movie_id: True
+  (inserido) | False (já existia) | None (filme inexistente)}.
   """
-  user_id = get_or_create_user(conn, email)
+  ids = list(dict.fromkeys(movie_ids))
+  if not ids:
+    return {}
   with conn.cursor() as cur:
-    # Usa ON CONFLICT para idempotência (constraint UNIQUE (user_id, movie_id))
+    # DO UPDATE (no-op) em vez de DO NOTHING para que RETURNING também devolva
+    # as linhas existentes; xmax = 0 indica que a linha acabou de ser inserida
     cur.execute(
       """
       INSERT INTO public.favorites (user_id, movie_id)
-      VALUES (%s, %s)
-      ON CONFLICT (user_id, movie_id) DO NOTHING
+      SELECT %s, m.id
+      FROM public.movies m
+      WHERE m.id = ANY(%s::bigint[])
+      ON CONFLICT (user_id, movie_id) DO UPDATE SET user_id = EXCLUDED.user_id
+      RETURNING movie_id, (xmax = 0) AS inserted
       """,
-      (user_id, movie_id),
-    )
-    # Não há rowcount confiável para INSERT ... DO NOTHING em todos drivers; valida com SELECT
-    cur.execute(
-      "SELECT 1 FROM public.favorites WHERE user_id = %s AND movie_id = %s",
-      (user_id, movie_id),
+      (user_id, ids),
     )
-    return bool(cur.fetchone())
+    found = {int(r[0]): bool(r[1]) for r in cur.fetchall()}
+  return {movie_id: found.get(movie_id) for movie_id in ids}
 
 
-def remove_favorite(conn, email: str, movie_id: int) -> int:
+def add_favorite(conn, user_id: int, movie_id: int) -> Optional[bool]:
   """
-  Remove favorito. Retorna número de linhas removidas (0 ou 1).
+  Adiciona favorito (ignora se já existir).
+  Retorna True se inseriu, False se já existia, None se o filme não existe.
+  """
+  return add_favorites(conn, user_id, [movie_id])[movie_id]
+
+
+def remove_favorites(conn, user_id: Optional[int], movie_ids: List[int]) -> List[int]:
+  """
+  Remove vários favoritos numa única instrução. Retorna os movie_ids removidos.
   """
+  ids = list(dict.fromkeys(movie_ids))
+  if not ids or user_id is None:
+    return []
   with conn.cursor() as cur:
-    cur.execute("SELECT id FROM public.users WHERE email = %s", (email,))
-    row = cur.fetchone()
-    if not row:
-      return 0
-    user_id = int(row[0])
     cur.execute(
-      "DELETE FROM public.favorites WHERE user_id = %s AND movie_id = %s",
-      (user_id, movie_id),
+      "DELETE FROM public.favorites WHERE user_id = %s AND movie_id = ANY(%s::bigint[]) RETURNING movie_id",
+      (user_id, ids),
     )
-    # pg8000: rowcount disponível
-    return cur.rowcount or 0
+    return [int(r[0]) for r in cur.fetchall()]
 
 
-def parse_body(event) -> dict:
-  body = event.get("body")
-  if isinstance(body, str):
-    try:
-      return json.loads(body or "{}")
-    except Exception:
-      return {}
-  return body or {}
+def remove_favorite(conn, user_id: Optional[int], movie_id: int) -> int:
+  """
+  Remove favorito. Retorna número de linhas removidas (0 ou 1).
+  """
+  return len(remove_favorites(conn, user_id, [movie_id]))
+
+
+def parse_movie_id(value) -> Optional[int]:
+  if isinstance(value, bool):
+    return None
+  if isinstance(value, int):
+    return value
+  # Aceita string numérica
+  try:
+    return int(value)
+  except Exception:
+    return None
+
+
+def get_favorites_response(event, user_sub: str, user_email: Optional[str]):
+  """
+  GET /favorites com cache por usuário: em cache hit nem a conexão é aberta;
+  If-None-Match com o ETag atual responde 304 sem corpo.
+  """
+  cached = FAVORITES_CACHE.get(user_sub)
+  if cached is None:
+    with DB.connection() as conn:
+      user_id = resolve_user_id(conn, user_sub, user_email, create=False)
+      items = list_favorites(conn, user_id) if user_id is not None else []
+    cached = FAVORITES_CACHE.put(user_sub, json.dumps({"items": items}))
+
+  etag, body = cached
+  headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+  if etag_matches(get_header(event, "If-None-Match"), etag):
+    return response(304, "", headers)
+  return response(200, body, headers)
+
+
+def get_user(event) -> Tuple[str, Optional[str]]:
+  claims = get_claims(event)
+  user_sub = claims.get("sub")
+  if not user_sub:
+    raise HttpError("Unauthorized: missing user claims", 401)
+  # email é opcional; usuários são identificados pelo sub
+  return user_sub, claims.get("email")
+
+
+@ROUTER.route("GET", "/favorites", auth=True)
+def get_favorites(event, context):
+  user_sub, user_email = get_user(event)
+  return get_favorites_response(event, user_sub, user_email)
+
+
+@ROUTER.route("POST", "/favorites", auth=True)
+def post_favorites(event, context):
+  user_sub, user_email = get_user(event)
+  data = parse_body(event)
+  action = (data.get("action") or "add").lower()
+
+  with DB.connection() as conn:
+    if "movie_ids" in data:
+      raw_ids = data.get("movie_ids")
+      if not isinstance(raw_ids, list) or not raw_ids:
+        return response(400, {"error": "movie_ids must be a non-empty list"})
+      if len(raw_ids) > MAX_BULK_ITEMS:
+        return response(400, {"error": f"At most {MAX_BULK_ITEMS} movie_ids per request"})
+      movie_ids = [parse_movie_id(v) for v in raw_ids]
+      if any(v is None for v in movie_ids):
+        return response(400, {"error": "Invalid movie_id in movie_ids"})
+
+      if action == "remove":
+        user_id = resolve_user_id(conn, user_sub, user_email, create=False)
+        removed = remove_favorites(conn, user_id, movie_ids)
+        conn.commit()
+        if removed:
+          FAVORITES_CACHE.invalidate(user_sub)
+        removed_set = set(removed)
+        return response(200, {
+          "removed": removed,
+          "not_found": [m for m in dict.fromkeys(movie_ids) if m not in removed_set],
+        })
+
+      results = add_favorites(conn, resolve_user_id(conn, user_sub, user_email), movie_ids)
+      conn.commit()
+      if any(results.values()):
+        FAVORITES_CACHE.invalidate(user_sub)
+      return response(200, {
+        "added": [m for m, inserted in results.items() if inserted],
+        "existing": [m for m, inserted in results.items() if inserted is False],
+        "not_found": [m for m, inserted in results.items() if inserted is None],
+      })
+
+    movie_id = parse_movie_id(data.get("movie_id"))
+    if movie_id is None:
+      return response(400, {"error": "Missing or invalid movie_id"})
+
+    if action == "remove":
+      user_id = resolve_user_id(conn, user_sub, user_email, create=False)
+      removed = remove_favorite(conn, user_id, movie_id)
+      conn.commit()
+      if removed:
+        FAVORITES_CACHE.invalidate(user_sub)
+      return response(200, {"message": "Favorite removed" if removed else "Favorite not found", "removed": removed})
+
+    # default: add
+    inserted = add_favorite(conn, resolve_user_id(conn, user_sub, user_email), movie_id)
+    if inserted is None:
+      return response(404, {"error": "Movie not found"})
+    conn.commit()
+    if inserted:
+      FAVORITES_CACHE.invalidate(user_sub)
+    return response(201, {"message": "Favorite added", "exists": True, "inserted": inserted})
 
 
 def lambda_handler(event, context):
   """
   Protected endpoint (/favorites) behind Cognito User Pool Authorizer.
-  - GET: list favorites for the authenticated user
+  - GET: list favorites for the authenticated user (ETag / If-None-Match -> 304)
   - POST: add or remove a favorite (expects JSON: {"movie_id": number, "action": "add"|"remove"})
           se "action" não enviado, assume "add"
+          em lote: {"movie_ids": [number, ...], "action": "add"|"remove"}
   """
-  try:
-    method = event.get("httpMethod", "GET")
-    claims = get_claims(event)
-    user_sub = claims.get("sub")
-    user_email = claims.get("email")
-    if not user_email:
-      # Fallback se email não estiver presente no token
-      if user_sub:
-        user_email = f"{user_sub}@cognito.local"
-      else:
-        return response(401, {"error": "Unauthorized: missing user claims"})
-
-    host, user, password, port, database = get_rds_credentials()
-    conn = pg8000.connect(user=user, password=password, host=host, port=port, database=database, ssl_context=True)
-    try:
-      if method == "GET":
-        items = list_favorites(conn, user_email)
-        return response(200, {"items": items})
-
-      if method == "POST":
-        data = parse_body(event)
-        action = (data.get("action") or "add").lower()
-        movie_id = data.get("movie_id")
-        if not isinstance(movie_id, int):
-          # Aceita string numérica
-          try:
-            movie_id = int(movie_id)
-          except Exception:
-            return response(400, {"error": "Missing or invalid movie_id"})
-
-        if action == "remove":
-          removed = remove_favorite(conn, user_email, movie_id)
-          conn.commit()
-          return response(200, {"message": "Favorite removed" if removed else "Favorite not found", "removed": removed})
-
-        # default: add
-        added_present = add_favorite(conn, user_email, movie_id)
-        conn.commit()
-        return response(201, {"message": "Favorite added", "exists": added_present})
-
-      return response(405, {"error": f"Method {method} not allowed"})
-    finally:
-      try:
-        conn.close()
-      except Exception:
-        pass
-  except Exception as e:
-    return response(500, {"error": str(e)})
+  return ROUTER.dispatch(event, context)
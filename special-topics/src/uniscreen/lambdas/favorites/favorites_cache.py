@@ -0,0 +1,83 @@
+import hashlib
+import json
+from typing import Optional, Tuple
+
+from uniscreen_common.lru import TtlLru
+
+
+# O cache é por container (nenhum store compartilhado está implantado): uma
+# escrita feita em outro container só aparece aqui depois do TTL, então ele
+# limita por quanto tempo um favorito recém-alterado pode aparecer desatualizado
+MEMORY_TTL_SECONDS = 5.0
+MEMORY_MAX_ENTRIES = 1024
+SHARED_TTL_SECONDS = 300
+
+
+def compute_etag(body: str) -> str:
+  return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+  # If-None-Match pode trazer vários ETags, com ou sem prefixo W/
+  if not if_none_match:
+    return False
+  if if_none_match.strip() == "*":
+    return True
+  candidates = [c.strip() for c in if_none_match.split(",")]
+  return any((c[2:] if c.startswith("W/") else c) == etag for c in candidates)
+
+
+class FavoritesCache:
+  """
+  Cache por usuário (Cognito sub) da lista de favoritos já serializada:
+   1. LRU em memória (por container), com TTL curto;
+   2. store compartilhado opcional (get/set/delete com TTL em segundos, ex.:
+      Redis/ElastiCache), que também invalidaria os outros containers.
+  Hoje a função usa só o LRU: invalidate(sub), chamado pelas escritas
+  (add/remove) após o commit, vale apenas para o container que escreveu.
+  Cada entrada é (etag, body).
+  """
+
+  def __init__(self, store=None, memory_ttl: float = MEMORY_TTL_SECONDS,
+               max_entries: int = MEMORY_MAX_ENTRIES, shared_ttl: int = SHARED_TTL_SECONDS):
+    self.store = store
+    self.shared_ttl = shared_ttl
+    self._memory = TtlLru(max_entries, memory_ttl)
+
+  @staticmethod
+  def _store_key(sub: str) -> str:
+    return "favorites:" + sub
+
+  def get(self, sub: str) -> Optional[Tuple[str, str]]:
+    entry = self._memory.get(sub)
+    if entry is not None:
+      return entry
+    if self.store is None:
+      return None
+    try:
+      raw = self.store.get(self._store_key(sub))
+    except Exception:
+      return None  # cache é best-effort; segue para o banco
+    if not raw:
+      return None
+    entry = tuple(json.loads(raw))
+    self._memory.put(sub, entry)
+    return entry
+
+  def put(self, sub: str, body: str) -> Tuple[str, str]:
+    entry = (compute_etag(body), body)
+    self._memory.put(sub, entry)
+    if self.store is not None:
+      try:
+        self.store.set(self._store_key(sub), json.dumps(entry), self.shared_ttl)
+      except Exception:
+        pass
+    return entry
+
+  def invalidate(self, sub: str):
+    self._memory.pop(sub)
+    if self.store is not None:
+      try:
+        self.store.delete(self._store_key(sub))
+      except Exception:
+        pass
@@ -0,0 +1,36 @@
+"""
+Handler único ("monólito") para todas as rotas HTTP do UniScreen.
+
+Empacotado a partir de src/uniscreen/lambdas e habilitado com
+monolith_api = true no Terraform: API Gateway passa a apontar /signup, /login,
+/movies e /favorites para esta função. Um só pool de containers quentes e uma
+só conexão com o RDS (uniscreen_common.rds.DB) atendem a API inteira, em vez
+de cada rota de pouco tráfego pagar o próprio cold start.
+
+As rotas de admin (/admin/*, /public/*) continuam em funções separadas
+(timeout maior, conexões próprias e lock de migração).
+"""
+import os
+import sys
+
+from uniscreen_common.http import Router
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Cada pasta é o source_dir de uma função; aqui todas ficam no mesmo pacote
+for _name in ("auth", "movies", "favorites"):
+  _path = os.path.join(HERE, _name)
+  if _path not in sys.path:
+    sys.path.insert(0, _path)
+
+import favorites  # noqa: E402
+import get_movies  # noqa: E402
+import login  # noqa: E402
+import signup  # noqa: E402
+
+ROUTER = Router()
+for _module in (signup, login, get_movies, favorites):
+  ROUTER.include(_module.ROUTER)
+
+
+def lambda_handler(event, context):
+  return ROUTER.dispatch(event, context)
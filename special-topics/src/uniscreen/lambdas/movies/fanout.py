@@ -0,0 +1,81 @@
+import random
+import socket
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+RETRYABLE_HTTP_STATUS = (429, 500, 502, 503, 504)
+
+
+class HostLimiter:
+  """
+  Limita o número de requisições simultâneas por host (ex.: OMDb aceita
+  menos concorrência que o CDN dos pôsteres).
+  """
+
+  def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = 4):
+    self.limits = dict(limits or {})
+    self.default_limit = default_limit
+    self._semaphores = {}
+    self._lock = threading.Lock()
+
+  def _semaphore(self, host: str) -> threading.Semaphore:
+    with self._lock:
+      sem = self._semaphores.get(host)
+      if sem is None:
+        sem = threading.BoundedSemaphore(self.limits.get(host, self.default_limit))
+        self._semaphores[host] = sem
+      return sem
+
+  @contextmanager
+  def slot(self, url_or_host: str):
+    host = urllib.parse.urlparse(url_or_host).hostname or url_or_host
+    sem = self._semaphore(host.lower())
+    with sem:
+      yield
+
+
+def is_retryable(error: Exception) -> bool:
+  import urllib.error
+
+  if isinstance(error, urllib.error.HTTPError):
+    return error.code in RETRYABLE_HTTP_STATUS
+  return isinstance(error, (urllib.error.URLError, socket.timeout, TimeoutError, ConnectionError))
+
+
+def with_retries(fn: Callable, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 4.0):
+  """
+  Executa fn() com backoff exponencial (com jitter) para erros transitórios
+  de rede / HTTP 429 / 5xx. Outros erros sobem imediatamente.
+  """
+  for attempt in range(attempts):
+    try:
+      return fn()
+    except Exception as e:
+      if attempt == attempts - 1 or not is_retryable(e):
+        raise
+      delay = min(max_delay, base_delay * (2 ** attempt))
+      time.sleep(delay * (0.5 + random.random() / 2))
+
+
+def map_bounded(fn: Callable, items: List, max_workers: int) -> List[Tuple[object, Optional[Exception]]]:
+  """
+  Aplica fn a cada item num pool de threads limitado, preservando a ordem.
+  Retorna [(resultado, erro)], sem interromper o lote por causa de um item.
+  """
+  def safe(item):
+    try:
+      return fn(item), None
+    except Exception as e:
+      return None, e
+
+  if not items:
+    return []
+  # concurrent.futures (e logging, que ele importa) só para importações em lote
+  from concurrent.futures import ThreadPoolExecutor
+
+  with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as pool:
+    return list(pool.map(safe, items))
@@ -1,50 +1,68 @@
+import base64
 import json
 import os
 import urllib.parse
-import urllib.request
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
-import boto3
-import pg8000
+from uniscreen_common import aws, secrets_cache
+from uniscreen_common.http import BadRequest, HttpError, Router, parse_body, response
+from uniscreen_common.rds import DB
 
+from fanout import HostLimiter, map_bounded, with_retries
+from omdb_cache import OmdbCache, cache_key
+from posters import copy_poster_to_s3
 
-s3 = boto3.client("s3")
 
+ROUTER = Router(default_resource="/movies", db=DB)
+OMDB_CACHE = OmdbCache(DB)
 
-def response(status_code: int, body: dict):
-  return {
-    "statusCode": status_code,
-    "headers": {"Content-Type": "application/json"},
-    "body": json.dumps(body),
-    "isBase64Encoded": False,
-  }
 
-
-def fetch_omdb(title: str, api_key: str):
-  qs = urllib.parse.urlencode({"t": title, "apikey": api_key})
+def fetch_omdb(title: Optional[str], api_key: str, imdb_id: Optional[str] = None):
+  lookup = {"i": imdb_id} if imdb_id else {"t": title}
+  qs = urllib.parse.urlencode({**lookup, "apikey": api_key})
   url = f"https://www.omdbapi.com/?{qs}"
+  # Importado aqui: a listagem (GET /movies) nunca chama o OMDb
+  import urllib.request
+
   with urllib.request.urlopen(url, timeout=15) as resp:
     data = resp.read()
     return json.loads(data.decode("utf-8"))
 
 
-def download_bytes(url: str) -> bytes:
-  with urllib.request.urlopen(url, timeout=20) as resp:
-    return resp.read()
-
-
 def s3_public_url(bucket: str, key: str) -> str:
   # Com bucket policy pública (s3:GetObject) habilitada, a URL direta funciona
   # Ex: https://<bucket>.s3.amazonaws.com/<key>
   return f"https://{bucket}.s3.amazonaws.com/{key}"
 
 
-def upload_poster_to_s3(bucket: str, key: str, data: bytes, content_type: str = "image/jpeg") -> str:
-  # Não define ACL pública explicitamente; a bucket policy cuidará do acesso público
-  s3.put_object(Bucket=bucket, Key=key, Body=data, ContentType=content_type)
+def upload_poster_to_s3(bucket: str, key: str, source_url: str) -> str:
+  # Streaming da origem direto para o S3; pula se o pôster não mudou
+  copy_poster_to_s3(aws.client("s3"), source_url, bucket, key)
   return s3_public_url(bucket, key)
 
 
+def request_poster_derivatives(posters_bucket: str, poster_urls: List[Optional[str]]):
+  """
+  Pede ao poster_derivatives (invocação assíncrona) as miniaturas dos pôsteres
+  copiados para o bucket. Chamado depois do commit do upsert, para que o
+  UPDATE de poster_variants encontre as linhas; se a invocação falhar, o
+  backfill agendado cobre.
+  """
+  function_name = os.environ.get("POSTER_DERIVATIVES_FUNCTION")
+  prefix = s3_public_url(posters_bucket, "posters/")
+  urls = sorted({u for u in poster_urls if u and u.startswith(prefix)})
+  if not function_name or not urls:
+    return
+  try:
+    aws.client("lambda").invoke(
+      FunctionName=function_name,
+      InvocationType="Event",
+      Payload=json.dumps({"action": "generate", "poster_urls": urls}).encode("utf-8"),
+    )
+  except Exception:
+    pass
+
+
 def parse_year(raw_year: Optional[str]) -> Optional[int]:
   if not raw_year or raw_year == "N/A":
     return None
@@ -61,97 +79,28 @@ def parse_year(raw_year: Optional[str]) -> Optional[int]:
     return None
 
 
-def get_rds_credentials() -> Tuple[str, str, str, int, str]:
-  """
-  Retorna (host, user, password, port, database) a partir das variáveis e Secret do RDS.
-  Espera-se que o Secret (RDS_SECRET_ID) tenha o formato padrão do AWS RDS:
-   {"username":"...", "password":"...", "engine":"postgres", "host":"...", "port":5432, "dbname":"..."}
-  """
-  region = os.environ.get("REGION") or os.environ.get("AWS_REGION") or "us-east-2"
-  secret_id = os.environ.get("RDS_SECRET_ID")
-  host_env = os.environ.get("DB_ENDPOINT")
-  port_env = os.environ.get("DB_PORT")
-  db_env = os.environ.get("DB_NAME")
-
-  if not secret_id:
-    raise RuntimeError("Missing RDS_SECRET_ID environment variable")
-
-  sm = boto3.client("secretsmanager", region_name=region)
-  sec = sm.get_secret_value(SecretId=secret_id)
-  secret_str = sec.get("SecretString") or "{}"
-  secret = json.loads(secret_str)
-
-  username = secret.get("username")
-  password = secret.get("password")
-  host = host_env or secret.get("host")
-  port = int(port_env or secret.get("port") or 5432)
-  database = db_env or secret.get("dbname")
-
-  if not (username and password and host and database):
-    raise RuntimeError("Incomplete RDS credentials (username/password/host/database)")
-
-  return host, username, password, port, database
-
-
 def upsert_movie(conn, title: str, year: Optional[int], director: Optional[str], actors: Optional[str],
                  plot: Optional[str], poster_url: Optional[str]) -> dict:
   """
-  Faz upsert com base em (title, year). Se existir, atualiza; senão, insere.
-  Como não há UNIQUE (title, year) no schema, faz SELECT antes.
+  Faz upsert com base em (title, year) em um único comando, usando o índice
+  único uq_movies_title_year (title, COALESCE(year, -1)), que trata year NULL
+  como um valor só.
   Retorna o registro (id, title, year, director, actors, plot, poster_url).
   """
   with conn.cursor() as cur:
-    # Evitar parâmetro None sem tipo (erro 42P18) em consultas
-    if year is None:
-      cur.execute(
-        """
-        SELECT id FROM public.movies
-        WHERE title = %s AND year IS NULL
-        """,
-        (title,),
-      )
-    else:
-      cur.execute(
-        """
-        SELECT id FROM public.movies
-        WHERE title = %s AND year = %s
-        """,
-        (title, year),
-      )
-    row = cur.fetchone()
-
-    if row:
-      movie_id = row[0]
-      cur.execute(
-        """
-        UPDATE public.movies
-        SET director = %s, actors = %s, plot = %s, poster_url = %s
-        WHERE id = %s
-        RETURNING id, title, year, director, actors, plot, poster_url
-        """,
-        (director, actors, plot, poster_url, movie_id),
-      )
-      res = cur.fetchone()
-    else:
-      if year is None:
-        cur.execute(
-          """
-          INSERT INTO public.movies (title, year, director, actors, plot, poster_url)
-          VALUES (%s, NULL::integer, %s, %s, %s, %s)
-          RETURNING id, title, year, director, actors, plot, poster_url
-          """,
-          (title, director, actors, plot, poster_url),
-        )
-      else:
-        cur.execute(
-          """
-          INSERT INTO public.movies (title, year, director, actors, plot, poster_url)
-          VALUES (%s, %s, %s, %s, %s, %s)
-          RETURNING id, title, year, director, actors, plot, poster_url
-          """,
-          (title, year, director, actors, plot, poster_url),
-        )
-      res = cur.fetchone()
+    # Cast explícito evita parâmetro None sem tipo (erro 42P18)
+    cur.execute(
+      """
+      INSERT INTO public.movies (title, year, director, actors, plot, poster_url)
+      VALUES (%s, %s::integer, %s, %s, %s, %s)
+      ON CONFLICT (title, (COALESCE(year, -1))) DO UPDATE
+      SET director = EXCLUDED.director, actors = EXCLUDED.actors,
+          plot = EXCLUDED.plot, poster_url = EXCLUDED.poster_url
+      RETURNING id, title, year, director, actors, plot, poster_url
+      """,
+      (title, year, director, actors, plot, poster_url),
+    )
+    res = cur.fetchone()
 
   return {
     "id": res[0],
@@ -163,126 +112,351 @@ def upsert_movie(conn, title: str, year: Optional[int], director: Optional[str],
     "poster_url": res[6],
   }
 
-def list_movies(conn) -> list[dict]:
+
+def upsert_movies(conn, movies: List[dict]) -> List[dict]:
+  """
+  Upsert multi-linha em um único INSERT ... ON CONFLICT (mesma chave de
+  upsert_movie). Itens repetidos no lote são mesclados (o último vence), já
+  que o ON CONFLICT não pode atualizar a mesma linha duas vezes.
+  """
+  unique = {}
+  for m in movies:
+    unique[(m["title"], m["year"])] = m
+  rows = list(unique.values())
+  if not rows:
+    return []
+
   with conn.cursor() as cur:
     cur.execute(
       """
-      SELECT id, title, year, director
-      FROM public.movies
-      ORDER BY id
-      """
+      INSERT INTO public.movies (title, year, director, actors, plot, poster_url)
+      SELECT * FROM unnest(%s::text[], %s::integer[], %s::text[], %s::text[], %s::text[], %s::text[])
+      ON CONFLICT (title, (COALESCE(year, -1))) DO UPDATE
+      SET director = EXCLUDED.director, actors = EXCLUDED.actors,
+          plot = EXCLUDED.plot, poster_url = EXCLUDED.poster_url
+      RETURNING id, title, year, director, actors, plot, poster_url
+      """,
+      tuple([r[col] for r in rows] for col in ("title", "year", "director", "actors", "plot", "poster_url")),
     )
-    rows = cur.fetchall()
-  return [{"id": r[0], "title": r[1], "year": r[2], "director": r[3]} for r in rows]
-
-
-def get_title_from_event(event) -> Optional[str]:
-  # Suporta POST (body JSON {"title": "..."})
-  method = event.get("httpMethod", "GET")
-  if method == "POST":
-    body = event.get("body")
-    if isinstance(body, str):
-      try:
-        data = json.loads(body or "{}")
-      except Exception:
-        data = {}
-    else:
-      data = body or {}
-    return data.get("title")
+    result = cur.fetchall()
+
+  return [
+    {"id": r[0], "title": r[1], "year": r[2], "director": r[3], "actors": r[4], "plot": r[5], "poster_url": r[6]}
+    for r in result
+  ]
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 
-  # Fallback GET com ?title=...
+def encode_page_token(after_id: int) -> str:
+  raw = json.dumps({"after_id": after_id}, separators=(",", ":")).encode("utf-8")
+  return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str) -> int:
+  try:
+    padded = token + "=" * (-len(token) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    return int(data["after_id"])
+  except Exception:
+    raise BadRequest("Invalid page_token")
+
+
+def _int_param(params: dict, name: str) -> Optional[int]:
+  raw = params.get(name)
+  if raw is None or raw == "":
+    return None
+  try:
+    return int(raw)
+  except (TypeError, ValueError):
+    raise BadRequest(f"Invalid '{name}' (expected integer)")
+
+
+def parse_list_params(event) -> dict:
+  """
+  Lê os parâmetros de listagem de GET /movies:
+   limit (1..MAX_PAGE_SIZE), page_token (opaco) ou after_id, year, director, title_prefix.
+  """
   params = event.get("queryStringParameters") or {}
-  return params.get("title")
+  limit = _int_param(params, "limit") or DEFAULT_PAGE_SIZE
+  limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+  after_id = _int_param(params, "after_id")
+  if params.get("page_token"):
+    after_id = decode_page_token(params["page_token"])
+
+  return {
+    "limit": limit,
+    "after_id": after_id,
+    "year": _int_param(params, "year"),
+    "director": params.get("director") or None,
+    "title_prefix": params.get("title_prefix") or None,
+  }
+
+
+def _like_prefix(prefix: str) -> str:
+  escaped = prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+  return escaped + "%"
+
+
+def list_movies(conn, limit: int = DEFAULT_PAGE_SIZE, after_id: Optional[int] = None,
+                year: Optional[int] = None, director: Optional[str] = None,
+                title_prefix: Optional[str] = None) -> Tuple[list, Optional[int]]:
+  """
+  Paginação por keyset (id > after_id ORDER BY id LIMIT n).
+  Busca limit + 1 linhas para saber se existe próxima página.
+  Retorna (linhas, after_id da próxima página ou None).
+  """
+  where = []
+  args = []
+  if after_id is not None:
+    where.append("id > %s")
+    args.append(after_id)
+  if year is not None:
+    where.append("year = %s")  # idx_movies_year
+    args.append(year)
+  if director:
+    where.append("director = %s")
+    args.append(director)
+  if title_prefix:
+    where.append("lower(title) LIKE %s")  # idx_movies_title_prefix
+    args.append(_like_prefix(title_prefix))
+  args.append(limit + 1)
+
+  sql = "SELECT id, title, year, director FROM public.movies"
+  if where:
+    sql += " WHERE " + " AND ".join(where)
+  sql += " ORDER BY id LIMIT %s"
+
+  with conn.cursor() as cur:
+    cur.execute(sql, tuple(args))
+    rows = cur.fetchall()
+
+  if len(rows) > limit:
+    rows = rows[:limit]
+    return rows, rows[-1][0]
+  return rows, None
+
+
+def encode_movies_page(rows, next_after_id: Optional[int]) -> str:
+  """
+  Serializa a página incrementalmente, linha a linha, sem montar uma lista de
+  dicts intermediária.
+  """
+  encode = json.JSONEncoder().encode
+  parts = ['{"movies": [']
+  for i, r in enumerate(rows):
+    if i:
+      parts.append(", ")
+    parts.append(encode({"id": r[0], "title": r[1], "year": r[2], "director": r[3]}))
+  token = encode_page_token(next_after_id) if next_after_id is not None else None
+  parts.append('], "next_page_token": ')
+  parts.append(encode(token))
+  parts.append("}")
+  return "".join(parts)
 
 
 def get_omdb_api_key_from_secret(region: str, omdb_secret_arn: str) -> str:
-  sm = boto3.client("secretsmanager", region_name=region)
-  sec = sm.get_secret_value(SecretId=omdb_secret_arn)
-  val = sec.get("SecretString") or "{}"
-  api = json.loads(val)
+  api = secrets_cache.get_secret_json(omdb_secret_arn, region)
   return api.get("OMDB_API_KEY", "")
 
 
-def lambda_handler(event, context):
+def movie_fields_from_omdb(omdb: dict, fallback_title: str, poster_url: Optional[str]) -> dict:
+  """Converte a resposta do OMDb nas colunas de public.movies."""
+  director = omdb.get("Director") if omdb.get("Director") != "N/A" else None
+
+  # Normalização de "actors": garantir string (separada por vírgulas) ou None
+  actors_raw = omdb.get("Actors")
+  if isinstance(actors_raw, list):
+    actors = ", ".join([str(a) for a in actors_raw if a and a != "N/A"]).strip() or None
+  elif isinstance(actors_raw, str):
+    actors = None if actors_raw.strip() == "" or actors_raw == "N/A" else actors_raw
+  else:
+    actors = None
+
+  poster_src = omdb.get("Poster")
+  return {
+    "title": omdb.get("Title") or fallback_title,
+    "year": parse_year(omdb.get("Year")),
+    "director": director,
+    "actors": actors,
+    "plot": omdb.get("Plot") if omdb.get("Plot") != "N/A" else None,
+    "poster_url": poster_url or (poster_src if poster_src and poster_src != "N/A" else None),
+  }
+
+
+def import_poster(omdb: dict, fallback_title: str, posters_bucket: str,
+                  upload: Callable[[str, str, str], str] = upload_poster_to_s3) -> Optional[str]:
+  """Copia o pôster do OMDb para o S3; falhas não bloqueiam a importação."""
+  poster_url_src = omdb.get("Poster")
+  if not poster_url_src or poster_url_src == "N/A":
+    return None
   try:
-    title = get_title_from_event(event)
-    method = event.get("httpMethod", "GET")
-    if method == "GET" and not title:
-      # Listar filmes diretamente do RDS
-      host, user, password, port, database = get_rds_credentials()
-      conn = pg8000.connect(user=user, password=password, host=host, port=port, database=database, ssl_context=True)
-      try:
-        movies = list_movies(conn)
-      finally:
-        try:
-          conn.close()
-        except Exception:
-          pass
-      return response(200, {"movies": movies})
+    safe_title = urllib.parse.quote_plus(omdb.get("Title") or fallback_title)
+    key = f"posters/{safe_title}.jpg"
+    return upload(posters_bucket, key, poster_url_src)
+  except Exception:
+    return None
 
-    if not title:
-      return response(400, {"error": "Missing 'title' (POST JSON body or query parameter)"})
 
-    posters_bucket = os.environ.get("POSTERS_BUCKET")
-    region = os.environ.get("REGION") or os.environ.get("AWS_REGION") or "us-east-2"
-    omdb_secret_arn = os.environ.get("OMDB_SECRET_ARN", "")
+MAX_BATCH_ITEMS = 100
+BATCH_WORKERS = 8
+OMDB_HOST = "www.omdbapi.com"
+OMDB_HOST_CONCURRENCY = 4
+POSTER_HOST_CONCURRENCY = 8
 
-    if not posters_bucket:
-      return response(500, {"error": "Lambda environment not configured (POSTERS_BUCKET)"})
 
-    # OMDb API key
-    if not omdb_secret_arn:
-      return response(500, {"error": "Missing OMDb API key secret ARN (OMDB_SECRET_ARN)"})
+def get_batch_items(data: dict) -> Optional[List[dict]]:
+  """
+  Modo lote do POST /movies: {"titles": [...]} e/ou {"imdb_ids": [...]}.
+  Retorna None quando o body não é um lote.
+  """
+  titles = data.get("titles")
+  imdb_ids = data.get("imdb_ids")
+  if titles is None and imdb_ids is None:
+    return None
+  if not isinstance(titles or [], list) or not isinstance(imdb_ids or [], list):
+    raise BadRequest("'titles' and 'imdb_ids' must be lists")
+  items = [{"title": str(t).strip()} for t in titles or [] if str(t or "").strip()]
+  items += [{"imdb_id": str(i).strip()} for i in imdb_ids or [] if str(i or "").strip()]
+  if not items:
+    raise BadRequest("Empty batch")
+  if len(items) > MAX_BATCH_ITEMS:
+    raise BadRequest(f"Batch too large (max {MAX_BATCH_ITEMS} items)")
+  return items
+
+
+def import_movies_batch(items: List[dict], posters_bucket: str, region: str, omdb_secret_arn: str) -> List[dict]:
+  """
+  Importa vários filmes: OMDb e pôsteres em paralelo (pool limitado, limite
+  por host e retry com backoff) e um único upsert multi-linha numa transação.
+  Retorna o status por item, na ordem de entrada.
+  """
+  keys = [cache_key(title=i.get("title"), imdb_id=i.get("imdb_id")) for i in items]
+  OMDB_CACHE.warm(keys)
+
+  api_key = None
+  if any(OMDB_CACHE.peek(k) is None for k in keys):
     api_key = get_omdb_api_key_from_secret(region, omdb_secret_arn)
     if not api_key:
-      return response(500, {"error": "Missing OMDb API key in Secrets Manager"})
+      raise RuntimeError("Missing OMDb API key in Secrets Manager")
 
-    # Fetch OMDb
-    omdb = fetch_omdb(title, api_key)
-    if not omdb or omdb.get("Response") != "True":
-      return response(404, {"error": "Movie not found on OMDb", "raw": omdb})
-
-    # Poster
-    poster_url_src = omdb.get("Poster")
-    uploaded_poster_url = None
-    if poster_url_src and poster_url_src != "N/A":
-      try:
-        content = download_bytes(poster_url_src)
-        safe_title = urllib.parse.quote_plus(omdb.get("Title") or title)
-        key = f"posters/{safe_title}.jpg"
-        uploaded_poster_url = upload_poster_to_s3(posters_bucket, key, content)
-      except Exception as e:
-        uploaded_poster_url = None  # Não bloquear fluxo principal
-
-    # Dados principais
-    title_out = omdb.get("Title") or title
-    year_out = parse_year(omdb.get("Year"))
-    director = omdb.get("Director") if omdb.get("Director") != "N/A" else None
-
-    # Normalização de "actors": garantir string (separada por vírgulas) ou None
-    actors_raw = omdb.get("Actors")
-    if isinstance(actors_raw, list):
-      actors = ", ".join([str(a) for a in actors_raw if a and a != "N/A"]).strip() or None
-    elif isinstance(actors_raw, str):
-      actors = None if actors_raw.strip() == "" or actors_raw == "N/A" else actors_raw
-    else:
-      actors = None
+  limiter = HostLimiter({OMDB_HOST: OMDB_HOST_CONCURRENCY}, default_limit=POSTER_HOST_CONCURRENCY)
 
-    plot = omdb.get("Plot") if omdb.get("Plot") != "N/A" else None
-    poster_final = uploaded_poster_url or (poster_url_src if poster_url_src != "N/A" else None)
+  def fetch_limited(item):
+    with limiter.slot(OMDB_HOST):
+      return fetch_omdb(item.get("title"), api_key, imdb_id=item.get("imdb_id"))
 
-    # Persistência no RDS (pg8000)
-    host, user, password, port, database = get_rds_credentials()
-    conn = pg8000.connect(user=user, password=password, host=host, port=port, database=database, ssl_context=True)
-    try:
-      movie_row = upsert_movie(conn, title_out, year_out, director, actors, plot, poster_final)
+  def upload_limited(bucket, key, source_url):
+    with limiter.slot(source_url):
+      return upload_poster_to_s3(bucket, key, source_url)
+
+  def work(pair):
+    item, key = pair
+    label = item.get("title") or item.get("imdb_id")
+    omdb = OMDB_CACHE.get(key, lambda: with_retries(lambda: fetch_limited(item)), use_db=False)
+    if not omdb or omdb.get("Response") != "True":
+      return {"input": label, "status": "not_found", "error": (omdb or {}).get("Error")}
+    poster = import_poster(omdb, label, posters_bucket,
+                           upload=lambda b, k, u: with_retries(lambda: upload_limited(b, k, u)))
+    return {"input": label, "status": "fetched", "fields": movie_fields_from_omdb(omdb, label, poster)}
+
+  outcomes = map_bounded(work, list(zip(items, keys)), BATCH_WORKERS)
+  OMDB_CACHE.flush()
+
+  results = []
+  for item, (res, err) in zip(items, outcomes):
+    if err is not None:
+      res = {"input": item.get("title") or item.get("imdb_id"), "status": "error", "error": str(err)}
+    results.append(res)
+
+  to_save = [r for r in results if r["status"] == "fetched"]
+  if to_save:
+    with DB.connection() as conn:
+      saved = upsert_movies(conn, [r["fields"] for r in to_save])
       conn.commit()
-    finally:
-      try:
-        conn.close()
-      except Exception:
-        pass
-
-    return response(200, {"message": "Movie upserted", "movie": movie_row})
-  except Exception as e:
-    return response(500, {"error": str(e)})
+    request_poster_derivatives(posters_bucket, [m["poster_url"] for m in saved])
+    by_key = {(m["title"], m["year"]): m for m in saved}
+    for r in to_save:
+      fields = r.pop("fields")
+      r["status"] = "imported"
+      r["movie"] = by_key.get((fields["title"], fields["year"]))
+  return results
+
+
+def import_config() -> Tuple[str, str, str]:
+  posters_bucket = os.environ.get("POSTERS_BUCKET")
+  region = os.environ.get("REGION") or os.environ.get("AWS_REGION") or "us-east-2"
+  omdb_secret_arn = os.environ.get("OMDB_SECRET_ARN", "")
+
+  if not posters_bucket:
+    raise HttpError("Lambda environment not configured (POSTERS_BUCKET)")
+  # OMDb API key
+  if not omdb_secret_arn:
+    raise HttpError("Missing OMDb API key secret ARN (OMDB_SECRET_ARN)")
+  return posters_bucket, region, omdb_secret_arn
+
+
+def import_movie(title: str):
+  posters_bucket, region, omdb_secret_arn = import_config()
+
+  def fetch_from_omdb():
+    # Só busca a chave e chama o OMDb em cache miss
+    api_key = get_omdb_api_key_from_secret(region, omdb_secret_arn)
+    if not api_key:
+      raise RuntimeError("Missing OMDb API key in Secrets Manager")
+    return fetch_omdb(title, api_key)
+
+  # Fetch OMDb (read-through cache)
+  omdb = OMDB_CACHE.get(cache_key(title=title), fetch_from_omdb)
+  if not omdb or omdb.get("Response") != "True":
+    return response(404, {"error": "Movie not found on OMDb", "raw": omdb})
+
+  # Poster + dados principais
+  uploaded_poster_url = import_poster(omdb, title, posters_bucket)
+  fields = movie_fields_from_omdb(omdb, title, uploaded_poster_url)
+
+  # Persistência no RDS (pg8000)
+  with DB.connection() as conn:
+    movie_row = upsert_movie(conn, fields["title"], fields["year"], fields["director"], fields["actors"],
+                             fields["plot"], fields["poster_url"])
+    conn.commit()
+  request_poster_derivatives(posters_bucket, [movie_row["poster_url"]])
+
+  return response(200, {"message": "Movie upserted", "movie": movie_row})
+
+
+@ROUTER.route("GET", "/movies", auth=True)
+def get_movies(event, context):
+  # Com ?title=... importa do OMDb (compatibilidade); sem, lista do RDS (paginado)
+  title = (event.get("queryStringParameters") or {}).get("title")
+  if title:
+    return import_movie(title)
+  list_params = parse_list_params(event)
+  rows, next_after_id = DB.call(lambda conn: list_movies(conn, **list_params))
+  return response(200, encode_movies_page(rows, next_after_id))
+
+
+@ROUTER.route("POST", "/movies", auth=True)
+def post_movies(event, context):
+  # {"title": "..."} ou lote {"titles": [...], "imdb_ids": [...]}
+  data = parse_body(event)
+  batch = get_batch_items(data)
+  if batch is None:
+    title = data.get("title")
+    if not title:
+      raise BadRequest("Missing 'title' (POST JSON body or query parameter)")
+    return import_movie(title)
+
+  posters_bucket, region, omdb_secret_arn = import_config()
+  results = import_movies_batch(batch, posters_bucket, region, omdb_secret_arn)
+  summary = {}
+  for r in results:
+    summary[r["status"]] = summary.get(r["status"], 0) + 1
+  return response(200, {"message": "Batch processed", "summary": summary, "results": results})
+
+
+def lambda_handler(event, context):
+  return ROUTER.dispatch(event, context)
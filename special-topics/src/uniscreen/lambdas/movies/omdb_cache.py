@@ -0,0 +1,207 @@
+import json
+import threading
+from typing import Callable, List, Optional
+
+from uniscreen_common.lru import TtlLru
+
+
+# Respostas encontradas ficam válidas por mais tempo que "Movie not found!"
+POSITIVE_TTL_SECONDS = 7 * 24 * 3600
+NEGATIVE_TTL_SECONDS = 6 * 3600
+MEMORY_MAX_ENTRIES = 256
+
+
+def normalize_title(title: str) -> str:
+  # "  The  Matrix " e "the matrix" compartilham a mesma entrada
+  return " ".join((title or "").split()).casefold()
+
+
+def cache_key(title: Optional[str] = None, imdb_id: Optional[str] = None) -> str:
+  # Busca por IMDb ID usa um prefixo para não colidir com títulos
+  if imdb_id:
+    return "imdb:" + imdb_id.strip().lower()
+  return normalize_title(title)
+
+
+def is_found(omdb: dict) -> bool:
+  return bool(omdb) and omdb.get("Response") == "True"
+
+
+def is_not_found(omdb: dict) -> bool:
+  # Apenas "not found" é cacheado como negativo; erros como limite de
+  # requisições ou chave inválida não devem ficar presos no cache.
+  return bool(omdb) and omdb.get("Response") == "False" and "not found" in (omdb.get("Error") or "").lower()
+
+
+class _InFlight:
+  def __init__(self):
+    self.event = threading.Event()
+    self.result = None
+    self.error = None
+
+
+class OmdbCache:
+  """
+  Cache read-through na frente do fetch_omdb:
+   1. LRU em memória (por container), com TTL;
+   2. tabela public.omdb_cache (compartilhada entre containers);
+   3. OMDb de fato, gravando o resultado nas camadas acima.
+  Consultas simultâneas ao mesmo título no container são coalescidas: apenas
+  uma vai ao banco/OMDb e as demais aguardam o mesmo resultado.
+
+  A conexão (ConnectionManager) não é thread-safe: em importações em lote,
+  use warm() antes de abrir as threads, get(..., use_db=False) dentro delas e
+  flush() ao final, todos na thread principal exceto o get().
+  """
+
+  def __init__(self, db, positive_ttl: float = POSITIVE_TTL_SECONDS,
+               negative_ttl: float = NEGATIVE_TTL_SECONDS, max_entries: int = MEMORY_MAX_ENTRIES):
+    self.db = db
+    self.positive_ttl = positive_ttl
+    self.negative_ttl = negative_ttl
+    self.max_entries = max_entries
+    # O TTL de cada entrada vem de _ttl_for (ou da validade restante no banco)
+    self._memory = TtlLru(max_entries, positive_ttl)
+    self._inflight = {}
+    self._pending = {}
+    self._lock = threading.Lock()
+
+  def _ttl_for(self, omdb: dict) -> Optional[float]:
+    if is_found(omdb):
+      return self.positive_ttl
+    if is_not_found(omdb):
+      return self.negative_ttl
+    return None
+
+  def _db_get(self, key: str) -> Optional[dict]:
+    def query(conn):
+      with conn.cursor() as cur:
+        cur.execute(
+          """
+          SELECT response, EXTRACT(EPOCH FROM (expires_at - NOW()))
+          FROM public.omdb_cache
+          WHERE title_key = %s AND expires_at > NOW()
+          """,
+          (key,),
+        )
+        return cur.fetchone()
+
+    try:
+      row = self.db.call(query)
+    except Exception:
+      return None  # cache é best-effort; segue para o OMDb
+    if not row:
+      return None
+    omdb = row[0] if isinstance(row[0], dict) else json.loads(row[0])
+    self._memory.put(key, omdb, ttl=float(row[1]))
+    return omdb
+
+  def _db_put_many(self, entries: dict):
+    # entries: {key: (omdb, ttl)} gravados num único INSERT ... ON CONFLICT
+    if not entries:
+      return
+    keys = list(entries)
+    try:
+      with self.db.connection() as conn:
+        with conn.cursor() as cur:
+          cur.execute(
+            """
+            INSERT INTO public.omdb_cache (title_key, found, response, fetched_at, expires_at)
+            SELECT k, f, r::jsonb, NOW(), NOW() + (t * INTERVAL '1 second')
+            FROM unnest(%s::text[], %s::boolean[], %s::text[], %s::integer[]) AS e(k, f, r, t)
+            ON CONFLICT (title_key) DO UPDATE
+            SET found = EXCLUDED.found, response = EXCLUDED.response,
+                fetched_at = EXCLUDED.fetched_at, expires_at = EXCLUDED.expires_at
+            """,
+            (
+              keys,
+              [is_found(entries[k][0]) for k in keys],
+              [json.dumps(entries[k][0]) for k in keys],
+              [int(entries[k][1]) for k in keys],
+            ),
+          )
+        conn.commit()
+    except Exception:
+      pass
+
+  def warm(self, keys: List[str]):
+    """Carrega do banco, numa única consulta, as entradas válidas para `keys`."""
+    missing = [k for k in dict.fromkeys(keys) if k and self._memory.get(k) is None]
+    if not missing:
+      return
+
+    def query(conn):
+      with conn.cursor() as cur:
+        cur.execute(
+          """
+          SELECT title_key, response, EXTRACT(EPOCH FROM (expires_at - NOW()))
+          FROM public.omdb_cache
+          WHERE title_key = ANY(%s) AND expires_at > NOW()
+          """,
+          (missing,),
+        )
+        return cur.fetchall()
+
+    try:
+      rows = self.db.call(query)
+    except Exception:
+      return
+    for key, omdb, ttl in rows:
+      self._memory.put(key, omdb if isinstance(omdb, dict) else json.loads(omdb), ttl=float(ttl))
+
+  def peek(self, key: str) -> Optional[dict]:
+    return self._memory.get(key)
+
+  def flush(self):
+    """Grava no banco as respostas obtidas com get(..., use_db=False)."""
+    with self._lock:
+      pending, self._pending = self._pending, {}
+    self._db_put_many(pending)
+
+  def _load(self, key: str, fetch: Callable[[], dict], use_db: bool) -> dict:
+    if use_db:
+      omdb = self._db_get(key)
+      if omdb is not None:
+        return omdb
+    omdb = fetch()
+    ttl = self._ttl_for(omdb)
+    if ttl is not None:
+      self._memory.put(key, omdb, ttl=ttl)
+      if use_db:
+        self._db_put_many({key: (omdb, ttl)})
+      else:
+        with self._lock:
+          self._pending[key] = (omdb, ttl)
+    return omdb
+
+  def get(self, key: str, fetch: Callable[[], dict], use_db: bool = True) -> dict:
+    """
+    Retorna a resposta do OMDb para a chave (ver cache_key), chamando fetch()
+    apenas em cache miss.
+    """
+    omdb = self._memory.get(key)
+    if omdb is not None:
+      return omdb
+
+    with self._lock:
+      call = self._inflight.get(key)
+      leader = call is None
+      if leader:
+        call = self._inflight[key] = _InFlight()
+
+    if not leader:
+      call.event.wait()
+      if call.error is not None:
+        raise call.error
+      return call.result
+
+    try:
+      call.result = self._load(key, fetch, use_db)
+      return call.result
+    except BaseException as e:
+      call.error = e
+      raise
+    finally:
+      with self._lock:
+        self._inflight.pop(key, None)
+      call.event.set()
@@ -0,0 +1,156 @@
+import functools
+from typing import Optional
+
+
+DOWNLOAD_TIMEOUT_SECONDS = 20
+SNIFF_BYTES = 16
+
+# Metadados gravados no objeto do S3 para saber de onde veio o pôster
+META_SOURCE_URL = "source-url"
+META_SOURCE_ETAG = "source-etag"
+META_SOURCE_LENGTH = "source-length"
+
+MAGIC_NUMBERS = (
+  (b"\xff\xd8\xff", "image/jpeg"),
+  (b"\x89PNG\r\n\x1a\n", "image/png"),
+  (b"GIF87a", "image/gif"),
+  (b"GIF89a", "image/gif"),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def transfer_config():
+  """
+  Pôsteres costumam ter < 1 MB: upload simples até 8 MB, multipart acima disso,
+  sem threads extras (a importação em lote já roda em um pool próprio).
+  Criado no primeiro upload para não importar boto3 no cold start.
+  """
+  from boto3.s3.transfer import TransferConfig
+
+  return TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    use_threads=False,
+  )
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+  for magic, content_type in MAGIC_NUMBERS:
+    if head.startswith(magic):
+      return content_type
+  if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+    return "image/webp"
+  return None
+
+
+def detect_content_type(header_value: Optional[str], head: bytes) -> str:
+  """
+  Prefere os magic bytes (o CDN às vezes responde application/octet-stream);
+  cai para o Content-Type do upstream e, por fim, image/jpeg.
+  """
+  sniffed = sniff_content_type(head)
+  if sniffed:
+    return sniffed
+  declared = (header_value or "").split(";")[0].strip().lower()
+  if declared.startswith("image/"):
+    return declared
+  return "image/jpeg"
+
+
+class _PrefixedStream:
+  """Reinsere no início da leitura os bytes já consumidos para o sniffing."""
+
+  def __init__(self, head: bytes, stream):
+    self._head = head
+    self._stream = stream
+    self.bytes_read = 0
+
+  def read(self, size: int = -1) -> bytes:
+    if self._head:
+      if size is None or size < 0:
+        data = self._head + self._stream.read()
+        self._head = b""
+      else:
+        data, self._head = self._head[:size], self._head[size:]
+    else:
+      data = self._stream.read(size)
+    self.bytes_read += len(data)
+    return data
+
+
+def head_poster(s3, bucket: str, key: str) -> Optional[dict]:
+  from botocore.exceptions import ClientError
+
+  try:
+    return s3.head_object(Bucket=bucket, Key=key)
+  except ClientError as e:
+    if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+      return None
+    raise
+
+
+def copy_poster_to_s3(s3, source_url: str, bucket: str, key: str) -> dict:
+  """
+  Copia o pôster do OMDb para o S3 em streaming (sem carregar a imagem inteira
+  em memória). Origem e ETag/Content-Length do upstream ficam nos metadados do
+  objeto; numa reimportação:
+   - mesma URL de origem: nada é baixado nem enviado;
+   - URL diferente com o mesmo ETag (GET condicional -> 304): idem.
+  Retorna {"key", "skipped", "content_type", "content_length", "source_etag"}.
+  """
+  import urllib.error
+  import urllib.request
+
+  existing = head_poster(s3, bucket, key)
+  meta = (existing or {}).get("Metadata") or {}
+  if existing is not None and meta.get(META_SOURCE_URL) == source_url:
+    return {
+      "key": key,
+      "skipped": True,
+      "content_type": existing.get("ContentType"),
+      "content_length": existing.get("ContentLength"),
+      "source_etag": meta.get(META_SOURCE_ETAG),
+    }
+
+  request = urllib.request.Request(source_url)
+  if existing is not None and meta.get(META_SOURCE_ETAG):
+    request.add_header("If-None-Match", meta[META_SOURCE_ETAG])
+
+  try:
+    resp = urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT_SECONDS)
+  except urllib.error.HTTPError as e:
+    if e.code == 304:
+      return {
+        "key": key,
+        "skipped": True,
+        "content_type": existing.get("ContentType"),
+        "content_length": existing.get("ContentLength"),
+        "source_etag": meta.get(META_SOURCE_ETAG),
+      }
+    raise
+
+  with resp:
+    head = resp.read(SNIFF_BYTES)
+    content_type = detect_content_type(resp.headers.get("Content-Type"), head)
+    source_etag = resp.headers.get("ETag") or ""
+    metadata = {META_SOURCE_URL: source_url, META_SOURCE_ETAG: source_etag}
+    if resp.headers.get("Content-Length"):
+      metadata[META_SOURCE_LENGTH] = resp.headers["Content-Length"]
+
+    body = _PrefixedStream(head, resp)
+    # Não define ACL pública explicitamente; a bucket policy cuidará do acesso público
+    s3.upload_fileobj(
+      body,
+      bucket,
+      key,
+      ExtraArgs={"ContentType": content_type, "Metadata": metadata},
+      Config=transfer_config(),
+    )
+
+  return {
+    "key": key,
+    "skipped": False,
+    "content_type": content_type,
+    "content_length": body.bytes_read,
+    "source_etag": source_etag or None,
+  }
@@ -0,0 +1,203 @@
+import io
+import json
+import os
+from typing import List, Optional, Tuple
+
+from uniscreen_common import aws
+from uniscreen_common.http import response
+from uniscreen_common.rds import DB
+
+
+# Larguras fixas das miniaturas; cada uma é gerada em JPEG e WebP
+THUMBNAIL_WIDTHS = (160, 320, 640)
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+ORIGINALS_PREFIX = "posters/"
+DERIVATIVES_PREFIX = "derivatives/"
+CACHE_CONTROL = "public, max-age=86400"
+BACKFILL_DEFAULT_LIMIT = 50
+FORMAT_NAMES = {"jpg": "jpeg", "webp": "webp"}
+# ETag do original a partir do qual a variante foi gerada
+META_ORIGINAL_ETAG = "original-etag"
+
+
+def s3_public_url(bucket: str, key: str) -> str:
+  # Mesmo formato de get_movies.s3_public_url (bucket policy pública)
+  return f"https://{bucket}.s3.amazonaws.com/{key}"
+
+
+def derivative_prefix(original_key: str) -> str:
+  # posters/Inception.jpg -> derivatives/Inception/
+  name = original_key[len(ORIGINALS_PREFIX):] if original_key.startswith(ORIGINALS_PREFIX) else original_key
+  stem = name.rsplit(".", 1)[0]
+  return f"{DERIVATIVES_PREFIX}{stem}/"
+
+
+def head_object(s3, bucket: str, key: str) -> Optional[dict]:
+  from botocore.exceptions import ClientError
+
+  try:
+    return s3.head_object(Bucket=bucket, Key=key)
+  except ClientError as e:
+    if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+      return None
+    raise
+
+
+def existing_variants(s3, bucket: str, prefix: str, original_etag: str) -> Optional[dict]:
+  """
+  Mapa de variantes se todas já estão no S3 e vieram deste mesmo original;
+  None se alguma falta (ou é de uma versão anterior do pôster). Variantes
+  gravadas sem o ETag do original são aproveitadas.
+  """
+  variants = {}
+  for width in THUMBNAIL_WIDTHS:
+    for ext, fmt in FORMAT_NAMES.items():
+      key = f"{prefix}w{width}.{ext}"
+      head = head_object(s3, bucket, key)
+      if head is None:
+        return None
+      source = (head.get("Metadata") or {}).get(META_ORIGINAL_ETAG)
+      if source is not None and source != original_etag:
+        return None
+      variants.setdefault(f"w{width}", {})[fmt] = s3_public_url(bucket, key)
+  return variants
+
+
+def render_variants(data: bytes) -> List[Tuple[str, str, bytes]]:
+  """
+  Gera as miniaturas a partir do pôster original.
+  Retorna [(nome, content_type, bytes)], ex.: ("w320.webp", "image/webp", ...).
+  """
+  # Pillow vem da layer de imagens; importado aqui para não pesar o cold start
+  from PIL import Image
+
+  with Image.open(io.BytesIO(data)) as img:
+    img = img.convert("RGB")
+    out = []
+    for width in THUMBNAIL_WIDTHS:
+      if img.width > width:
+        height = max(1, round(img.height * width / img.width))
+        thumb = img.resize((width, height), Image.LANCZOS)
+      else:
+        thumb = img
+
+      buf = io.BytesIO()
+      thumb.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+      out.append((f"w{width}.jpg", "image/jpeg", buf.getvalue()))
+
+      buf = io.BytesIO()
+      thumb.save(buf, format="WEBP", quality=WEBP_QUALITY, method=4)
+      out.append((f"w{width}.webp", "image/webp", buf.getvalue()))
+    return out
+
+
+def generate_derivatives(bucket: str, original_key: str) -> dict:
+  """
+  Grava as variantes do pôster original em derivatives/{titulo}/ e retorna o
+  mapa {"w160": {"jpeg": url, "webp": url}, ...}. Se as variantes desse
+  original já existem no S3, só monta o mapa (sem baixar nem redimensionar).
+  """
+  s3 = aws.client("s3")
+  prefix = derivative_prefix(original_key)
+  original = s3.head_object(Bucket=bucket, Key=original_key)
+  etag = original.get("ETag") or ""
+  variants = existing_variants(s3, bucket, prefix, etag)
+  if variants is not None:
+    return variants
+
+  obj = s3.get_object(Bucket=bucket, Key=original_key)
+  data = obj["Body"].read()
+  etag = obj.get("ETag") or etag
+  variants = {}
+  for name, content_type, body in render_variants(data):
+    key = prefix + name
+    s3.put_object(Bucket=bucket, Key=key, Body=body, ContentType=content_type, CacheControl=CACHE_CONTROL,
+                  Metadata={META_ORIGINAL_ETAG: etag})
+    size, ext = name.split(".")
+    variants.setdefault(size, {})[FORMAT_NAMES[ext]] = s3_public_url(bucket, key)
+  return variants
+
+
+def record_variants(conn, poster_url: str, variants: dict) -> int:
+  with conn.cursor() as cur:
+    cur.execute(
+      "UPDATE public.movies SET poster_variants = %s::jsonb WHERE poster_url = %s",
+      (json.dumps(variants), poster_url),
+    )
+    return cur.rowcount or 0
+
+
+def process_posters(bucket: str, poster_urls: List[str], mark_failed: bool) -> List[dict]:
+  """
+  Gera e grava as variantes de cada pôster do bucket. Com mark_failed, um
+  pôster inválido recebe {} (o backfill não tenta de novo a cada execução);
+  sem, fica NULL para o backfill tentar mais tarde.
+  """
+  base_url = s3_public_url(bucket, "")
+  results = []
+  for poster_url in poster_urls:
+    key = poster_url[len(base_url):]
+    if not poster_url.startswith(base_url) or not key.startswith(ORIGINALS_PREFIX):
+      results.append({"key": None, "movies_updated": 0, "error": "Not a poster of this bucket"})
+      continue
+    try:
+      variants = generate_derivatives(bucket, key)
+    except Exception as e:
+      if not mark_failed:
+        results.append({"key": key, "movies_updated": 0, "error": str(e)})
+        continue
+      variants, error = {}, str(e)
+    else:
+      error = None
+    with DB.connection() as conn:
+      updated = record_variants(conn, poster_url, variants)
+      conn.commit()
+    results.append({"key": key, "movies_updated": updated, "error": error})
+  return results
+
+
+def backfill(bucket: str, limit: int) -> List[dict]:
+  """Processa filmes com pôster no bucket e ainda sem poster_variants."""
+  prefix_url = s3_public_url(bucket, ORIGINALS_PREFIX)
+  with DB.connection() as conn:
+    with conn.cursor() as cur:
+      cur.execute(
+        """
+        SELECT DISTINCT poster_url
+        FROM public.movies
+        WHERE poster_variants IS NULL AND poster_url LIKE %s
+        LIMIT %s
+        """,
+        (prefix_url + "%", limit),
+      )
+      poster_urls = [r[0] for r in cur.fetchall()]
+
+  return process_posters(bucket, poster_urls, mark_failed=True)
+
+
+def lambda_handler(event, context):
+  """
+  - {"action": "generate", "poster_urls": [...]}: invocação assíncrona da
+    importação de filmes (get_movies), feita depois do commit do upsert, para
+    que o UPDATE de poster_variants encontre as linhas.
+  - {"action": "backfill", "limit": N} (agendado/invocação direta): processa
+    filmes sem variantes (importações antigas ou cuja invocação falhou).
+  """
+  DB.begin_invocation()
+  try:
+    bucket = os.environ.get("POSTERS_BUCKET")
+    if not bucket:
+      return response(500, {"error": "Lambda environment not configured (POSTERS_BUCKET)"})
+    action = event.get("action") or "backfill"
+    if action == "generate":
+      poster_urls = [u for u in event.get("poster_urls") or [] if isinstance(u, str)]
+      return response(200, {"processed": process_posters(bucket, poster_urls, mark_failed=False)})
+    if action != "backfill":
+      return response(400, {"error": "Unsupported action"})
+    limit = int(event.get("limit") or BACKFILL_DEFAULT_LIMIT)
+    return response(200, {"processed": backfill(bucket, limit)})
+  except Exception as e:
+    return response(500, {"error": str(e)})
+  finally:
+    DB.report("poster_derivatives")
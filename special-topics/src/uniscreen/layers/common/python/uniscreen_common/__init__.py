@@ -0,0 +1,3 @@
+"""
+Código compartilhado pelas Lambdas do UniScreen (publicado como Lambda Layer).
+"""
@@ -0,0 +1,30 @@
+"""
+Registro preguiçoso de clients boto3.
+
+boto3/botocore só são importados, e cada client só é construído, na primeira
+vez em que alguma rota precisa dele: uma listagem de filmes não paga o client
+de S3 nem o de Cognito no cold start. Os clients ficam no container e são
+reaproveitados entre invocações (e entre rotas, no handler monólito).
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+
+_clients: Dict[Tuple[str, Optional[str]], object] = {}
+_lock = threading.Lock()
+
+
+def client(service: str, region: Optional[str] = None):
+  """Retorna o client boto3 de `service` (um por serviço/região), criando-o no primeiro uso."""
+  key = (service, region)
+  found = _clients.get(key)
+  if found is None:
+    with _lock:
+      found = _clients.get(key)
+      if found is None:
+        import boto3
+
+        found = boto3.client(service, region_name=region) if region else boto3.client(service)
+        _clients[key] = found
+  return found
+
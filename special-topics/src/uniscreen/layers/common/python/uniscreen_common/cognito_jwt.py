@@ -0,0 +1,207 @@
+"""
+Verificação local de ID/access tokens do Cognito (RS256), sem o authorizer do
+API Gateway.
+
+- JWKS do user pool em cache no container (TTL), recarregado quando aparece um
+  kid desconhecido (rotação de chaves), no máximo uma vez por minuto.
+- A assinatura é verificada uma vez por token: tokens já verificados ficam num
+  LRU limitado até expirarem, e a próxima requisição com o mesmo token só
+  consulta o cache.
+- RSASSA-PKCS1-v1_5/SHA-256 com pow() do Python: a camada não traz
+  bibliotecas de criptografia e a verificação (e = 65537) custa microssegundos.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from uniscreen_common.lru import TtlLru
+
+
+JWKS_TTL_SECONDS = 3600.0
+JWKS_MIN_REFRESH_SECONDS = 60.0
+JWKS_TIMEOUT_SECONDS = 5
+VERIFIED_MAX_TOKENS = 2048
+
+# DigestInfo DER de SHA-256 que precede o hash no bloco PKCS#1 v1.5 (RFC 8017, 9.2)
+SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+
+
+class InvalidToken(Exception):
+  pass
+
+
+class JwksUnavailable(Exception):
+  """JWKS do user pool inacessível ou inválido, sem chaves anteriores para usar."""
+
+
+def _b64url_decode(data: str) -> bytes:
+  return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _b64url_int(data: str) -> int:
+  return int.from_bytes(_b64url_decode(data), "big")
+
+
+def rsa_sha256_verify(modulus: int, exponent: int, message: bytes, signature: bytes) -> bool:
+  """
+  Verifica RSASSA-PKCS1-v1_5 com SHA-256. Monta o bloco esperado e compara
+  por inteiro (sem interpretar o bloco decifrado).
+  """
+  k = (modulus.bit_length() + 7) // 8
+  if len(signature) != k:
+    return False
+  s = int.from_bytes(signature, "big")
+  if s >= modulus:
+    return False
+  t = SHA256_DIGEST_INFO + hashlib.sha256(message).digest()
+  if k < len(t) + 11:
+    return False
+  expected = b"\x00\x01" + b"\xff" * (k - len(t) - 3) + b"\x00" + t
+  return hmac.compare_digest(pow(s, exponent, modulus).to_bytes(k, "big"), expected)
+
+
+def _fetch_json(url: str) -> dict:
+  import urllib.request
+
+  with urllib.request.urlopen(url, timeout=JWKS_TIMEOUT_SECONDS) as resp:
+    return json.loads(resp.read().decode("utf-8"))
+
+
+class CognitoVerifier:
+  """
+  Verifica tokens de um user pool para os app clients informados.
+  Retorna as claims (mesmo formato de requestContext.authorizer.claims).
+  """
+
+  def __init__(self, region: str, user_pool_id: str, client_ids: Iterable[str],
+               jwks_ttl: float = JWKS_TTL_SECONDS, max_tokens: int = VERIFIED_MAX_TOKENS,
+               fetch_json=_fetch_json):
+    self.issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+    self.jwks_url = self.issuer + "/.well-known/jwks.json"
+    self.client_ids = frozenset(client_ids)
+    self.jwks_ttl = jwks_ttl
+    self._fetch_json = fetch_json
+    self._keys: Dict[str, Tuple[int, int]] = {}
+    self._keys_expire_at = 0.0
+    self._last_fetch = float("-inf")
+    self._lock = threading.Lock()
+    self._verified = TtlLru(max_tokens, jwks_ttl)
+
+  def _load_keys(self):
+    now = time.monotonic()
+    self._last_fetch = now
+    try:
+      jwks = self._fetch_json(self.jwks_url)
+      if not isinstance(jwks, dict):
+        raise ValueError("Invalid JWKS")
+      keys = {}
+      for jwk in jwks.get("keys") or []:
+        if not isinstance(jwk, dict) or jwk.get("kty") != "RSA":
+          continue
+        kid, modulus, exponent = jwk.get("kid"), jwk.get("n"), jwk.get("e")
+        if isinstance(kid, str) and isinstance(modulus, str) and isinstance(exponent, str):
+          keys[kid] = (_b64url_int(modulus), _b64url_int(exponent))
+      if not keys:
+        raise ValueError("JWKS without RSA keys")
+    except Exception as e:
+      # Falha de rede/JSON: segue com as chaves anteriores (se houver) e tenta
+      # de novo depois do intervalo mínimo
+      if not self._keys:
+        raise JwksUnavailable(str(e)) from e
+      self._keys_expire_at = now + JWKS_MIN_REFRESH_SECONDS
+      return
+    self._keys = keys
+    self._keys_expire_at = now + self.jwks_ttl
+
+  def _key(self, kid: Optional[str]) -> Tuple[int, int]:
+    if not isinstance(kid, str):
+      raise InvalidToken("Invalid key id")
+    key = self._keys.get(kid) if time.monotonic() < self._keys_expire_at else None
+    if key is None:
+      with self._lock:
+        now = time.monotonic()
+        expired = now >= self._keys_expire_at
+        key = None if expired else self._keys.get(kid)
+        # kid desconhecido com o JWKS ainda válido (rotação de chaves): recarrega
+        # no máximo uma vez por minuto, para que tokens forjados não virem uma
+        # chamada ao Cognito por requisição
+        if key is None and (expired or now - self._last_fetch >= JWKS_MIN_REFRESH_SECONDS):
+          self._load_keys()
+          key = self._keys.get(kid)
+    if key is None:
+      raise InvalidToken("Unknown signing key")
+    return key
+
+  def _check_claims(self, claims: dict, now: float):
+    if claims.get("iss") != self.issuer:
+      raise InvalidToken("Invalid issuer")
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= now:
+      raise InvalidToken("Token expired")
+    token_use = claims.get("token_use")
+    if token_use == "id":
+      audience = claims.get("aud")
+    elif token_use == "access":
+      audience = claims.get("client_id")
+    else:
+      raise InvalidToken("Invalid token_use")
+    if audience not in self.client_ids:
+      raise InvalidToken("Invalid audience")
+
+  def verify(self, token: str) -> dict:
+    claims = self._verified.get(token)
+    if claims is not None:
+      return claims
+
+    parts = token.split(".")
+    if len(parts) != 3:
+      raise InvalidToken("Malformed token")
+    try:
+      header = json.loads(_b64url_decode(parts[0]))
+      claims = json.loads(_b64url_decode(parts[1]))
+      signature = _b64url_decode(parts[2])
+    except ValueError:
+      raise InvalidToken("Malformed token")
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+      raise InvalidToken("Malformed token")
+    if header.get("alg") != "RS256":
+      raise InvalidToken("Unsupported algorithm")
+
+    modulus, exponent = self._key(header.get("kid"))
+    signed = (parts[0] + "." + parts[1]).encode("ascii")
+    if not rsa_sha256_verify(modulus, exponent, signed, signature):
+      raise InvalidToken("Invalid signature")
+
+    now = time.time()
+    self._check_claims(claims, now)
+    # Fica em cache só até expirar
+    self._verified.put(token, claims, ttl=min(self.jwks_ttl, claims["exp"] - now))
+    return claims
+
+
+_default: Optional[CognitoVerifier] = None
+_default_lock = threading.Lock()
+
+
+def default_verifier() -> Optional[CognitoVerifier]:
+  """
+  Verificador do user pool da função (USER_POOL_ID / USER_POOL_CLIENT_ID);
+  None se a função não tiver essas variáveis.
+  """
+  global _default
+  if _default is None:
+    user_pool_id = os.environ.get("USER_POOL_ID")
+    client_id = os.environ.get("USER_POOL_CLIENT_ID")
+    if not user_pool_id or not client_id:
+      return None
+    # O id do pool começa pela região (us-east-2_XXXX), que compõe o issuer
+    region = user_pool_id.split("_", 1)[0]
+    with _default_lock:
+      if _default is None:
+        _default = CognitoVerifier(region, user_pool_id, [client_id])
+  return _default
@@ -0,0 +1,215 @@
+import json
+import os
+import select
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+
+# (host, user, password, port, database), mesmo formato de get_rds_credentials()
+Credentials = Tuple[str, str, str, int, str]
+
+# Conexões ociosas há menos tempo que isso são reutilizadas sem ping ao servidor
+DEFAULT_MAX_IDLE_SECONDS = 240.0
+DEFAULT_CONNECT_TIMEOUT = 10
+# Prepared statements mantidos por conexão (as consultas fixas das Lambdas
+# cabem com folga); DB_STATEMENT_CACHE_SIZE=0 volta ao PARSE a cada execute.
+# Depois de um DDL que muda o resultado de uma consulta em cache, ela é
+# preparada de novo sozinha se for a primeira da transação; no meio de uma
+# transação o erro 0A000 chega uma vez ao chamador
+DEFAULT_STATEMENT_CACHE_SIZE = 64
+
+# SQLSTATE de falha de autenticação (senha inválida / autorização negada)
+AUTH_FAILURE_CODES = ("28P01", "28000")
+
+
+def _pg8000():
+  # Importado só na primeira conexão: pg8000 -> scramp -> asn1crypto pesa no
+  # cold start e rotas que não chegam ao banco (cache hit, auth) não precisam dele
+  import pg8000
+  return pg8000
+
+
+def ssl_enabled() -> bool:
+  # DB_SSL=false só para execuções locais (Postgres sem TLS); no RDS fica ligado
+  return (os.environ.get("DB_SSL") or "true").strip().lower() not in ("0", "false", "no", "disable")
+
+
+def statement_cache_size() -> int:
+  value = (os.environ.get("DB_STATEMENT_CACHE_SIZE") or "").strip()
+  return int(value) if value else DEFAULT_STATEMENT_CACHE_SIZE
+
+
+def binary_results() -> bool:
+  # Opt-in: DB_BINARY_RESULTS=true pede colunas int/float/bool/bytea/date/
+  # timestamp/uuid em formato binário nos prepared statements do cache
+  return (os.environ.get("DB_BINARY_RESULTS") or "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_auth_failure(error: Exception) -> bool:
+  msg = error.args[0] if error.args else None
+  return isinstance(msg, dict) and msg.get("C") in AUTH_FAILURE_CODES
+
+
+class ConnectionManager:
+  """
+  Mantém uma única conexão pg8000 por container Lambda (warm start).
+
+  Antes de reutilizar, valida a conexão de forma barata: o socket não pode ter
+  dados pendentes (FIN/erro do servidor) e, se ficou ociosa por muito tempo,
+  faz um "SELECT 1". Transações abertas ou falhas são desfeitas ao devolver a
+  conexão, e erros de rede descartam a conexão para que a próxima chamada
+  reconecte de forma transparente.
+  """
+
+  def __init__(self, credentials_loader: Callable[[], Credentials],
+               max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS,
+               connect_timeout: Optional[int] = DEFAULT_CONNECT_TIMEOUT,
+               on_auth_failure: Optional[Callable[[], None]] = None):
+    # Público para que ferramentas locais (scripts/load_test.py) apontem para outro banco
+    self.credentials_loader = credentials_loader
+    self._on_auth_failure = on_auth_failure
+    self.max_idle_seconds = max_idle_seconds
+    self.connect_timeout = connect_timeout
+    self._conn = None
+    self._last_used = 0.0
+    self.stats = {}
+    self.begin_invocation()
+
+  def begin_invocation(self):
+    """Zera os contadores por invocação (chamar no início do handler)."""
+    self.stats = {"reused": 0, "connected": 0, "discarded": 0}
+
+  def report(self, route: str = ""):
+    """Emite uma linha de log estruturada com os contadores da invocação."""
+    print(json.dumps({"db_connections": dict(self.stats), "route": route}))
+
+  def _open(self):
+    host, user, password, port, database = self.credentials_loader()
+    return _pg8000().connect(
+      user=user,
+      password=password,
+      host=host,
+      port=port,
+      database=database,
+      ssl_context=True if ssl_enabled() else None,
+      timeout=self.connect_timeout,
+      statement_cache_size=statement_cache_size(),
+      binary_results=binary_results(),
+    )
+
+  def _connect(self):
+    try:
+      conn = self._open()
+    except _pg8000().Error as e:
+      # Senha rotacionada: descarta as credenciais em cache e tenta uma vez
+      if self._on_auth_failure is None or not is_auth_failure(e):
+        raise
+      self._on_auth_failure()
+      conn = self._open()
+    self.stats["connected"] += 1
+    return conn
+
+  def discard(self):
+    """Fecha e esquece a conexão atual (ex.: após erro de rede)."""
+    conn, self._conn = self._conn, None
+    if conn is None:
+      return
+    self.stats["discarded"] += 1
+    try:
+      conn.close()
+    except Exception:
+      pass
+
+  def _socket_is_clean(self, conn) -> bool:
+    # Uma conexão ociosa não deve ter nada para ler: se o socket estiver
+    # legível, o servidor encerrou a sessão (EOF ou ErrorResponse FATAL).
+    usock = getattr(conn, "_usock", None)
+    if usock is None:
+      return False
+    try:
+      readable, _, _ = select.select([usock], [], [], 0)
+    except (OSError, ValueError):
+      return False
+    return not readable
+
+  def _is_healthy(self, conn) -> bool:
+    if not self._socket_is_clean(conn):
+      return False
+    try:
+      if conn._in_transaction:
+        # Transação esquecida/falha de uma invocação anterior; o ROLLBACK
+        # também serve de ping.
+        conn.rollback()
+      elif time.monotonic() - self._last_used > self.max_idle_seconds:
+        conn.run("SELECT 1")
+    except Exception:
+      return False
+    return True
+
+  def acquire(self):
+    """Retorna uma conexão validada, reconectando se necessário."""
+    conn = self._conn
+    if conn is not None:
+      if self._is_healthy(conn):
+        self.stats["reused"] += 1
+        return conn
+      self.discard()
+    self._conn = self._connect()
+    return self._conn
+
+  def release(self, failed: bool = False):
+    """
+    Devolve a conexão para reuso. Qualquer transação ainda aberta é desfeita,
+    preservando a semântica antiga de close() sem commit.
+    """
+    conn = self._conn
+    if conn is None:
+      return
+    if failed and not self._socket_is_clean(conn):
+      self.discard()
+      return
+    try:
+      if conn._in_transaction:
+        conn.rollback()
+    except Exception:
+      self.discard()
+      return
+    self._last_used = time.monotonic()
+
+  @contextmanager
+  def connection(self):
+    """
+    Uso:
+      with DB.connection() as conn:
+        ...
+        conn.commit()
+    """
+    conn = self.acquire()
+    try:
+      yield conn
+    except _pg8000().InterfaceError:
+      # Socket quebrado/conexão fechada: não reaproveitar
+      self.discard()
+      raise
+    except BaseException:
+      self.release(failed=True)
+      raise
+    else:
+      self.release()
+
+  def call(self, fn: Callable):
+    """
+    Executa fn(conn) e, se a conexão reutilizada tiver morrido no meio do
+    caminho (erro de rede), reconecta e tenta mais uma vez. Use apenas para
+    operações idempotentes ou que façam commit dentro de fn.
+    """
+    reused_before = self.stats["reused"]
+    try:
+      with self.connection() as conn:
+        return fn(conn)
+    except _pg8000().InterfaceError:
+      if self.stats["reused"] == reused_before:
+        raise
+    with self.connection() as conn:
+      return fn(conn)
@@ -0,0 +1,164 @@
+"""
+Roteamento e utilitários HTTP (API Gateway REST com integração proxy, ou HTTP
+API com payload 2.0) comuns aos handlers do UniScreen.
+
+Cada Lambda registra suas rotas num Router, indexado por (httpMethod,
+resource). O mesmo Router serve tanto o handler da própria função quanto o
+handler "monólito" (lambdas/monolith.py), que junta todos os Routers numa
+única função.
+"""
+import json
+from typing import Callable, Dict, Optional, Tuple
+
+
+def response(status_code: int, body, headers: Optional[Dict[str, str]] = None):
+  # body pode ser um dict ou um JSON já serializado (str)
+  return {
+    "statusCode": status_code,
+    "headers": {"Content-Type": "application/json", **(headers or {})},
+    "body": body if isinstance(body, str) else json.dumps(body),
+    "isBase64Encoded": False,
+  }
+
+
+def get_header(event, name: str) -> Optional[str]:
+  # API Gateway preserva a capitalização enviada pelo cliente
+  name = name.lower()
+  for key, value in (event.get("headers") or {}).items():
+    if key.lower() == name:
+      return value
+  return None
+
+
+def get_bearer_token(event) -> Optional[str]:
+  # O authorizer do REST API aceita o token puro; HTTP API usa "Bearer <token>"
+  value = (get_header(event, "Authorization") or "").strip()
+  if value[:7].lower() == "bearer ":
+    value = value[7:].strip()
+  return value or None
+
+
+def get_claims(event) -> dict:
+  """
+  Claims do usuário autenticado: as do authorizer do API Gateway (REST ou
+  HTTP API/JWT) quando presentes; senão, as do token do header Authorization,
+  verificado localmente (uniscreen_common.cognito_jwt). {} se não houver
+  usuário válido; HttpError 503 se o JWKS do user pool estiver inacessível.
+  """
+  authorizer = (event.get("requestContext") or {}).get("authorizer") or {}
+  claims = authorizer.get("claims") or (authorizer.get("jwt") or {}).get("claims")
+  if claims:
+    return claims
+
+  token = get_bearer_token(event)
+  if not token:
+    return {}
+  from uniscreen_common import cognito_jwt
+
+  verifier = cognito_jwt.default_verifier()
+  if verifier is None:
+    return {}
+  try:
+    return verifier.verify(token)
+  except cognito_jwt.InvalidToken:
+    return {}
+  except cognito_jwt.JwksUnavailable:
+    raise HttpError("Authentication service unavailable", 503)
+
+
+def parse_body(event) -> dict:
+  body = event.get("body")
+  if isinstance(body, str):
+    try:
+      return json.loads(body or "{}")
+    except Exception:
+      return {}
+  return body or {}
+
+
+class HttpError(Exception):
+  """Erro que vira resposta {"error": message} com o status informado."""
+
+  status_code = 500
+
+  def __init__(self, message: str, status_code: Optional[int] = None):
+    super().__init__(message)
+    if status_code is not None:
+      self.status_code = status_code
+
+
+class BadRequest(HttpError):
+  status_code = 400
+
+
+Handler = Callable[[dict, object], dict]
+
+
+class Router:
+  """
+  Tabela de rotas (httpMethod, resource) -> handler(event, context).
+
+  - db: ConnectionManager usado pelas rotas deste Router; o dispatch zera e
+    reporta os contadores de conexão por invocação (None para rotas sem banco).
+  - default_resource: resource assumido quando o evento não traz "resource"
+    (invocação direta/local de um handler de função única).
+  Rotas com auth=True exigem usuário autenticado (get_claims) e respondem 401
+  sem chamar o handler. Exceções não tratadas viram 500 {"error": ...};
+  HttpError usa o próprio status.
+  """
+
+  def __init__(self, default_resource: Optional[str] = None, db=None):
+    self.default_resource = default_resource
+    self.db = db
+    self.routes: Dict[Tuple[str, str], Tuple[Handler, object, bool]] = {}
+
+  def route(self, method: str, resource: str, auth: bool = False):
+    def register(fn: Handler) -> Handler:
+      self.routes[(method.upper(), resource)] = (fn, self.db, auth)
+      return fn
+    return register
+
+  def include(self, other: "Router"):
+    """Copia as rotas de outro Router (cada uma mantém o db de origem)."""
+    for key, entry in other.routes.items():
+      if key in self.routes and self.routes[key] != entry:
+        raise ValueError(f"Duplicate route {key[0]} {key[1]}")
+      self.routes[key] = entry
+
+  def resolve(self, event) -> Tuple[str, str, Optional[Tuple[Handler, object, bool]]]:
+    if "routeKey" in event:
+      # HTTP API (payload 2.0): routeKey = "POST /favorites"
+      method, _, resource = event["routeKey"].partition(" ")
+    else:
+      method = event.get("httpMethod") or "GET"
+      resource = event.get("resource") or self.default_resource or event.get("path") or "/"
+    method = method.upper()
+    return method, resource, self.routes.get((method, resource))
+
+  def dispatch(self, event, context=None):
+    method, resource, entry = self.resolve(event)
+    if entry is None:
+      if any(r == resource for _, r in self.routes):
+        return response(405, {"error": f"Method {method} not allowed"})
+      return response(404, {"error": f"Route {method} {resource} not found"})
+
+    fn, db, auth = entry
+    if db is not None:
+      db.begin_invocation()
+    try:
+      if auth and not get_claims(event):
+        return response(401, {"error": "Unauthorized"})
+      return fn(event, context)
+    except HttpError as e:
+      return response(e.status_code, {"error": str(e)})
+    except Exception as e:
+      return response(500, {"error": str(e)})
+    finally:
+      if db is not None:
+        db.report(f"{method} {resource}")
+
+  def handler(self) -> Handler:
+    """Retorna um lambda_handler(event, context) que despacha por este Router."""
+    def lambda_handler(event, context):
+      return self.dispatch(event, context)
+    return lambda_handler
@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class TtlLru:
+  """
+  LRU limitado com TTL por entrada, seguro entre threads. Vive no container
+  (escopo de módulo) e sobrevive entre invocações enquanto ele estiver quente.
+  """
+
+  def __init__(self, max_entries: int, ttl: float):
+    self.max_entries = max_entries
+    self.ttl = ttl
+    self._data = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, key: Hashable):
+    with self._lock:
+      entry = self._data.get(key)
+      if entry is None:
+        return None
+      if entry[0] < time.monotonic():
+        del self._data[key]
+        return None
+      self._data.move_to_end(key)
+      return entry[1]
+
+  def put(self, key: Hashable, value, ttl: Optional[float] = None):
+    expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+    with self._lock:
+      self._data[key] = (expires_at, value)
+      self._data.move_to_end(key)
+      while len(self._data) > self.max_entries:
+        self._data.popitem(last=False)
+
+  def pop(self, key: Hashable):
+    with self._lock:
+      entry = self._data.pop(key, None)
+    return None if entry is None else entry[1]
+
+  def clear(self):
+    with self._lock:
+      self._data.clear()
+
+  def __len__(self) -> int:
+    return len(self._data)
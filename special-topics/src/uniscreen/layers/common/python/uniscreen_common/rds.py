@@ -0,0 +1,48 @@
+"""
+Credenciais do RDS (Secrets Manager + variáveis de ambiente) e a conexão
+compartilhada do container. Todas as rotas que importam DB daqui usam a mesma
+conexão; no handler monólito isso significa uma conexão para a API inteira.
+"""
+import os
+from typing import Tuple
+
+from uniscreen_common import secrets_cache
+from uniscreen_common.db import ConnectionManager
+
+
+def get_rds_credentials() -> Tuple[str, str, str, int, str]:
+  """
+  Retorna (host, user, password, port, database) a partir das variáveis e Secret do RDS.
+  Espera-se que o Secret (RDS_SECRET_ID) tenha o formato padrão do AWS RDS:
+   {"username":"...", "password":"...", "engine":"postgres", "host":"...", "port":5432, "dbname":"..."}
+  """
+  region = os.environ.get("REGION") or os.environ.get("AWS_REGION") or "us-east-2"
+  secret_id = os.environ.get("RDS_SECRET_ID")
+  host_env = os.environ.get("DB_ENDPOINT")
+  port_env = os.environ.get("DB_PORT")
+  db_env = os.environ.get("DB_NAME")
+
+  if not secret_id:
+    raise RuntimeError("Missing RDS_SECRET_ID environment variable")
+
+  secret = secrets_cache.get_secret_json(secret_id, region)
+
+  username = secret.get("username")
+  password = secret.get("password")
+  host = host_env or secret.get("host")
+  port = int(port_env or secret.get("port") or 5432)
+  database = db_env or secret.get("dbname")
+
+  if not (username and password and host and database):
+    raise RuntimeError("Incomplete RDS credentials (username/password/host/database)")
+
+  return host, username, password, port, database
+
+
+def invalidate_rds_credentials():
+  # Chamado quando o RDS rejeita a senha (ex.: após rotação do Secret)
+  secrets_cache.invalidate(os.environ.get("RDS_SECRET_ID"))
+
+
+# Conexão reaproveitada entre invocações no mesmo container
+DB = ConnectionManager(get_rds_credentials, on_auth_failure=invalidate_rds_credentials)
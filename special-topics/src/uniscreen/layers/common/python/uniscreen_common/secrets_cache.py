@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+from typing import Dict, Optional
+
+from uniscreen_common import aws
+
+
+# TTL padrão dos segredos em cache e janela extra em que o valor expirado ainda
+# é servido enquanto um refresh roda em segundo plano (stale-while-revalidate)
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_STALE_SECONDS = 600.0
+
+_cache: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def _fetch(secret_id: str, region: str) -> str:
+  sec = aws.client("secretsmanager", region).get_secret_value(SecretId=secret_id)
+  return sec.get("SecretString") or "{}"
+
+
+def _refresh_in_background(secret_id: str, region: str, entry: dict, ttl: float):
+  def run():
+    try:
+      value = _fetch(secret_id, region)
+      _store(secret_id, value, ttl)
+    except Exception:
+      # Mantém o valor antigo; a próxima leitura tenta novamente
+      pass
+    finally:
+      entry["refreshing"] = False
+
+  threading.Thread(target=run, daemon=True).start()
+
+
+def _store(secret_id: str, value: str, ttl: float) -> dict:
+  entry = {"value": value, "expires_at": time.monotonic() + ttl, "refreshing": False}
+  _cache[secret_id] = entry
+  return entry
+
+
+def get_secret_string(secret_id: str, region: str, ttl: float = DEFAULT_TTL_SECONDS,
+                      stale: float = DEFAULT_STALE_SECONDS) -> str:
+  """
+  Retorna o SecretString de um segredo, usando cache em memória por container.
+  - Dentro do TTL: valor em cache, sem chamada à AWS.
+  - Expirado há menos de `stale` segundos: devolve o valor antigo e dispara um
+    refresh em segundo plano (apenas um por segredo).
+  - Além disso (ou sem cache): busca de forma síncrona.
+  """
+  now = time.monotonic()
+  entry = _cache.get(secret_id)
+  if entry is not None:
+    if now < entry["expires_at"]:
+      return entry["value"]
+    if now < entry["expires_at"] + stale:
+      with _lock:
+        start = not entry["refreshing"]
+        entry["refreshing"] = True
+      if start:
+        _refresh_in_background(secret_id, region, entry, ttl)
+      return entry["value"]
+
+  return _store(secret_id, _fetch(secret_id, region), ttl)["value"]
+
+
+def get_secret_json(secret_id: str, region: str, ttl: float = DEFAULT_TTL_SECONDS,
+                    stale: float = DEFAULT_STALE_SECONDS) -> dict:
+  return json.loads(get_secret_string(secret_id, region, ttl=ttl, stale=stale))
+
+
+def invalidate(secret_id: Optional[str] = None):
+  """
+  Remove um segredo do cache (ou todos, se secret_id for None). Usado quando o
+  banco rejeita a senha após uma rotação: a próxima leitura vai à AWS.
+  """
+  if secret_id is None:
+    _cache.clear()
+  else:
+    _cache.pop(secret_id, None)